@@ -1,6 +1,33 @@
-from .app import App, BaseApp, BaseService, Service
-from .server import Server
-from .aio.app import AsyncApp, BaseAsyncApp, BaseAsyncService, AsyncService
-from .aio.server import AsyncServer
+from importlib import import_module
 
 __version__ = "0.2.2"
+
+# names are imported on first access (PEP 562), so `homi run` loads only modules of selected server mode
+_LAZY_NAMES = {
+    'App': '.app',
+    'BaseApp': '.app',
+    'BaseService': '.app',
+    'Service': '.app',
+    'Server': '.server',
+    'AsyncApp': '.aio.app',
+    'BaseAsyncApp': '.aio.app',
+    'BaseAsyncService': '.aio.app',
+    'AsyncService': '.aio.app',
+    'AsyncServer': '.aio.server',
+}
+
+__all__ = list(_LAZY_NAMES)
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_NAMES])
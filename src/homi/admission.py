@@ -0,0 +1,242 @@
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from time import monotonic
+from typing import Dict, NamedTuple, Sequence
+
+import grpc
+
+
+class AdmissionStats(NamedTuple):
+    pending: int
+    queue_latency: float
+    admitted: int
+    shed: Dict[str, int]
+
+
+class AdmissionControl:
+    """
+    reject new rpc with RESOURCE_EXHAUSTED before it is queued or deserialized, while server is overloaded.
+
+    - `max_pending`: rpc is rejected while this number of rpc are running or waiting for thread (event loop)
+    - `target_queue_latency`: rpc is rejected while recent queueing latency is over it (seconds).
+      it is time which rpc waits for thread of `Server`, or lag of event loop of `AsyncServer`
+
+    ```python
+    Server(app, admission=AdmissionControl(max_pending=100, target_queue_latency=0.05))
+    ```
+
+    :param latency_window: seconds for which queueing latency sample is recent
+    :param latency_weight: weight of new sample in moving average of queueing latency
+    :param exclude_methods: full method names(`/package.Service/Method`) never rejected, like health check
+    """
+
+    def __init__(
+            self,
+            max_pending: int = None,
+            target_queue_latency: float = None,
+            latency_window: float = 1.0,
+            latency_weight: float = 0.2,
+            exclude_methods: Sequence[str] = (),
+    ):
+        self.max_pending = max_pending
+        self.target_queue_latency = target_queue_latency
+        self.latency_window = latency_window
+        self.latency_weight = latency_weight
+        self.exclude_methods = frozenset(exclude_methods)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._admitted = 0
+        self._shed = Counter()
+        self._queue_latency = 0.0
+        self._sampled_at = 0.0
+
+    @property
+    def stats(self) -> AdmissionStats:
+        with self._lock:
+            return AdmissionStats(
+                pending=self._pending,
+                queue_latency=self._queue_latency,
+                admitted=self._admitted,
+                shed=dict(self._shed),
+            )
+
+    def observe_queue_latency(self, seconds: float):
+        with self._lock:
+            self._queue_latency += self.latency_weight * (seconds - self._queue_latency)
+            self._sampled_at = monotonic()
+
+    def enter(self):
+        with self._lock:
+            self._pending += 1
+
+    def leave(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _is_overloaded(self) -> bool:
+        if self.max_pending is not None and self._pending >= self.max_pending:
+            return True
+        if self.target_queue_latency is None or self._pending == 0:
+            return False
+        is_recent = monotonic() - self._sampled_at < self.latency_window
+        return is_recent and self._queue_latency > self.target_queue_latency
+
+    def admit(self, method: str) -> bool:
+        """check new rpc of method, shed count of method is increased when it is rejected"""
+        if method in self.exclude_methods:
+            return True
+        with self._lock:
+            if self._is_overloaded():
+                self._shed[method] += 1
+                return False
+            self._admitted += 1
+            return True
+
+
+class AdmissionThreadPool(ThreadPoolExecutor):
+    """thread pool of `Server`, it reports waiting and running rpc and their queueing latency to admission control"""
+
+    def __init__(self, max_workers: int, admission: AdmissionControl, **kwargs):
+        super().__init__(max_workers=max_workers, **kwargs)
+        self.admission = admission
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        admission = self.admission
+        submitted = monotonic()
+
+        def run():
+            admission.observe_queue_latency(monotonic() - submitted)
+            return fn(*args, **kwargs)
+
+        return _submit_pending(admission, super().submit, run)
+
+
+class AdmissionMethodPool(ThreadPoolExecutor):
+    """
+    thread pool of method (`executor` option) which reports waiting and running rpc to admission control.
+    grpc server runs rpc of that method in it instead of `AdmissionThreadPool`.
+    queueing latency is not observed, full pool of one method does not mean server is overloaded
+    """
+
+    def __init__(self, pool: ThreadPoolExecutor, admission: AdmissionControl):
+        # thread is never started by this pool, tasks run in `pool`
+        super().__init__(max_workers=1)
+        self.pool = pool
+        self.admission = admission
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        return _submit_pending(self.admission, self.pool.submit, partial(fn, *args, **kwargs))
+
+
+def _submit_pending(admission: AdmissionControl, submit, fn) -> Future:
+    """task is pending rpc of admission control until it ends"""
+    def run():
+        try:
+            return fn()
+        finally:
+            admission.leave()
+
+    admission.enter()
+    try:
+        return submit(run)
+    except BaseException:
+        admission.leave()
+        raise
+
+
+class InlineExecutor(ThreadPoolExecutor):
+    """run task in calling thread, grpc server uses it for behavior which has it as `experimental_thread_pool`"""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def _reject(request_iterator, context):
+    context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'server is overloaded')
+
+
+# rejecting is fast, so it runs in serving thread of grpc server instead of waiting for thread of pool
+_reject.experimental_thread_pool = InlineExecutor()
+
+
+async def _async_reject(request_iterator, context):
+    await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'server is overloaded')
+
+
+_BEHAVIORS = ('unary_unary', 'unary_stream', 'stream_unary', 'stream_stream')
+
+
+class AdmissionInterceptor(grpc.ServerInterceptor):
+    """
+    it runs before method handler is found, so rejected rpc is not queued and request is not deserialized.
+    handler of rejected rpc is streaming request one, which does not wait for request message.
+    """
+
+    def __init__(self, admission: AdmissionControl):
+        self.admission = admission
+        self._rejection = grpc.stream_stream_rpc_method_handler(_reject)
+        # thread pool of method -> `AdmissionMethodPool` of it
+        self._method_pools = {}
+
+    def intercept_service(self, continuation, handler_call_details):
+        if not self.admission.admit(handler_call_details.method):
+            return self._rejection
+        return self._count_method_pool(continuation(handler_call_details))
+
+    def _count_method_pool(self, handler):
+        """rpc of method running in its own thread pool (not in `AdmissionThreadPool`) is counted too"""
+        for name in _BEHAVIORS:
+            behavior = getattr(handler, name, None)
+            if behavior is not None:
+                break
+        else:
+            return handler
+        pool = getattr(behavior, 'experimental_thread_pool', None)
+        if not isinstance(pool, ThreadPoolExecutor) or isinstance(pool, (InlineExecutor, AdmissionMethodPool)) \
+                or not hasattr(handler, '_replace'):
+            return handler
+        try:
+            method_pool = self._method_pools[pool]
+        except KeyError:
+            method_pool = self._method_pools.setdefault(pool, AdmissionMethodPool(pool, self.admission))
+
+        def counted_behavior(request, context):
+            return behavior(request, context)
+
+        counted_behavior.experimental_thread_pool = method_pool
+        return handler._replace(**{name: counted_behavior})
+
+
+class AsyncAdmissionInterceptor(grpc.aio.ServerInterceptor):
+
+    def __init__(self, admission: AdmissionControl):
+        self.admission = admission
+        self._rejection = grpc.stream_stream_rpc_method_handler(_async_reject)
+
+    async def intercept_service(self, continuation, handler_call_details):
+        if not self.admission.admit(handler_call_details.method):
+            return self._rejection
+        # every rpc runs in its own task, it ends even if rpc is cancelled before handler runs
+        self.admission.enter()
+        asyncio.current_task().add_done_callback(lambda task: self.admission.leave())
+        return await continuation(handler_call_details)
+
+
+async def monitor_loop_lag(admission: AdmissionControl, interval: float = 0.05):
+    """report lag of event loop as queueing latency"""
+    loop = asyncio.get_event_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        admission.observe_queue_latency(max(0.0, loop.time() - started - interval))
@@ -1,14 +1,28 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, Generic, List, TypeVar, Union
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, List, Optional, TypeVar, Union
 
 import grpc
 from google.protobuf.descriptor import ServiceDescriptor
 
 from ..app import BaseService
 from ..config import MergeConfig
-from ..exception import MethodNotFound, RegisterError, ServiceNotFound
-from ..proto_meta import ServiceMetaData, make_grpc_method_handler, service_metadata_from_descriptor, warp_async_handler
+from ..exception import RegisterError, ServiceNotFound
+from ..proto_meta import (
+    ServiceMetaData,
+    handler_options,
+    is_bytes_response,
+    is_bytes_transport,
+    make_grpc_method_handler,
+    make_method_options,
+    service_metadata_from_descriptor,
+    warp_async_handler,
+    warp_async_message_transport,
+)
+
+if TYPE_CHECKING:
+    from ..metrics import Metrics
 
 
 async def AsyncNotImplementedMethod(request, context):
@@ -18,13 +32,28 @@ async def AsyncNotImplementedMethod(request, context):
 
 
 class BaseAsyncApp:
-    def __init__(self, config: dict = None, **kwargs):
+    def __init__(self, config: dict = None, executors: Dict[str, Executor] = None, metrics: 'Metrics' = None,
+                 **kwargs):
         self._config: dict = config or {}
+        self._executors: Dict[str, Executor] = dict(executors or {})
+        # every method of app records its latency and status code to it
+        self.metrics: Optional['Metrics'] = metrics
 
     @property
     def config(self):
         return self._config
 
+    def add_executor(self, name: str, executor: Executor):
+        """named executor, method can run in it by `executor=name` option"""
+        self._executors[name] = executor
+
+    def get_executor(self, name: str) -> Executor:
+        try:
+            return self._executors[name]
+        except KeyError:
+            raise RegisterError(f'executor {name} is not added to app, available executors: '
+                                f'{", ".join(self._executors)}')
+
 
 ConfigType = TypeVar('ConfigType')
 
@@ -137,13 +166,14 @@ class AsyncService(Generic[ConfigType], BaseAsyncService[ConfigType]):
         super().__init__(service_descriptor, config_class, default_config, config_name, **kwargs)
 
         self._method_handler: Dict[str, Callable] = {}
+        self._method_options: Dict[str, Dict[str, Any]] = {}
 
     # method func register decorator
-    def method(self, method_name=None, **kwargs):
+    def method(self, method_name=None, **options):
+        """register handler of method, see `homi.proto_meta.make_method_options` for options"""
         def wrapped(func: Callable):
             name = method_name or func.__name__
-            if name not in self.meta.methods:
-                raise MethodNotFound(name, self.meta.full_name, available_methods=self.meta.methods.keys())
+            self._method_options[name] = make_method_options(self.meta, name, 'AsyncTopic', **options)
             self._method_handler[name] = func
             return func
 
@@ -152,11 +182,31 @@ class AsyncService(Generic[ConfigType], BaseAsyncService[ConfigType]):
     def register_method(self, method_name, func: Callable, **kwargs):
         self.method(method_name, **kwargs)(func)
 
+    @property
+    def handled_method_names(self):
+        """names of methods which have registered handler"""
+        return self._method_handler.keys()
+
+    def _get_method_options(self, name: str) -> Dict[str, Any]:
+        options = self._method_options[name]
+        # service may be added to server without app
+        app = self._app
+        if isinstance(options['executor'], str):
+            if app is None:
+                raise RegisterError(f'executor {options["executor"]} of method {name} needs service added to app')
+            options = {**options, 'executor': app.get_executor(options['executor'])}
+        if app is not None and app.metrics is not None:
+            options = {**options, 'metrics': app.metrics}
+        return options
+
     def make_servicer_class(self):
         methods = {}
         for name, method_meta in self.meta.methods.items():
             if name in self._method_handler:
-                func = warp_async_handler(method_meta, self._method_handler[name])
+                options = self._get_method_options(name)
+                func = warp_async_handler(method_meta, self._method_handler[name], **handler_options(options))
+                if is_bytes_response(**options):
+                    func = warp_async_message_transport(method_meta, func, bytes_request=is_bytes_transport(**options))
             else:
                 func = AsyncNotImplementedMethod
             methods[name] = func
@@ -167,10 +217,12 @@ class AsyncService(Generic[ConfigType], BaseAsyncService[ConfigType]):
         generic_handler = {}
         for name, method_meta in self.meta.methods.items():
             if name in self._method_handler:
-                func = warp_async_handler(method_meta, self._method_handler[name])
+                options = self._get_method_options(name)
+                func = warp_async_handler(method_meta, self._method_handler[name], **handler_options(options))
             else:
+                options = {}
                 func = AsyncNotImplementedMethod
-            generic_handler[name] = make_grpc_method_handler(method_meta, func, )
+            generic_handler[name] = make_grpc_method_handler(method_meta, func, **options)
         return grpc.method_handlers_generic_handler(self.full_name, generic_handler)
 
     def add_to_server(self, server):
@@ -1,10 +1,14 @@
+import asyncio
 import os
+from concurrent import futures
 from typing import List
 
 import grpc
 from grpc_interceptor import ServerInterceptor
 
 from .app import AsyncApp
+from ..admission import AdmissionControl, AsyncAdmissionInterceptor, monitor_loop_lag
+from ..config import Listener, ServerOptions
 from ..exception import ServerSSLConfigError
 
 
@@ -18,7 +22,11 @@ class AsyncServer:
                  alts: bool = False,
                  private_key: bytes = None,
                  certificate: bytes = None,
-                 interceptors: List[ServerInterceptor] = None
+                 interceptors: List[ServerInterceptor] = None,
+                 reuse_port: bool = False,
+                 server_options: ServerOptions = None,
+                 admission: AdmissionControl = None,
+                 listeners: List[Listener] = None,
                  ):
         self.host = host
         self.port = port
@@ -31,11 +39,32 @@ class AsyncServer:
         self.certificate = certificate
         self.server = None
         self._server_credentials = None
+        # sync handler and sync service run in this thread pool, it is made when server runs
+        self.thread_pool: futures.ThreadPoolExecutor = None
         self.interceptors = interceptors
+        self.admission = admission
+        if admission is not None:
+            # admission control runs first, so rejected rpc does not reach other interceptors
+            self.interceptors = [AsyncAdmissionInterceptor(admission), *(interceptors or [])]
+        self._lag_monitor = None
+        self.reuse_port = reuse_port
+        if server_options is None:
+            server_options = ServerOptions.from_dict(app.config.get('server'))
+        self.server_options = server_options
+        # host, port are not used when listeners are set
+        self._listeners = [listener.validate() for listener in listeners or []]
+        self.ports: List[int] = []
 
     def load_config_from_env(self):
         pass
 
+    @property
+    def options(self):
+        options = self.server_options.grpc_options
+        if self.reuse_port:
+            options.append(('grpc.so_reuseport', 1))
+        return options
+
     @property
     def endpoint(self):
         host = self.host if self.host else "[::]"
@@ -48,32 +77,54 @@ class AsyncServer:
                 ((self.private_key, self.certificate,),))
         return self._server_credentials
 
-    def _add_port(self):
+    @property
+    def listeners(self) -> List[Listener]:
+        if self._listeners:
+            return self._listeners
         if self.alts:
-            self.server.add_secure_port(self.endpoint, grpc.alts_server_credentials())
-        elif self.private_key and self.certificate:
-            self.server.add_secure_port(self.endpoint, self.server_credentials)
-        elif self.private_key or self.certificate:
+            return [Listener(self.endpoint, alts=True)]
+        return [Listener(self.endpoint, tls=bool(self.private_key and self.certificate))]
+
+    def _add_port(self):
+        if bool(self.private_key) != bool(self.certificate) and not self.alts:
             # error
             raise ServerSSLConfigError('If you want enable ssl feature, You Must set tls_key, certificate config both ')
-        else:
-            self.server.add_insecure_port(self.endpoint)
+        ssl_credentials = self.server_credentials if self.private_key and self.certificate else None
+        self.ports = [listener.add_to(self.server, ssl_credentials) for listener in self.listeners]
 
     async def run(self, wait=True):
         if self.debug:
             os.environ['GRPC_VERBOSITY'] = 'debug'
-        self.server = grpc.aio.server(interceptors=self.interceptors)
+        self.thread_pool = futures.ThreadPoolExecutor(max_workers=self.worker)
+        asyncio.get_event_loop().set_default_executor(self.thread_pool)
+        self.server = grpc.aio.server(
+            migration_thread_pool=self.thread_pool,
+            interceptors=self.interceptors,
+            options=self.options,
+            maximum_concurrent_rpcs=self.server_options.maximum_concurrent_rpcs,
+            compression=self.server_options.grpc_compression,
+        )
         self.app.bind_to_server(self.server)
         self._add_port()
         await self.server.start()
+        if self.admission is not None and self.admission.target_queue_latency is not None:
+            self._lag_monitor = asyncio.ensure_future(monitor_loop_lag(self.admission))
         print('run server')
-        print(f'# port : {self.port}')
+        for listener in self.listeners:
+            print(f'# listen : {listener.address}')
         if wait:
             await self.wait_for_termination()
 
     async def stop(self, grace=None):
+        if self._lag_monitor:
+            self._lag_monitor.cancel()
+            self._lag_monitor = None
         if self.server:
             await self.server.stop(grace)
+        if self.thread_pool:
+            # running sync handlers can not be cancelled, event loop does not wait for them
+            self.thread_pool.shutdown(wait=False)
+            self.thread_pool = None
 
     async def wait_for_termination(self):
         if self.server:
@@ -1,13 +1,28 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, Generic, List, TypeVar, Union
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, List, Optional, TypeVar, Union
 
 import grpc
 from google.protobuf.descriptor import ServiceDescriptor
 
 from .config import MergeConfig
-from .exception import MethodNotFound, RegisterError, ServiceNotFound
-from .proto_meta import ServiceMetaData, make_grpc_method_handler, service_metadata_from_descriptor, warp_handler
+from .exception import RegisterError, ServiceNotFound
+from .proto_meta import (
+    ServiceMetaData,
+    handler_options,
+    is_bytes_response,
+    is_bytes_transport,
+    make_grpc_method_handler,
+    make_method_options,
+    service_metadata_from_descriptor,
+    warp_handler,
+    warp_message_transport,
+    warp_testing_thread_pool,
+)
+
+if TYPE_CHECKING:
+    from .metrics import Metrics
 
 
 def NotImplementedMethod(request, context):
@@ -17,13 +32,28 @@ def NotImplementedMethod(request, context):
 
 
 class BaseApp:
-    def __init__(self, config: dict = None, **kwargs):
+    def __init__(self, config: dict = None, executors: Dict[str, Executor] = None, metrics: 'Metrics' = None,
+                 **kwargs):
         self._config: dict = config or {}
+        self._executors: Dict[str, Executor] = dict(executors or {})
+        # every method of app records its latency and status code to it
+        self.metrics: Optional['Metrics'] = metrics
 
     @property
     def config(self):
         return self._config
 
+    def add_executor(self, name: str, executor: Executor):
+        """named executor, method can run in it by `executor=name` option"""
+        self._executors[name] = executor
+
+    def get_executor(self, name: str) -> Executor:
+        try:
+            return self._executors[name]
+        except KeyError:
+            raise RegisterError(f'executor {name} is not added to app, available executors: '
+                                f'{", ".join(self._executors)}')
+
 
 ConfigType = TypeVar('ConfigType')
 
@@ -125,13 +155,14 @@ class Service(Generic[ConfigType], BaseService[ConfigType]):
         super().__init__(service_descriptor, config_class, default_config, config_name, **kwargs)
 
         self._method_handler: Dict[str, Callable] = {}
+        self._method_options: Dict[str, Dict[str, Any]] = {}
 
     # method func register decorator
-    def method(self, method_name=None, **kwargs):
+    def method(self, method_name=None, **options):
+        """register handler of method, see `homi.proto_meta.make_method_options` for options"""
         def wrapped(func: Callable):
             name = method_name or func.__name__
-            if name not in self.meta.methods:
-                raise MethodNotFound(name, self.meta.full_name, available_methods=self.meta.methods.keys())
+            self._method_options[name] = make_method_options(self.meta, name, 'Topic', **options)
             self._method_handler[name] = func
             return func
 
@@ -140,11 +171,32 @@ class Service(Generic[ConfigType], BaseService[ConfigType]):
     def register_method(self, method_name, func: Callable, **kwargs):
         self.method(method_name, **kwargs)(func)
 
+    @property
+    def handled_method_names(self):
+        """names of methods which have registered handler"""
+        return self._method_handler.keys()
+
+    def _get_method_options(self, name: str) -> Dict[str, Any]:
+        options = self._method_options[name]
+        # service may be added to server without app
+        app = self._app
+        if isinstance(options['executor'], str):
+            if app is None:
+                raise RegisterError(f'executor {options["executor"]} of method {name} needs service added to app')
+            options = {**options, 'executor': app.get_executor(options['executor'])}
+        if app is not None and app.metrics is not None:
+            options = {**options, 'metrics': app.metrics}
+        return options
+
     def make_servicer_class(self):
         methods = {}
         for name, method_meta in self.meta.methods.items():
             if name in self._method_handler:
-                func = warp_handler(method_meta, self._method_handler[name])
+                options = self._get_method_options(name)
+                func = warp_handler(method_meta, self._method_handler[name], **handler_options(options))
+                func = warp_testing_thread_pool(method_meta, func)
+                if is_bytes_response(**options):
+                    func = warp_message_transport(method_meta, func, bytes_request=is_bytes_transport(**options))
             else:
                 func = NotImplementedMethod
             methods[name] = func
@@ -155,10 +207,12 @@ class Service(Generic[ConfigType], BaseService[ConfigType]):
         generic_handler = {}
         for name, method_meta in self.meta.methods.items():
             if name in self._method_handler:
-                func = warp_handler(method_meta, self._method_handler[name])
+                options = self._get_method_options(name)
+                func = warp_handler(method_meta, self._method_handler[name], **handler_options(options))
             else:
+                options = {}
                 func = NotImplementedMethod
-            generic_handler[name] = make_grpc_method_handler(method_meta, func, )
+            generic_handler[name] = make_grpc_method_handler(method_meta, func, **options)
         return grpc.method_handlers_generic_handler(self.full_name, generic_handler)
 
     def add_to_server(self, server):
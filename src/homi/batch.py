@@ -0,0 +1,125 @@
+import asyncio
+import queue
+import threading
+from itertools import islice
+from time import monotonic
+from typing import AsyncIterator, Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+
+_END = object()
+
+
+class _StreamReader:
+    """
+    reads blocking iterator in thread, so consumer can wait for next item with timeout.
+    queue is bounded, reader does not read further than consumer (grpc flow-control still works)
+    """
+
+    def __init__(self, iterator: Iterable, maxsize: int):
+        self._queue = queue.Queue(maxsize)
+        self._closed = False
+        self._thread = threading.Thread(target=self._read, args=(iterator,), daemon=True)
+        self._thread.start()
+
+    def _put(self, item, error: BaseException = None) -> bool:
+        if self._closed:
+            return False
+        self._queue.put((item, error))
+        return True
+
+    def _read(self, iterator: Iterable):
+        try:
+            for item in iterator:
+                if not self._put(item):
+                    return
+        except BaseException as e:
+            self._put(_END, e)
+        else:
+            self._put(_END)
+
+    def get(self, timeout: float = None):
+        """next item, `_END` when iterator ended. raise `queue.Empty` on timeout, error of iterator is raised"""
+        item, error = self._queue.get(timeout=timeout)
+        if error is not None:
+            raise error
+        return item
+
+    def close(self):
+        self._closed = True
+        # wake reader blocked on full queue, it stops before next put
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+
+def batch_stream(iterator: Iterable[T], size: int, timeout: float = None) -> Iterator[List[T]]:
+    """
+    lists of up to `size` items. with `timeout`, list is yielded when `timeout` seconds passed since its first item,
+    even if it is not full. (items are read in thread for timeout)
+    """
+    if timeout is None:
+        iterator = iter(iterator)
+        batch = list(islice(iterator, size))
+        while batch:
+            yield batch
+            batch = list(islice(iterator, size))
+        return
+
+    reader = _StreamReader(iterator, size)
+    try:
+        item = reader.get()
+        while item is not _END:
+            batch = [item]
+            deadline = monotonic() + timeout
+            item = None
+            while len(batch) < size:
+                try:
+                    item = reader.get(timeout=max(deadline - monotonic(), 0))
+                except queue.Empty:
+                    item = None
+                    break
+                if item is _END:
+                    break
+                batch.append(item)
+                item = None
+            yield batch
+            if item is None:
+                item = reader.get()
+    finally:
+        reader.close()
+
+
+async def batch_async_stream(iterator: AsyncIterator[T], size: int, timeout: float = None) -> AsyncIterator[List[T]]:
+    """`batch_stream` of async iterator, next item is read by task while timeout is waited"""
+    loop = asyncio.get_event_loop()
+    iterator = iterator.__aiter__()
+    pending = None
+    try:
+        while True:
+            batch = []
+            deadline = None
+            while len(batch) < size:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                if deadline is not None:
+                    done, _ = await asyncio.wait([pending], timeout=max(deadline - loop.time(), 0))
+                    if not done:
+                        break
+                try:
+                    item = await pending
+                except StopAsyncIteration:
+                    pending = None
+                    if batch:
+                        yield batch
+                    return
+                pending = None
+                batch.append(item)
+                if deadline is None and timeout is not None:
+                    deadline = loop.time() + timeout
+            yield batch
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,395 @@
+"""
+load generator for homi app, `homi bench` command uses it.
+
+```python
+from homi.bench import bench_app
+
+for result in bench_app(app, duration=5, concurrency=16, channels=4):
+    print(result.method, result.throughput, result.latency['p99'])
+```
+"""
+import asyncio
+import json
+import multiprocessing
+import platform
+import socket
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from time import perf_counter, sleep, time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import grpc
+from google.protobuf.descriptor import FieldDescriptor
+
+from .exception import MethodNotFound
+from .proto_meta import MethodMetaData, parse_to_dict
+
+CLOSED_LOOP = 'closed'
+OPEN_LOOP = 'open'
+PERCENTILES = (('p50', 50), ('p90', 90), ('p99', 99), ('p999', 99.9))
+# nested message of generated payload is filled until this depth, so recursive message ends
+MAX_DEPTH = 3
+
+
+class BenchResult(NamedTuple):
+    method: str
+    method_type: str
+    mode: str
+    channels: int
+    concurrency: int
+    # target calls per second of open loop mode
+    rps: Optional[float]
+    duration: float
+    calls: int
+    messages: int
+    # failed calls by status code name
+    errors: Dict[str, int]
+    # calls per second
+    throughput: float
+    # milliseconds
+    latency: Dict[str, float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+def _scalar(field: FieldDescriptor, string_size: int, index: int):
+    cpp_type = field.cpp_type
+    if cpp_type == FieldDescriptor.CPPTYPE_STRING:
+        value = str(index).rjust(string_size, 'x')
+        return value.encode() if field.type == FieldDescriptor.TYPE_BYTES else value
+    if cpp_type == FieldDescriptor.CPPTYPE_BOOL:
+        return index % 2 == 0
+    if cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+        values = field.enum_type.values
+        return values[(index + 1) % len(values)].number
+    if cpp_type in (FieldDescriptor.CPPTYPE_FLOAT, FieldDescriptor.CPPTYPE_DOUBLE):
+        return index + 0.5
+    return index + 1
+
+
+def _fill(message, string_size: int, repeated_size: int, depth: int):
+    oneofs = set()
+    for field in message.DESCRIPTOR.fields:
+        if field.containing_oneof is not None:
+            # only first field of oneof is set
+            if field.containing_oneof.name in oneofs:
+                continue
+            oneofs.add(field.containing_oneof.name)
+        value = getattr(message, field.name)
+        is_repeated = field.label == FieldDescriptor.LABEL_REPEATED
+        if field.message_type is not None and field.message_type.GetOptions().map_entry:
+            key_field = field.message_type.fields_by_name['key']
+            value_field = field.message_type.fields_by_name['value']
+            for i in range(repeated_size):
+                key = _scalar(key_field, string_size, i)
+                if value_field.message_type is None:
+                    value[key] = _scalar(value_field, string_size, i)
+                elif depth < MAX_DEPTH:
+                    _fill(value[key], string_size, repeated_size, depth + 1)
+        elif field.message_type is not None:
+            if depth >= MAX_DEPTH:
+                continue
+            if is_repeated:
+                for _ in range(repeated_size):
+                    _fill(value.add(), string_size, repeated_size, depth + 1)
+            else:
+                value.SetInParent()
+                _fill(value, string_size, repeated_size, depth + 1)
+        elif is_repeated:
+            value.extend(_scalar(field, string_size, i) for i in range(repeated_size))
+        else:
+            setattr(message, field.name, _scalar(field, string_size, 0))
+
+
+def make_payload(message_type, string_size: int = 16, repeated_size: int = 4):
+    """request message whose every field is set, strings and repeated fields have given size"""
+    message = message_type()
+    _fill(message, string_size, repeated_size, 0)
+    return message
+
+
+def load_payloads(path: str) -> Dict[str, List[dict]]:
+    """
+    requests to replay from json file, key is method (`package.Service/Method`),
+    value is request dict or list of them.
+    """
+    with open(path, encoding='utf8') as f:
+        data = json.load(f)
+    return {method: value if isinstance(value, list) else [value] for method, value in data.items()}
+
+
+def method_key(method_meta: MethodMetaData) -> str:
+    return method_meta.path[1:]
+
+
+def find_methods(app, methods: Sequence[str] = None) -> List[MethodMetaData]:
+    """
+    metadata of `methods` (`package.Service/Method`) of app.
+    every method which has handler when `methods` is empty
+    """
+    found = {}
+    for service in app.services:
+        handled = getattr(service, 'handled_method_names', None)
+        if handled is None:
+            continue
+        for name, method_meta in service.meta.methods.items():
+            if methods or name in handled:
+                found[method_key(method_meta)] = method_meta
+    if not methods:
+        return list(found.values())
+    try:
+        return [found[method] for method in methods]
+    except KeyError as e:
+        raise MethodNotFound(e.args[0], 'app', available_methods=list(found))
+
+
+def percentile(latencies: Sequence[float], q: float) -> float:
+    """nearest rank percentile of sorted latencies"""
+    if not latencies:
+        return 0.0
+    rank = max(int(-(-len(latencies) * q // 100)), 1)
+    return latencies[min(rank, len(latencies)) - 1]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """latency percentiles in milliseconds"""
+    latencies = sorted(latencies)
+    summary = {name: percentile(latencies, q) * 1000 for name, q in PERCENTILES}
+    summary['mean'] = sum(latencies) / len(latencies) * 1000 if latencies else 0.0
+    summary['max'] = latencies[-1] * 1000 if latencies else 0.0
+    return summary
+
+
+class _Caller:
+    """one rpc of method, returns number of received messages"""
+
+    def __init__(self, method_meta: MethodMetaData, requests: Sequence, stream_messages: int, timeout: float):
+        self.method_meta = method_meta
+        self.requests = requests
+        self.stream_messages = stream_messages
+        self.timeout = timeout
+        self.method_type = method_meta.method_type
+
+    def multi_callable(self, channel: grpc.Channel):
+        return getattr(channel, self.method_type.value)(
+            self.method_meta.path,
+            request_serializer=self.method_meta.input_type.SerializeToString,
+            response_deserializer=self.method_meta.output_type.FromString,
+        )
+
+    def request(self, index: int):
+        if self.method_type.is_unary_request:
+            return self.requests[index % len(self.requests)]
+        return iter([self.requests[(index + i) % len(self.requests)] for i in range(self.stream_messages)])
+
+    def __call__(self, multi_callable, index: int) -> int:
+        response = multi_callable(self.request(index), timeout=self.timeout)
+        if self.method_type.is_unary_response:
+            return 1
+        return sum(1 for _ in response)
+
+
+class _Recorder:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.messages = 0
+        self._lock = threading.Lock()
+
+    def call(self, caller: _Caller, multi_callable, index: int, started: float):
+        try:
+            messages = caller(multi_callable, index)
+        except grpc.RpcError as e:
+            with self._lock:
+                self.errors[e.code().name] += 1
+            return
+        latency = perf_counter() - started
+        with self._lock:
+            self.latencies.append(latency)
+            self.messages += messages
+
+
+def _closed_loop(caller: _Caller, callables: List, concurrency: int, until: float, recorder: _Recorder):
+    counter = iter(range(1 << 62))
+
+    def worker(multi_callable):
+        while perf_counter() < until:
+            recorder.call(caller, multi_callable, next(counter), perf_counter())
+
+    threads = [threading.Thread(target=worker, args=(callables[i % len(callables)],), daemon=True)
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _open_loop(caller: _Caller, callables: List, concurrency: int, until: float, recorder: _Recorder,
+               rps: float):
+    # latency is measured from scheduled time, so calls waiting for busy client thread are counted as slow
+    interval = 1 / rps
+    start = perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        index = 0
+        while True:
+            scheduled = start + index * interval
+            if scheduled >= until:
+                break
+            delay = scheduled - perf_counter()
+            if delay > 0:
+                sleep(delay)
+            executor.submit(recorder.call, caller, callables[index % len(callables)], index, scheduled)
+            index += 1
+
+
+def bench_method(
+        target: str,
+        method_meta: MethodMetaData,
+        requests: Sequence,
+        mode: str = CLOSED_LOOP,
+        duration: float = 10,
+        warmup: float = 0,
+        channels: int = 1,
+        concurrency: int = 1,
+        rps: float = None,
+        stream_messages: int = 10,
+        timeout: float = 10,
+) -> BenchResult:
+    """
+    call method of server at `target` for `duration` seconds.
+
+    :param mode: 'closed' runs `concurrency` callers which send next call as soon as previous one ends,
+                 'open' sends `rps` calls per second whether previous calls end or not
+    :param channels: calls are spread to this number of grpc channels (http2 connections)
+    :param stream_messages: number of request messages of stream request call
+    """
+    if mode == OPEN_LOOP and not rps:
+        raise ValueError('open loop mode needs rps')
+    caller = _Caller(method_meta, requests, stream_messages, timeout)
+    # local subchannel pool makes each channel use its own connection
+    opened = [grpc.insecure_channel(target, options=[('grpc.use_local_subchannel_pool', 1)])
+              for _ in range(channels)]
+    try:
+        for channel in opened:
+            grpc.channel_ready_future(channel).result(timeout=timeout)
+        callables = [caller.multi_callable(channel) for channel in opened]
+        if warmup:
+            _closed_loop(caller, callables, concurrency, perf_counter() + warmup, _Recorder())
+
+        recorder = _Recorder()
+        started = perf_counter()
+        if mode == OPEN_LOOP:
+            _open_loop(caller, callables, concurrency, started + duration, recorder, rps)
+        else:
+            _closed_loop(caller, callables, concurrency, started + duration, recorder)
+        elapsed = perf_counter() - started
+    finally:
+        for channel in opened:
+            channel.close()
+
+    return BenchResult(
+        method=method_key(method_meta),
+        method_type=method_meta.method_type.value,
+        mode=mode,
+        channels=channels,
+        concurrency=concurrency,
+        rps=rps if mode == OPEN_LOOP else None,
+        duration=elapsed,
+        calls=len(recorder.latencies),
+        messages=recorder.messages,
+        errors=dict(recorder.errors),
+        throughput=len(recorder.latencies) / elapsed,
+        latency=summarize(recorder.latencies),
+    )
+
+
+def free_port(host: str = '127.0.0.1') -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def _serve_app(app, host: str, port: int, worker: int):
+    from .aio.app import BaseAsyncApp
+    from .prefork import serve, serve_async
+
+    if isinstance(app, BaseAsyncApp):
+        from .aio.server import AsyncServer
+        asyncio.run(serve_async(AsyncServer(app, host, port, worker)))
+    else:
+        from .server import Server
+        serve(Server(app, host, port, worker))
+
+
+@contextmanager
+def local_server(app, worker: int = 10, host: str = '127.0.0.1', port: int = None) -> Iterator[str]:
+    """
+    run app in forked process, so client threads of benchmark do not share GIL with server.
+    it yields target address of server. fork it before any grpc channel is made in this process.
+    """
+    port = port or free_port(host)
+    process = multiprocessing.get_context('fork').Process(
+        target=_serve_app, args=(app, host, port, worker), daemon=True)
+    process.start()
+    try:
+        yield f'{host}:{port}'
+    finally:
+        process.terminate()
+        process.join(5)
+
+
+def bench_app(
+        app,
+        target: str = None,
+        methods: Sequence[str] = None,
+        payloads: Dict[str, List[dict]] = None,
+        worker: int = 10,
+        string_size: int = 16,
+        repeated_size: int = 4,
+        **kwargs,
+) -> List[BenchResult]:
+    """
+    bench each method of app one by one.
+    it runs app in local server unless `target` is given. other kwargs are options of `bench_method`.
+
+    :param payloads: request dicts by method (see `load_payloads`), other methods get generated payload
+    """
+    payloads = payloads or {}
+    metas = find_methods(app, methods)
+    requests = {
+        method_key(meta): [parse_to_dict(meta.input_type, item) for item in payloads[method_key(meta)]]
+        if method_key(meta) in payloads else [make_payload(meta.input_type, string_size, repeated_size)]
+        for meta in metas
+    }
+
+    def run(address: str) -> List[BenchResult]:
+        return [bench_method(address, meta, requests[method_key(meta)], **kwargs) for meta in metas]
+
+    if target:
+        return run(target)
+    with local_server(app, worker) as address:
+        return run(address)
+
+
+def report(results: Sequence[BenchResult], **info) -> Dict[str, Any]:
+    """json serializable report of results, for regression tracking"""
+    from . import __version__
+
+    return {
+        'homi': __version__,
+        'grpc': grpc.__version__,
+        'python': platform.python_version(),
+        'timestamp': time(),
+        **info,
+        'results': [result.to_dict() for result in results],
+    }
+
+
+def format_result(result: BenchResult) -> str:
+    latency = ' '.join(f'{name}={result.latency[name]:.2f}ms' for name, _ in PERCENTILES)
+    errors = sum(result.errors.values())
+    return (f'{result.method} [{result.method_type}] {result.throughput:.1f} calls/s '
+            f'calls={result.calls} errors={errors} {latency}')
@@ -0,0 +1,146 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, FrozenSet, Hashable, NamedTuple, Optional, Sequence, Tuple
+
+import grpc
+
+
+def canonical_request(request) -> bytes:
+    """
+    deterministic serialization of request message. requests which are equal as messages have same bytes,
+    even if client serialized them with other field order or encoding
+    """
+    return request.SerializeToString(deterministic=True)
+
+
+def make_request_key(request: bytes, metadata=None, metadata_keys: FrozenSet[str] = frozenset()) -> Hashable:
+    if not metadata_keys:
+        return request
+    return request, tuple((k, v) for k, v in (metadata or ()) if k in metadata_keys)
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    size: int
+
+
+class LRU:
+    """
+    response cache for unary-unary method.
+    key is canonical serialized request (and values of `metadata_keys`, see `canonical_request`),
+    value is serialized response bytes. so cache hit skips handler, dict conversion and serialization.
+
+    ```python
+    cache = LRU(maxsize=1024, ttl=5)
+
+    @app.method('helloworld.Greeter', cache=cache)
+    def SayHello(name, **kwargs):
+        return {"message": f"Hello {name}!"}
+    ```
+
+    :param maxsize: max number of cached responses, least recently used one is evicted first
+    :param ttl: seconds for which response is valid. None is forever
+    :param metadata_keys: invocation metadata keys which are part of cache key
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = None, metadata_keys: Sequence[str] = ()):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be positive')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.metadata_keys = frozenset(metadata_keys)
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+                size=len(self._data),
+            )
+
+    def make_key(self, request: bytes, metadata=None) -> Hashable:
+        return make_request_key(request, metadata, self.metadata_keys)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            try:
+                expire_at, value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            if expire_at is not None and expire_at <= monotonic():
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: bytes):
+        expire_at = None if self.ttl is None else monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expire_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, request, metadata=None) -> bool:
+        """
+        remove cached response of request. you can call it in handler code.
+        request can be message or bytes of `canonical_request`, metadata is `context.invocation_metadata()`
+        """
+        if not isinstance(request, bytes):
+            request = canonical_request(request)
+        with self._lock:
+            try:
+                del self._data[self.make_key(request, metadata)]
+            except KeyError:
+                return False
+            self._invalidations += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += len(self._data)
+            self._data.clear()
+
+
+def is_ok_context(context) -> bool:
+    """handler did not set error status code"""
+    try:
+        code = context.code()
+    except (AttributeError, NotImplementedError):
+        return True
+    return code is None or code == grpc.StatusCode.OK or code == 0
+
+
+def context_status(context) -> Tuple[Any, Any]:
+    """(code, details) which handler set to context, (None, None) when it is ok"""
+    if is_ok_context(context):
+        return None, None
+    try:
+        details = context.details()
+    except (AttributeError, NotImplementedError):
+        details = None
+    return context.code(), details
@@ -1,13 +1,13 @@
 import asyncio
+import json
 import sys
 from os.path import dirname
 
 import click
-from grpc_tools import protoc
 
-from homi import AsyncServer
-from . import AsyncApp
-from .exception import ServerSSLConfigError
+# modules of server mode, bench and protoc are imported when command needs them
+from .config import COMPRESSIONS, Listener, ServerOptions
+from .exception import ServerConfigError, ServerSSLConfigError
 
 
 @click.group()
@@ -19,7 +19,22 @@ def cli():
 @click.argument('file', type=click.Path(exists=True, resolve_path=True), default="app.py")
 @click.option("--host", "-h", help="The interface to bind to.")
 @click.option("--port", "-p", default='50051', help="The port to bind to.")
+@click.option('--bind', '-b', multiple=True,
+              help='Address to listen, repeatable. ADDRESS[,tls][,alts][,mode=660], e.g. unix:/run/app.sock,mode=660. '
+                   'Host and port are not used when it is set.')
 @click.option('--worker', '-w', default=10, type=int)
+@click.option('--processes', '-P', default=1, type=int,
+              help='Number of forked server processes which share the port (SO_REUSEPORT).')
+@click.option('--grace', default=None, type=float, help='Seconds for running rpc when server is stopped by SIGTERM.')
+@click.option('--max_send_message_length', type=int, help='Max size of response message (bytes).')
+@click.option('--max_receive_message_length', type=int, help='Max size of request message (bytes).')
+@click.option('--max_concurrent_rpcs', type=int, help='Reject rpc over this number with RESOURCE_EXHAUSTED.')
+@click.option('--keepalive_time_ms', type=int, help='Interval of keepalive ping.')
+@click.option('--keepalive_timeout_ms', type=int, help='Timeout of keepalive ping ack.')
+@click.option('--compression', type=click.Choice(list(COMPRESSIONS)), help='Default response compression.')
+@click.option('--metrics_port', type=int, help='Serve per method metrics at http://host:port/metrics.')
+@click.option('--plan_cache', type=click.Path(file_okay=False, resolve_path=True),
+              help='Directory where compiled message converters are kept for next start.')
 @click.option('--use_uvloop', default=True, type=bool, help="If you don't want uvloop `--uvloop false`")
 @click.option('--alts', type=bool, default=False, help='[Experimental] enable alts')
 @click.option('--private_key', '-k', type=click.Path(exists=True, resolve_path=True), help='tls private key')
@@ -36,15 +51,22 @@ def cli():
     type=bool,
     help="Server Debug Mode",
 )
-def run_command(file, port, worker, debug, alts, host=None, private_key=None, certificate=None, use_uvloop=True):
-    sys.path.append(dirname(file))
-    import importlib.util
-
-    spec = importlib.util.spec_from_file_location("app", file)
-    app_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(app_module)
+def run_command(file, port, worker, debug, alts, host=None, private_key=None, certificate=None, use_uvloop=True,
+                processes=1, grace=None, max_send_message_length=None, max_receive_message_length=None,
+                max_concurrent_rpcs=None, keepalive_time_ms=None, keepalive_timeout_ms=None, compression=None,
+                metrics_port=None, plan_cache=None, bind=()):
+    listeners = [Listener.parse(value) for value in bind]
+    if processes > 1 and any(listener.unix_path for listener in listeners):
+        raise ServerConfigError('unix socket can not be shared by --processes, each process would replace it')
+    if plan_cache:
+        from .plan_cache import PlanCache, use_plan_cache
+        cache = use_plan_cache(PlanCache(plan_cache))
+        app = load_app(file)
+        cache.save()
+    else:
+        app = load_app(file)
 
-    from .server import Server
+    from .prefork import Prefork, serve, serve_async
     if private_key and certificate:
         with open(private_key, 'rb') as f:
             private_key = f.read()
@@ -52,30 +74,119 @@ def run_command(file, port, worker, debug, alts, host=None, private_key=None, ce
             certificate = f.read()
     elif private_key or certificate:
         raise ServerSSLConfigError('if you want use tls mode, you must set both private_key & certificate value')
-    if isinstance(app_module.app, AsyncApp):
-        if use_uvloop:
-            import uvloop
-            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    reuse_port = processes > 1
+    if metrics_port is not None:
+        if processes > 1:
+            raise ServerConfigError('--metrics_port can not be used with --processes, each process has its own metrics')
+        from .metrics import Metrics, start_http_server
+        if app.metrics is None:
+            app.metrics = Metrics()
+        start_http_server(app.metrics, metrics_port, host or '')
+    # command line options override app config
+    server_options = ServerOptions.from_dict(app.config.get('server')).merge(
+        max_send_message_length=max_send_message_length,
+        max_receive_message_length=max_receive_message_length,
+        maximum_concurrent_rpcs=max_concurrent_rpcs,
+        keepalive_time_ms=keepalive_time_ms,
+        keepalive_timeout_ms=keepalive_timeout_ms,
+        compression=compression,
+    )
+
+    def run_server():
+        if is_async_app(app):
+            from .aio.server import AsyncServer
+            if use_uvloop:
+                import uvloop
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            else:
+                print('use asyncio loop (uvloop off)')
+            server = AsyncServer(
+                app,
+                host, port, worker,
+                debug=debug,
+                alts=alts,
+                private_key=private_key,
+                certificate=certificate,
+                reuse_port=reuse_port,
+                server_options=server_options,
+                listeners=listeners,
+            )
+            asyncio.run(serve_async(server, grace))
         else:
-            print('use asyncio loop (uvloop off)')
-        server = AsyncServer(
-            app_module.app,
-            host, port,
-            debug=debug,
-            alts=alts,
-            private_key=private_key,
-            certificate=certificate
-        )
-        asyncio.run(server.run())
+            from .server import Server
+            serve(Server(
+                app,
+                host, port, worker,
+                debug=debug,
+                alts=alts,
+                private_key=private_key,
+                certificate=certificate,
+                reuse_port=reuse_port,
+                server_options=server_options,
+                listeners=listeners,
+            ), grace)
+
+    if processes > 1:
+        # app is imported once, server is made in each worker after fork
+        Prefork(run_server, processes).run()
     else:
-        Server(
-            app_module.app,
-            host, port, worker,
-            debug=debug,
-            alts=alts,
-            private_key=private_key,
-            certificate=certificate
-        ).run()
+        run_server()
+
+
+def load_app(file):
+    sys.path.append(dirname(file))
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("app", file)
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+    return app_module.app
+
+
+def is_async_app(app) -> bool:
+    # module of AsyncApp is already imported by app file if it is async app
+    aio_app = sys.modules.get(f'{__package__}.aio.app')
+    return aio_app is not None and isinstance(app, aio_app.BaseAsyncApp)
+
+
+@click.command("bench", short_help="Run load test of app methods.")
+@click.argument('file', type=click.Path(exists=True, resolve_path=True), default="app.py")
+@click.option('--target', '-t', help='Address of running server (host:port). App runs in local server by default.')
+@click.option('--method', '-m', 'methods', multiple=True,
+              help='Method to call (package.Service/Method). Every method which has handler by default.')
+@click.option('--mode', type=click.Choice(['closed', 'open']), default='closed',
+              help='closed: next call is sent when previous one ends. open: calls are sent at fixed --rps.')
+@click.option('--rps', type=float, help='Calls per second of open loop mode.')
+@click.option('--duration', '-d', default=10.0, type=float, help='Seconds of load for each method.')
+@click.option('--warmup', default=1.0, type=float, help='Seconds of load before it is measured.')
+@click.option('--channels', '-n', default=1, type=int, help='Number of grpc channels (connections).')
+@click.option('--concurrency', '-c', default=10, type=int, help='Number of concurrent calls.')
+@click.option('--stream_messages', default=10, type=int, help='Number of request messages of stream request call.')
+@click.option('--payload', type=click.Path(exists=True, resolve_path=True),
+              help='Json file of request dicts to replay, {"package.Service/Method": {...} or [{...}, ...]}.')
+@click.option('--worker', '-w', default=10, type=int, help='Worker of local server.')
+@click.option('--output', '-o', type=click.Path(resolve_path=True), help='Write results to json file.')
+def bench_command(file, target, methods, mode, rps, duration, warmup, channels, concurrency, stream_messages,
+                  payload, worker, output):
+    from .bench import OPEN_LOOP, bench_app, format_result, load_payloads, report
+    if mode == OPEN_LOOP and not rps:
+        raise click.BadParameter('open loop mode needs --rps', param_hint='--rps')
+    options = dict(mode=mode, rps=rps, duration=duration, warmup=warmup, channels=channels,
+                   concurrency=concurrency, stream_messages=stream_messages)
+    results = bench_app(
+        load_app(file),
+        target=target,
+        methods=methods,
+        payloads=load_payloads(payload) if payload else None,
+        worker=worker,
+        **options,
+    )
+    for result in results:
+        click.echo(format_result(result))
+    if output:
+        with open(output, 'w', encoding='utf8') as f:
+            json.dump(report(results, target=target or 'local', **options), f, indent=2)
+
 
 @click.command("protoc", short_help="Run protoc")
 @click.argument("proto_files", nargs=-1, required=True)
@@ -83,12 +194,14 @@ def run_command(file, port, worker, debug, alts, host=None, private_key=None, ce
 @click.option('--python_out', type=click.Path(exists=True, resolve_path=True), help='The directory of *_pb2.py', default='.')
 @click.option('--grpc_python_out', type=click.Path(exists=True, resolve_path=True), help='The directory of *_grpc.py', default='.')
 def protoc_command(proto_files, proto_path, python_out, grpc_python_out):
+    from grpc_tools import protoc
     include_proto_path = [f"--proto_path={path}" for path in proto_path]
     protoc.main(
         ['grpc_tools.protoc'] + include_proto_path + [f'--python_out={python_out}', f'--grpc_python_out={grpc_python_out}'] + list(proto_files)
     )
 
 cli.add_command(run_command)
+cli.add_command(bench_command)
 cli.add_command(protoc_command)
 
 if __name__ == '__main__':
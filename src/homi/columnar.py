@@ -0,0 +1,81 @@
+from functools import partial
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Mapping
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from .converter import get_converter
+from .ndarray import FIELD_TYPES, import_numpy
+
+
+class ColumnarBatch(Mapping):
+    """
+    messages of request stream as columns. `batch['field']` is list of field value of every message,
+    column is made when it is accessed first. `batch.messages` has raw messages, `batch.size` is number of messages.
+
+    - scalar field: field value (default value if it is not set). int64 is int, enum is number.
+    - repeated scalar field: list of values of each message
+    - message, map and repeated message field: dict (list of dict) like `MessageToDict`, None if message is not set
+
+    with numpy, numeric scalar column is numpy array of dtype of field type,
+    and repeated numeric field is list of numpy arrays.
+    """
+    __slots__ = ('messages', '_fields', '_converter', '_np', '_columns')
+
+    def __init__(self, messages: List, message_class, np=None):
+        self.messages = messages
+        self._fields = message_class.DESCRIPTOR.fields_by_name
+        self._converter = get_converter(message_class)
+        self._np = np
+        self._columns: Dict[str, Any] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.messages)
+
+    def __getitem__(self, name: str):
+        try:
+            return self._columns[name]
+        except KeyError:
+            column = self._columns[name] = self._column(self._fields[name])
+            return column
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(size={self.size}, fields={list(self._fields)})'
+
+    def _column(self, field: FieldDescriptor):
+        np = self._np
+        values = list(map(attrgetter(field.name), self.messages))
+        if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+            to_dict = self._converter.field_to_dict[field.name]
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                return [to_dict(value) for value in values]
+            return [to_dict(value) if message.HasField(field.name) else None
+                    for message, value in zip(self.messages, values)]
+        dtype = FIELD_TYPES[field.type][0] if np is not None and field.type in FIELD_TYPES else None
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            if dtype is not None:
+                return [np.array(value, dtype=dtype) for value in values]
+            return [list(value) for value in values]
+        if dtype is not None:
+            return np.array(values, dtype=dtype)
+        return values
+
+
+def _parse_columnar_batch(message_class, np, items: List) -> ColumnarBatch:
+    # request is serialized when numpy option is set
+    from_string = message_class.FromString
+    return ColumnarBatch([from_string(item) for item in items], message_class, np)
+
+
+def make_columnar_batch_maker(message_class, numpy: bool = False) -> Callable[[List], ColumnarBatch]:
+    """function making `ColumnarBatch` of list of stream messages, they are serialized with numpy option"""
+    if numpy:
+        return partial(_parse_columnar_batch, message_class, import_numpy())
+    return partial(ColumnarBatch, message_class=message_class)
@@ -1,4 +1,10 @@
+import os
 from abc import ABC
+from typing import Any, List, Mapping, NamedTuple, Optional, Tuple
+
+import grpc
+
+from .exception import ServerConfigError, ServerSSLConfigError
 
 
 class BaseServiceConfig(ABC):
@@ -21,3 +27,148 @@ class MergeConfig(BaseServiceConfig):
         app_config = self.app.config.get(self.name)
         if app_config:
             self._default.update(app_config)
+
+
+COMPRESSIONS = {
+    'none': grpc.Compression.NoCompression,
+    'deflate': grpc.Compression.Deflate,
+    'gzip': grpc.Compression.Gzip,
+}
+
+# ServerOptions field: grpc channel argument
+GRPC_ARGUMENTS = {
+    'max_send_message_length': 'grpc.max_send_message_length',
+    'max_receive_message_length': 'grpc.max_receive_message_length',
+    'keepalive_time_ms': 'grpc.keepalive_time_ms',
+    'keepalive_timeout_ms': 'grpc.keepalive_timeout_ms',
+    'keepalive_permit_without_calls': 'grpc.keepalive_permit_without_calls',
+    'http2_max_pings_without_data': 'grpc.http2.max_pings_without_data',
+    'http2_min_ping_interval_without_data_ms': 'grpc.http2.min_ping_interval_without_data_ms',
+    'http2_max_ping_strikes': 'grpc.http2.max_ping_strikes',
+    'http2_stream_lookahead_bytes': 'grpc.http2.lookahead_bytes',
+    'http2_bdp_probe': 'grpc.http2.bdp_probe',
+    'http2_max_frame_size': 'grpc.http2.max_frame_size',
+    'max_concurrent_streams': 'grpc.max_concurrent_streams',
+}
+
+
+class ServerOptions(NamedTuple):
+    """
+    grpc server tuning options of `Server`, `AsyncServer`.
+    None means grpc default. you can set it in app config too, `App(config={'server': {...}})`
+
+    :param maximum_concurrent_rpcs: max number of running rpc, server rejects more rpc with RESOURCE_EXHAUSTED
+    :param compression: default response compression, one of 'none', 'deflate', 'gzip'
+    :param http2_stream_lookahead_bytes: http2 flow-control window of stream
+    :param http2_bdp_probe: let grpc resize flow-control window by bandwidth-delay product
+    :param extra_options: other grpc channel arguments, `(('grpc.key', value),)`
+    """
+    max_send_message_length: Optional[int] = None
+    max_receive_message_length: Optional[int] = None
+    keepalive_time_ms: Optional[int] = None
+    keepalive_timeout_ms: Optional[int] = None
+    keepalive_permit_without_calls: Optional[bool] = None
+    http2_max_pings_without_data: Optional[int] = None
+    http2_min_ping_interval_without_data_ms: Optional[int] = None
+    http2_max_ping_strikes: Optional[int] = None
+    http2_stream_lookahead_bytes: Optional[int] = None
+    http2_bdp_probe: Optional[bool] = None
+    http2_max_frame_size: Optional[int] = None
+    max_concurrent_streams: Optional[int] = None
+    maximum_concurrent_rpcs: Optional[int] = None
+    compression: Optional[str] = None
+    extra_options: Tuple[Tuple[str, Any], ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any] = None) -> 'ServerOptions':
+        data = data or {}
+        unknown = set(data) - set(cls._fields)
+        if unknown:
+            raise ServerConfigError(f'unknown server options: {", ".join(sorted(unknown))}')
+        options = cls(**data)
+        if options.compression is not None and options.compression not in COMPRESSIONS:
+            raise ServerConfigError(f'compression must be one of {", ".join(COMPRESSIONS)}')
+        return options
+
+    def merge(self, **kwargs) -> 'ServerOptions':
+        """new options updated by not None values"""
+        return self.from_dict({**self._asdict(), **{k: v for k, v in kwargs.items() if v is not None}})
+
+    @property
+    def grpc_options(self) -> List[Tuple[str, Any]]:
+        options = []
+        for field, argument in GRPC_ARGUMENTS.items():
+            value = getattr(self, field)
+            if value is not None:
+                options.append((argument, int(value)))
+        options.extend(tuple(option) for option in self.extra_options)
+        return options
+
+    @property
+    def grpc_compression(self) -> Optional[grpc.Compression]:
+        return None if self.compression is None else COMPRESSIONS[self.compression]
+
+
+class Listener(NamedTuple):
+    """
+    address which server listens. server can have many listeners, e.g. unix socket for sidecar on same host
+    and tls port for others, `Server(app, listeners=[Listener('unix:/run/app.sock', mode=0o660), ...])`
+
+    :param address: `host:port`, `unix:relative/path`, `unix:///absolute/path` or `unix-abstract:name`
+    :param tls: use tls with `private_key`, `certificate` of server
+    :param alts: [Experimental] use alts
+    :param mode: permission of unix socket file, e.g. `0o660`
+    """
+    address: str
+    tls: bool = False
+    alts: bool = False
+    mode: Optional[int] = None
+
+    @classmethod
+    def parse(cls, value: str) -> 'Listener':
+        """listener of `--bind` option, `ADDRESS[,tls][,alts][,mode=660]`"""
+        address, *flags = value.split(',')
+        options = {}
+        for flag in flags:
+            name, _, mode = flag.partition('=')
+            if flag in ('tls', 'alts'):
+                options[flag] = True
+            elif name == 'mode' and mode:
+                try:
+                    options['mode'] = int(mode, 8)
+                except ValueError:
+                    raise ServerConfigError(f'mode of listener must be octal number, not {mode}')
+            else:
+                raise ServerConfigError(f'unknown listener option {flag} of {value}')
+        return cls(address, **options).validate()
+
+    def validate(self) -> 'Listener':
+        if self.tls and self.alts:
+            raise ServerConfigError(f'listener {self.address} can not use both tls and alts')
+        if self.mode is not None and self.unix_path is None:
+            raise ServerConfigError(f'mode is permission of unix socket file, {self.address} is not unix socket path')
+        return self
+
+    @property
+    def unix_path(self) -> Optional[str]:
+        """file path of unix socket, None if it is not unix socket or it is abstract socket"""
+        if self.address.startswith('unix://'):
+            return self.address[len('unix://'):]
+        if self.address.startswith('unix:'):
+            return self.address[len('unix:'):]
+        return None
+
+    def add_to(self, server, ssl_credentials: grpc.ServerCredentials = None) -> int:
+        """bind to grpc server (sync or aio) and return port"""
+        if self.alts:
+            port = server.add_secure_port(self.address, grpc.alts_server_credentials())
+        elif self.tls:
+            if ssl_credentials is None:
+                raise ServerSSLConfigError(f'tls listener {self.address} needs private_key and certificate of server')
+            port = server.add_secure_port(self.address, ssl_credentials)
+        else:
+            port = server.add_insecure_port(self.address)
+        if self.mode is not None:
+            # socket file is made when port is added
+            os.chmod(self.unix_path, self.mode)
+        return port
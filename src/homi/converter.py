@@ -0,0 +1,595 @@
+"""
+compiled converters between protobuf message and dict.
+
+`json_format.MessageToDict` and `json_format.ParseDict` walk descriptors through reflection on every call.
+this module generates python code once per message type, and the generated functions give same result as
+`json_format.MessageToDict(message, preserving_proto_field_name=True)` and `json_format.ParseDict(js, message)`.
+
+from_dict only runs fast path for plain python values (int, float, str, list, dict ...).
+if it meets anything else (null, quoted number, unknown key ...) it falls back to `json_format.ParseDict`,
+so the result and the raised error are always same as json_format.
+
+builder is simpler. it assigns dict value to message field directly without any json style coercion.
+`BUILD_STRICT` builder rejects unknown key, `BUILD_FAST` builder skips all validation.
+"""
+import base64
+import keyword
+import math
+import re
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from google.protobuf import json_format
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.internal.type_checkers import ToShortestFloat
+
+from .exception import MessageBuildError
+
+WELL_KNOWN_TYPES = frozenset([
+    'google.protobuf.Any',
+    'google.protobuf.Duration',
+    'google.protobuf.FieldMask',
+    'google.protobuf.ListValue',
+    'google.protobuf.Struct',
+    'google.protobuf.Timestamp',
+    'google.protobuf.Value',
+    'google.protobuf.DoubleValue',
+    'google.protobuf.FloatValue',
+    'google.protobuf.Int64Value',
+    'google.protobuf.UInt64Value',
+    'google.protobuf.Int32Value',
+    'google.protobuf.UInt32Value',
+    'google.protobuf.BoolValue',
+    'google.protobuf.StringValue',
+    'google.protobuf.BytesValue',
+])
+
+_INT_TYPES = frozenset([
+    FieldDescriptor.CPPTYPE_INT32,
+    FieldDescriptor.CPPTYPE_UINT32,
+    FieldDescriptor.CPPTYPE_INT64,
+    FieldDescriptor.CPPTYPE_UINT64,
+])
+_INT64_TYPES = frozenset([FieldDescriptor.CPPTYPE_INT64, FieldDescriptor.CPPTYPE_UINT64])
+
+BUILD_STRICT = 'strict'
+BUILD_FAST = 'fast'
+
+_FLOAT_MAX = 3.4028234663852886e+38
+_FLOAT_MIN = -_FLOAT_MAX
+_UNPAIRED_SURROGATE_PATTERN = re.compile(
+    u'[\ud800-\udbff](?![\udc00-\udfff])|(?<![\ud800-\udbff])[\udc00-\udfff]')
+
+
+# `homi.plan_cache.PlanCache` which keeps compiled code on disk, set by `use_plan_cache`
+plan_cache = None
+
+
+class _Fallback(Exception):
+    pass
+
+
+class MessageConverter(NamedTuple):
+    to_dict: Callable[[Any], Dict]
+    from_dict: Callable[[Dict], Any]
+    # convert a value from `message.ListFields()`, keyed by field name
+    field_to_dict: Dict[str, Callable[[Any], Any]]
+    # read one field from message, same as `MessageToDict(message).get(name)`, keyed by field name
+    field_getters: Dict[str, Callable[[Any], Any]]
+
+
+def is_well_known_type(descriptor: Descriptor) -> bool:
+    return descriptor.full_name in WELL_KNOWN_TYPES
+
+
+def is_map_field(field: FieldDescriptor) -> bool:
+    if field.type != FieldDescriptor.TYPE_MESSAGE:
+        return False
+    return field.message_type.has_options and field.message_type.GetOptions().map_entry
+
+
+def has_presence(field: FieldDescriptor) -> bool:
+    if field.label == FieldDescriptor.LABEL_REPEATED:
+        return False
+    if hasattr(field, 'has_presence'):
+        return field.has_presence
+    if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE or field.containing_oneof is not None:
+        return True
+    return field.file.syntax == 'proto2'
+
+
+def _attr(obj: str, name: str) -> str:
+    if name.isidentifier() and not keyword.iskeyword(name):
+        return f'{obj}.{name}'
+    return f'getattr({obj}, {name!r})'
+
+
+def _double_to_json(value):
+    if math.isinf(value):
+        return '-Infinity' if value < 0.0 else 'Infinity'
+    return 'NaN'
+
+
+def _float_to_json(value):
+    if math.isfinite(value):
+        return ToShortestFloat(value)
+    return _double_to_json(value)
+
+
+def _bytes_to_json(value):
+    return base64.b64encode(value).decode('utf-8')
+
+
+def _bytes_from_json(value):
+    if type(value) is str:
+        encoded = value.encode('utf-8')
+    elif type(value) is bytes:
+        encoded = value
+    else:
+        raise _Fallback
+    return base64.urlsafe_b64decode(encoded + b'=' * (4 - len(encoded) % 4))
+
+
+def _enum_from_json(names: Dict[str, int], numbers: frozenset, open_enum: bool, value):
+    if type(value) is str:
+        try:
+            return names[value]
+        except KeyError:
+            raise _Fallback
+    if type(value) is int and (open_enum or value in numbers):
+        return value
+    raise _Fallback
+
+
+def _well_known_to_dict(message):
+    return json_format.MessageToDict(message, preserving_proto_field_name=True)
+
+
+class _Namespace:
+    """globals of one generated module"""
+
+    def __init__(self):
+        self.globals: Dict[str, Any] = {
+            '_Fallback': _Fallback,
+            '_FLOAT_MAX': _FLOAT_MAX,
+            '_FLOAT_MIN': _FLOAT_MIN,
+            '_isfinite': math.isfinite,
+            '_double_to_json': _double_to_json,
+            '_float_to_json': _float_to_json,
+            '_bytes_to_json': _bytes_to_json,
+            '_bytes_from_json': _bytes_from_json,
+            '_surrogate': _UNPAIRED_SURROGATE_PATTERN.search,
+            '_well_known_to_dict': _well_known_to_dict,
+            '_parse_dict': json_format.ParseDict,
+        }
+        # (global name, descriptor) of nested message functions. bound after exec for recursive message
+        self.to_dict_refs: List = []
+        self.fill_refs: List = []
+        self.builder_refs: List = []
+
+    def add(self, prefix: str, value) -> str:
+        name = f'{prefix}{len(self.globals)}'
+        self.globals[name] = value
+        return name
+
+    def to_dict_ref(self, descriptor: Descriptor) -> str:
+        name = f'_to_dict_{len(self.to_dict_refs)}'
+        self.to_dict_refs.append((name, descriptor))
+        return name
+
+    def fill_ref(self, descriptor: Descriptor) -> str:
+        name = f'_fill_{len(self.fill_refs)}'
+        self.fill_refs.append((name, descriptor))
+        return name
+
+    def builder_ref(self, descriptor: Descriptor, strict: bool) -> str:
+        name = f'_build_{len(self.builder_refs)}'
+        self.builder_refs.append((name, descriptor, strict))
+        return name
+
+    def execute(self, source: str, descriptor: Descriptor):
+        filename = f'<homi.converter {descriptor.full_name}>'
+        if plan_cache is None:
+            code = compile(source, filename, 'exec')
+        else:
+            code = plan_cache.compile(source, filename, descriptor.file)
+        exec(code, self.globals)
+        return self.globals
+
+    def bind_refs(self):
+        for name, descriptor in self.to_dict_refs:
+            self.globals[name] = _compile_to_dict(descriptor)
+        for name, descriptor in self.fill_refs:
+            self.globals[name] = _compile_fill(descriptor)
+        for name, descriptor, strict in self.builder_refs:
+            self.globals[name] = _compile_builder(descriptor, strict)
+
+
+# to dict
+
+def _value_to_dict(ns: _Namespace, field: FieldDescriptor, var: str) -> str:
+    """python expression converting single value `var` of field"""
+    cpp_type = field.cpp_type
+    if cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+        if is_well_known_type(field.message_type):
+            return f'_well_known_to_dict({var})'
+        return f'{ns.to_dict_ref(field.message_type)}({var})'
+    elif cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+        if field.enum_type.full_name == 'google.protobuf.NullValue':
+            return 'None'
+        names = ns.add('_enum_', {v.number: v.name for v in field.enum_type.values})
+        return f'{names}.get({var}, {var})'
+    elif field.type == FieldDescriptor.TYPE_BYTES:
+        return f'_bytes_to_json({var})'
+    elif cpp_type in _INT64_TYPES:
+        return f'str({var})'
+    elif cpp_type == FieldDescriptor.CPPTYPE_DOUBLE:
+        return f'({var} if _isfinite({var}) else _double_to_json({var}))'
+    elif cpp_type == FieldDescriptor.CPPTYPE_FLOAT:
+        return f'_float_to_json({var})'
+    return var
+
+
+def _field_to_dict(ns: _Namespace, field: FieldDescriptor, var: str) -> str:
+    """python expression converting whole field value `var`"""
+    if is_map_field(field):
+        key_field = field.message_type.fields_by_name['key']
+        value_field = field.message_type.fields_by_name['value']
+        if key_field.cpp_type == FieldDescriptor.CPPTYPE_BOOL:
+            key = "('true' if k else 'false')"
+        elif key_field.cpp_type == FieldDescriptor.CPPTYPE_STRING:
+            key = 'k'
+        else:
+            key = 'str(k)'
+        return f'{{{key}: {_value_to_dict(ns, value_field, f"{var}[k]")} for k in {var}}}'
+    elif field.label == FieldDescriptor.LABEL_REPEATED:
+        item = _value_to_dict(ns, field, 'x')
+        return f'list({var})' if item == 'x' else f'[{item} for x in {var}]'
+    return _value_to_dict(ns, field, var)
+
+
+def _to_dict_source(ns: _Namespace, descriptor: Descriptor):
+    """source of `to_dict`, and converter and getter functions per field"""
+    lines = ['def to_dict(msg):', '    d = {}']
+    field_lines = []
+    field_funcs = {}
+    for idx, field in enumerate(sorted(descriptor.fields, key=lambda f: f.number)):
+        key = repr(field.name)
+        if has_presence(field):
+            read = [f'    if msg.HasField({key}):',
+                    f'        v = {_attr("msg", field.name)}']
+        else:
+            read = [f'    v = {_attr("msg", field.name)}',
+                    '    if v:']
+        expr = _field_to_dict(ns, field, 'v')
+        lines += read + [f'        d[{key}] = {expr}']
+        field_funcs[field.name] = (f'field_{idx}', f'get_{idx}')
+        field_lines += [f'def field_{idx}(v):', f'    return {expr}',
+                        f'def get_{idx}(msg):'] + read + [f'        return {expr}']
+    lines.append('    return d')
+    return '\n'.join(lines + field_lines) + '\n', field_funcs
+
+
+_to_dict_cache: Dict[Descriptor, Callable] = {}
+# (field_to_dict, field_getters) of message
+_field_funcs_cache: Dict[Descriptor, Tuple[Dict[str, Callable], Dict[str, Callable]]] = {}
+
+
+def _compile_to_dict(descriptor: Descriptor) -> Callable:
+    try:
+        return _to_dict_cache[descriptor]
+    except KeyError:
+        pass
+    if is_well_known_type(descriptor) or descriptor.is_extendable:
+        _field_funcs_cache[descriptor] = ({}, {})
+        func = _to_dict_cache[descriptor] = _well_known_to_dict
+        return func
+    ns = _Namespace()
+    source, field_funcs = _to_dict_source(ns, descriptor)
+    namespace = ns.execute(source, descriptor)
+    # register before binding nested functions, for recursive message
+    _field_funcs_cache[descriptor] = (
+        {name: namespace[func] for name, (func, _) in field_funcs.items()},
+        {name: namespace[getter] for name, (_, getter) in field_funcs.items()},
+    )
+    func = _to_dict_cache[descriptor] = namespace['to_dict']
+    ns.bind_refs()
+    return func
+
+
+# from dict
+
+def _value_from_dict(ns: _Namespace, field: FieldDescriptor, var: str, indent: str):
+    """(check lines, expression) converting single scalar value `var` of field"""
+    cpp_type = field.cpp_type
+    if cpp_type in _INT_TYPES:
+        # json_format accepts quoted integer without space, which is how MessageToDict writes 64bit integer
+        return [f'{indent}if type({var}) is not int:',
+                f'{indent}    if type({var}) is not str or " " in {var}: raise _Fallback',
+                f'{indent}    {var} = int({var})'], var
+    elif cpp_type in (FieldDescriptor.CPPTYPE_DOUBLE, FieldDescriptor.CPPTYPE_FLOAT):
+        finite = f'_isfinite({var})'
+        if cpp_type == FieldDescriptor.CPPTYPE_FLOAT:
+            finite += f' and _FLOAT_MIN <= {var} <= _FLOAT_MAX'
+        # quoted float like "Infinity" is how MessageToDict writes non finite number
+        return [f'{indent}if type({var}) is str:',
+                f'{indent}    if {var} == "nan": raise _Fallback',
+                f'{indent}    {var} = float({var})',
+                f'{indent}elif type({var}) is not float and type({var}) is not int or not ({finite}): raise _Fallback'
+                ], var
+    elif cpp_type == FieldDescriptor.CPPTYPE_BOOL:
+        return [f'{indent}if type({var}) is not bool: raise _Fallback'], var
+    elif field.type == FieldDescriptor.TYPE_BYTES:
+        return [], f'_bytes_from_json({var})'
+    elif cpp_type == FieldDescriptor.CPPTYPE_STRING:
+        return [f'{indent}if type({var}) is not str or (not {var}.isascii() and _surrogate({var})): '
+                'raise _Fallback'], var
+    elif cpp_type == FieldDescriptor.CPPTYPE_ENUM:
+        if field.enum_type.full_name == 'google.protobuf.NullValue':
+            return [f'{indent}raise _Fallback'], var
+        parser = ns.add('_enum_', partial(
+            _enum_from_json,
+            {v.name: v.number for v in field.enum_type.values},
+            frozenset(v.number for v in field.enum_type.values),
+            field.file.syntax == 'proto3',
+        ))
+        return [], f'{parser}({var})'
+    raise ValueError(f'{field.full_name} is not scalar field')
+
+
+def _message_from_dict(ns: _Namespace, descriptor: Descriptor, var: str, target: str, indent: str) -> List[str]:
+    if is_well_known_type(descriptor):
+        return [f'{indent}_parse_dict({var}, {target})']
+    return [f'{indent}if type({var}) is not dict: raise _Fallback',
+            f'{indent}{ns.fill_ref(descriptor)}({var}, {target})']
+
+
+def _setter_source(ns: _Namespace, field: FieldDescriptor, func_name: str, has_alias: bool) -> List[str]:
+    attr = _attr('msg', field.name)
+    lines = [f'def {func_name}(msg, x):']
+    if is_map_field(field):
+        key_field = field.message_type.fields_by_name['key']
+        value_field = field.message_type.fields_by_name['value']
+        lines.append('    if type(x) is not dict: raise _Fallback')
+        if has_alias:
+            lines.append(f'    msg.ClearField({field.name!r})')
+        lines.append(f'    m = {attr}')
+        lines.append('    for k, v in x.items():')
+        if key_field.cpp_type == FieldDescriptor.CPPTYPE_BOOL:
+            lines.append("        k = True if k == 'true' else False if k == 'false' else _bool_key_error()")
+            ns.globals['_bool_key_error'] = _raise_fallback
+        else:
+            check, k = _value_from_dict(ns, key_field, 'k', '        ')
+            lines += check
+        if value_field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+            lines += _message_from_dict(ns, value_field.message_type, 'v', 'm[k]', '        ')
+        else:
+            check, value = _value_from_dict(ns, value_field, 'v', '        ')
+            lines += check + [f'        m[k] = {value}']
+    elif field.label == FieldDescriptor.LABEL_REPEATED:
+        lines += ['    if type(x) is not list: raise _Fallback']
+        if has_alias:
+            lines.append(f'    msg.ClearField({field.name!r})')
+        if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+            lines += [f'    add = {attr}.add',
+                      '    for v in x:']
+            lines += _message_from_dict(ns, field.message_type, 'v', 'add()', '        ')
+        else:
+            check, value = _value_from_dict(ns, field, 'v', '        ')
+            if check:
+                lines += ['    values = []',
+                          '    for v in x:']
+                lines += check
+                lines += [f'        values.append({value})',
+                          f'    {attr}.extend(values)']
+            elif value == 'v':
+                lines.append(f'    {attr}.extend(x)')
+            else:
+                lines.append(f'    {attr}.extend([{value} for v in x])')
+    elif field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+        lines += [f'    sub = {attr}',
+                  '    sub.SetInParent()']
+        lines += _message_from_dict(ns, field.message_type, 'x', 'sub', '    ')
+    else:
+        check, value = _value_from_dict(ns, field, 'x', '    ')
+        lines += check
+        if field.name.isidentifier() and not keyword.iskeyword(field.name):
+            lines.append(f'    {attr} = {value}')
+        else:
+            lines.append(f'    setattr(msg, {field.name!r}, {value})')
+    return lines
+
+
+def _raise_fallback():
+    raise _Fallback
+
+
+def _fill_source(ns: _Namespace, descriptor: Descriptor) -> str:
+    lines = []
+    setters = {}
+    for idx, field in enumerate(descriptor.fields):
+        func_name = f'set_{idx}'
+        has_alias = field.json_name != field.name
+        lines += _setter_source(ns, field, func_name, has_alias)
+        setters[repr(field.name)] = func_name
+        if has_alias:
+            setters[repr(field.json_name)] = func_name
+    lines.append('_setters = {%s}' % ', '.join(f'{k}: {v}' for k, v in setters.items()))
+
+    lines += ['def fill(js, msg):',
+              '    setters = _setters',
+              '    for key, x in js.items():',
+              '        if key not in setters: raise _Fallback',
+              '        setters[key](msg, x)']
+    oneofs = [
+        frozenset(k for f in oneof.fields for k in {f.name, f.json_name})
+        for oneof in descriptor.oneofs
+    ]
+    if oneofs:
+        # json_format does not allow multiple fields of one oneof
+        lines += [f'    for keys in {ns.add("_oneof_", oneofs)}:',
+                  '        if len(keys.intersection(js)) > 1: raise _Fallback']
+    return '\n'.join(lines) + '\n'
+
+
+_fill_cache: Dict[Descriptor, Callable] = {}
+
+
+def _compile_fill(descriptor: Descriptor) -> Callable:
+    try:
+        return _fill_cache[descriptor]
+    except KeyError:
+        pass
+    if is_well_known_type(descriptor) or descriptor.is_extendable:
+        func = _fill_cache[descriptor] = json_format.ParseDict
+        return func
+    ns = _Namespace()
+    namespace = ns.execute(_fill_source(ns, descriptor), descriptor)
+    func = _fill_cache[descriptor] = namespace['fill']
+    ns.bind_refs()
+    return func
+
+
+def _make_from_dict(message_class, fill: Callable):
+    def from_dict(js: Dict):
+        message = message_class()
+        try:
+            fill(js, message)
+        except Exception:
+            return json_format.ParseDict(js, message_class())
+        return message
+
+    return from_dict
+
+
+# builder
+
+def _builder_setter_source(ns: _Namespace, field: FieldDescriptor, func_name: str, strict: bool) -> List[str]:
+    attr = _attr('msg', field.name)
+    lines = [f'def {func_name}(msg, x):']
+    if is_map_field(field):
+        value_field = field.message_type.fields_by_name['value']
+        if value_field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+            build = ns.builder_ref(value_field.message_type, strict)
+            lines += [f'    m = {attr}',
+                      '    for k, v in x.items():',
+                      f'        if type(v) is dict: {build}(v, m[k])',
+                      '        else: m[k].CopyFrom(v)']
+        else:
+            lines.append(f'    {attr}.update(x)')
+    elif field.label == FieldDescriptor.LABEL_REPEATED:
+        if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+            build = ns.builder_ref(field.message_type, strict)
+            lines += [f'    c = {attr}',
+                      '    for v in x:',
+                      f'        if type(v) is dict: {build}(v, c.add())',
+                      '        else: c.append(v)']
+        else:
+            lines.append(f'    {attr}.extend(x)')
+    elif field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+        build = ns.builder_ref(field.message_type, strict)
+        lines += [f'    sub = {attr}',
+                  '    if type(x) is dict:',
+                  '        sub.SetInParent()',
+                  f'        {build}(x, sub)',
+                  '    else:',
+                  '        sub.CopyFrom(x)']
+    elif field.name.isidentifier() and not keyword.iskeyword(field.name):
+        lines.append(f'    {attr} = x')
+    else:
+        lines.append(f'    setattr(msg, {field.name!r}, x)')
+    return lines
+
+
+def _builder_error(descriptor: Descriptor, key, error: Exception = None):
+    if error is None:
+        message = f'{descriptor.full_name} has no field named {key!r}'
+    else:
+        message = f'can not set {descriptor.full_name}.{key}: {error}'
+    raise MessageBuildError(message) from error
+
+
+def _builder_source(ns: _Namespace, descriptor: Descriptor, strict: bool) -> str:
+    lines = []
+    setters = {}
+    for idx, field in enumerate(descriptor.fields):
+        func_name = f'set_{idx}'
+        lines += _builder_setter_source(ns, field, func_name, strict)
+        setters[repr(field.name)] = func_name
+    lines.append('_setters = {%s}' % ', '.join(f'{k}: {v}' for k, v in setters.items()))
+    lines += ['def build(d, msg):',
+              '    setters = _setters',
+              '    for key, x in d.items():']
+    if strict:
+        ns.globals['_error'] = partial(_builder_error, descriptor)
+        lines += ['        if key not in setters: _error(key)',
+                  '        if x is None: continue',
+                  '        try:',
+                  '            setters[key](msg, x)',
+                  '        except (TypeError, ValueError, AttributeError) as e:',
+                  '            _error(key, e)']
+    else:
+        lines += ['        setters[key](msg, x)']
+    return '\n'.join(lines) + '\n'
+
+
+_builder_cache: Dict[Tuple[Descriptor, bool], Callable] = {}
+_builders: Dict[Tuple[Any, str], Callable] = {}
+
+
+def _compile_builder(descriptor: Descriptor, strict: bool) -> Callable:
+    try:
+        return _builder_cache[(descriptor, strict)]
+    except KeyError:
+        pass
+    ns = _Namespace()
+    namespace = ns.execute(_builder_source(ns, descriptor, strict), descriptor)
+    func = _builder_cache[(descriptor, strict)] = namespace['build']
+    ns.bind_refs()
+    return func
+
+
+def get_builder(message_class, mode: str = BUILD_STRICT) -> Callable[[Dict], Any]:
+    """
+    get compiled builder which makes protobuf message from dict by direct field assignment.
+    value can be python value or protobuf message for message field.
+
+    :param mode: `BUILD_STRICT` rejects unknown key and wraps wrong value error to `MessageBuildError`,
+                 `BUILD_FAST` skips all validation
+    """
+    try:
+        return _builders[(message_class, mode)]
+    except KeyError:
+        pass
+    if mode not in (BUILD_STRICT, BUILD_FAST):
+        raise ValueError(f'builder mode must be {BUILD_STRICT!r} or {BUILD_FAST!r}, not {mode!r}')
+    build_into = _compile_builder(message_class.DESCRIPTOR, mode == BUILD_STRICT)
+
+    def build(d: Dict):
+        message = message_class()
+        build_into(d, message)
+        return message
+
+    _builders[(message_class, mode)] = build
+    return build
+
+
+_converters: Dict[Any, MessageConverter] = {}
+
+
+def get_converter(message_class) -> MessageConverter:
+    """get compiled converter of protobuf message class. converter is compiled only once per message type"""
+    try:
+        return _converters[message_class]
+    except KeyError:
+        pass
+    descriptor = message_class.DESCRIPTOR
+    to_dict = _compile_to_dict(descriptor)
+    field_to_dict, field_getters = _field_funcs_cache[descriptor]
+    converter = _converters[message_class] = MessageConverter(
+        to_dict=to_dict,
+        from_dict=_make_from_dict(message_class, _compile_fill(descriptor)),
+        field_to_dict=field_to_dict,
+        field_getters=field_getters,
+    )
+    return converter
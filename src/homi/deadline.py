@@ -0,0 +1,32 @@
+import threading
+from collections import Counter
+from typing import Dict
+
+
+class ExpiredCalls:
+    """count of calls dropped because client deadline passed before handler ran, by method path"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def add(self, method: str):
+        with self._lock:
+            self._counts[method] += 1
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+expired_calls = ExpiredCalls()
+
+
+def is_expired(context) -> bool:
+    remaining = context.time_remaining()
+    return remaining is not None and remaining <= 0
@@ -21,6 +21,10 @@ class ProtobufError(HomiException):
     pass
 
 
+class MessageBuildError(ProtobufError):
+    pass
+
+
 class ServiceNotFound(ProtobufError):
     def __init__(self, service_name, available_services: Iterator[str] = None, **kwargs):
         self.fail_service = service_name
@@ -0,0 +1,280 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import grpc
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# stage of handling rpc
+DESERIALIZE = 'deserialize'
+TO_DICT = 'to_dict'
+HANDLER = 'handler'
+FROM_DICT = 'from_dict'
+SERIALIZE = 'serialize'
+
+HELP = {
+    'homi_requests_total': ('counter', 'Finished rpc by method and status code.'),
+    'homi_request_seconds': ('histogram', 'Latency of rpc handling by method.'),
+    'homi_stage_seconds': ('histogram', 'Latency of rpc handling stage by method.'),
+    'homi_request_bytes': ('histogram', 'Size of request message by method.'),
+    'homi_response_bytes': ('histogram', 'Size of response message by method.'),
+    'homi_expired_total': ('counter', 'Rpc dropped because client deadline passed before handler ran.'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def code_name(code) -> str:
+    if code is None:
+        return 'OK'
+    if isinstance(code, grpc.StatusCode):
+        return code.name
+    for status in grpc.StatusCode:
+        if status.value[0] == code:
+            return status.name
+    return str(code)
+
+
+class Metrics:
+    """
+    per method rpc metrics, it is exported in prometheus text format.
+    every thread writes its own counters without lock, they are summed only when metrics are collected.
+
+    ```python
+    app = App(services=[...], metrics=Metrics())
+    start_http_server(app.metrics, port=9100)
+    ```
+    """
+
+    def __init__(self, latency_buckets: Sequence[float] = LATENCY_BUCKETS, size_buckets: Sequence[int] = SIZE_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self._local = threading.local()
+        self._shards: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def count(self, name: str, labels: Labels, value: float = 1):
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name: str, labels: Labels, value: float, buckets: Sequence[float]):
+        shard = self._shard()
+        key = (name, labels)
+        # bucket counts, +Inf count, sum
+        histogram = shard.get(key)
+        if histogram is None:
+            histogram = shard[key] = [0] * (len(buckets) + 2)
+        histogram[bisect_left(buckets, value)] += 1
+        histogram[-1] += value
+
+    def observe_latency(self, method: str, stage: str, seconds: float):
+        self.observe('homi_stage_seconds', (('method', method), ('stage', stage)), seconds, self.latency_buckets)
+
+    def observe_call(self, method: str, code, seconds: float):
+        self.count('homi_requests_total', (('method', method), ('code', code_name(code))))
+        self.observe('homi_request_seconds', (('method', method),), seconds, self.latency_buckets)
+
+    def count_expired(self, method: str):
+        """rpc dropped because client deadline passed before handler ran"""
+        self.count('homi_expired_total', (('method', method),))
+
+    def timed(self, method: str, stage: str, func: Callable) -> Callable:
+        """func which records its latency as stage of method"""
+        labels = (('method', method), ('stage', stage))
+        buckets = self.latency_buckets
+
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe('homi_stage_seconds', labels, perf_counter() - started, buckets)
+
+        return wrapper
+
+    def timed_async(self, method: str, stage: str, func: Callable) -> Callable:
+        labels = (('method', method), ('stage', stage))
+        buckets = self.latency_buckets
+
+        async def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.observe('homi_stage_seconds', labels, perf_counter() - started, buckets)
+
+        return wrapper
+
+    def timed_stream(self, method: str, stage: str, func: Callable) -> Callable:
+        """
+        func returning iterator (e.g. generator handler). its call and every `next` of returned iterator
+        are recorded as one stage latency when iteration ends
+        """
+        labels = (('method', method), ('stage', stage))
+
+        def iterate(iterator, elapsed: float):
+            try:
+                while True:
+                    started = perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += perf_counter() - started
+                    yield item
+            finally:
+                self.observe('homi_stage_seconds', labels, elapsed, self.latency_buckets)
+
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                iterator = iter(func(*args, **kwargs))
+            except BaseException:
+                self.observe('homi_stage_seconds', labels, perf_counter() - started, self.latency_buckets)
+                raise
+            return iterate(iterator, perf_counter() - started)
+
+        return wrapper
+
+    def timed_async_stream(self, method: str, stage: str, func: Callable) -> Callable:
+        """`timed_stream` of func returning async iterator"""
+        labels = (('method', method), ('stage', stage))
+
+        async def wrapper(*args, **kwargs):
+            elapsed = 0.0
+            started = perf_counter()
+            try:
+                iterator = func(*args, **kwargs).__aiter__()
+                while True:
+                    try:
+                        item = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    elapsed += perf_counter() - started
+                    # time while item is sent is not handler's
+                    started = None
+                    yield item
+                    started = perf_counter()
+            finally:
+                if started is not None:
+                    elapsed += perf_counter() - started
+                self.observe('homi_stage_seconds', labels, elapsed, self.latency_buckets)
+
+        return wrapper
+
+    def timed_deserializer(self, method: str, deserializer: Callable) -> Callable:
+        stage = (('method', method), ('stage', DESERIALIZE))
+        size = (('method', method),)
+
+        def deserialize(data: bytes):
+            started = perf_counter()
+            message = deserializer(data)
+            self.observe('homi_stage_seconds', stage, perf_counter() - started, self.latency_buckets)
+            self.observe('homi_request_bytes', size, len(data), self.size_buckets)
+            return message
+
+        return deserialize
+
+    def timed_serializer(self, method: str, serializer: Callable) -> Callable:
+        stage = (('method', method), ('stage', SERIALIZE))
+        size = (('method', method),)
+
+        def serialize(message) -> bytes:
+            started = perf_counter()
+            data = serializer(message)
+            self.observe('homi_stage_seconds', stage, perf_counter() - started, self.latency_buckets)
+            self.observe('homi_response_bytes', size, len(data), self.size_buckets)
+            return data
+
+        return serialize
+
+    def collect(self) -> Dict[Tuple[str, Labels], object]:
+        """sum of counters of every thread"""
+        with self._lock:
+            shards = list(self._shards)
+        total = {}
+        for shard in shards:
+            for key, value in list(shard.items()):
+                if isinstance(value, list):
+                    merged = total.get(key)
+                    total[key] = list(value) if merged is None else [a + b for a, b in zip(merged, value)]
+                else:
+                    total[key] = total.get(key, 0) + value
+        return total
+
+    def _buckets_of(self, name: str) -> Sequence[float]:
+        return self.size_buckets if name.endswith('_bytes') else self.latency_buckets
+
+    def render(self) -> str:
+        """metrics in prometheus text exposition format"""
+        by_name: Dict[str, list] = {}
+        for (name, labels), value in sorted(self.collect().items()):
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, samples in by_name.items():
+            kind, description = HELP.get(name, ('untyped', name))
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+                    continue
+                cumulative = 0
+                bounds = [str(bound) for bound in self._buckets_of(name)] + ['+Inf']
+                for bound, count in zip(bounds, value[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {value[-1]}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return '{' + pairs + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def start_http_server(metrics: Metrics, port: int, host: str = ''):
+    """serve `/metrics` in prometheus text format on daemon thread, `shutdown()` of returned server stops it"""
+    # http server is imported only when endpoint is used
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,255 @@
+"""
+numpy arrays of repeated numeric fields, read from and written to wire format directly.
+no python object is made for each element. numpy is optional, it is imported when this feature is used.
+"""
+from typing import Dict, List, NamedTuple, Tuple
+
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import DecodeError
+
+from .exception import RegisterError
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_START_GROUP = 3
+WIRE_END_GROUP = 4
+WIRE_FIXED32 = 5
+
+# field type: (dtype of array, wire type of element, dtype on wire)
+# varint elements are decoded to uint64 first, wire dtype of varint is None
+FIELD_TYPES = {
+    FieldDescriptor.TYPE_DOUBLE: ('float64', WIRE_FIXED64, '<f8'),
+    FieldDescriptor.TYPE_FLOAT: ('float32', WIRE_FIXED32, '<f4'),
+    FieldDescriptor.TYPE_FIXED64: ('uint64', WIRE_FIXED64, '<u8'),
+    FieldDescriptor.TYPE_SFIXED64: ('int64', WIRE_FIXED64, '<i8'),
+    FieldDescriptor.TYPE_FIXED32: ('uint32', WIRE_FIXED32, '<u4'),
+    FieldDescriptor.TYPE_SFIXED32: ('int32', WIRE_FIXED32, '<i4'),
+    FieldDescriptor.TYPE_INT64: ('int64', WIRE_VARINT, None),
+    FieldDescriptor.TYPE_UINT64: ('uint64', WIRE_VARINT, None),
+    FieldDescriptor.TYPE_INT32: ('int32', WIRE_VARINT, None),
+    FieldDescriptor.TYPE_UINT32: ('uint32', WIRE_VARINT, None),
+    FieldDescriptor.TYPE_SINT64: ('int64', WIRE_VARINT, None),
+    FieldDescriptor.TYPE_SINT32: ('int32', WIRE_VARINT, None),
+    FieldDescriptor.TYPE_BOOL: ('bool', WIRE_VARINT, None),
+    FieldDescriptor.TYPE_ENUM: ('int32', WIRE_VARINT, None),
+}
+
+ZIGZAG_TYPES = (FieldDescriptor.TYPE_SINT32, FieldDescriptor.TYPE_SINT64)
+MAX_VARINT_BYTES = 10
+
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RegisterError('numpy option needs numpy package, `pip install numpy`')
+    return numpy
+
+
+def is_array_field(field: FieldDescriptor) -> bool:
+    return field.label == FieldDescriptor.LABEL_REPEATED and field.type in FIELD_TYPES
+
+
+def encode_varint(value: int) -> bytes:
+    """varint of one non negative int (tag, length)"""
+    out = bytearray()
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(data, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        try:
+            byte = data[pos]
+        except IndexError:
+            raise DecodeError('truncated varint')
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+        if shift >= 7 * MAX_VARINT_BYTES:
+            raise DecodeError('too long varint')
+
+
+def _skip_field(data, pos: int, number: int, wire_type: int) -> int:
+    """position after value of field"""
+    if wire_type == WIRE_VARINT:
+        _, pos = _read_varint(data, pos)
+    elif wire_type == WIRE_FIXED64:
+        pos += 8
+    elif wire_type == WIRE_FIXED32:
+        pos += 4
+    elif wire_type == WIRE_LENGTH_DELIMITED:
+        length, pos = _read_varint(data, pos)
+        pos += length
+    elif wire_type == WIRE_START_GROUP:
+        while True:
+            tag, pos = _read_varint(data, pos)
+            if tag & 7 == WIRE_END_GROUP:
+                if tag >> 3 != number:
+                    raise DecodeError('mismatched end group')
+                break
+            pos = _skip_field(data, pos, tag >> 3, tag & 7)
+    else:
+        raise DecodeError(f'invalid wire type {wire_type}')
+    if pos > len(data):
+        raise DecodeError('truncated message')
+    return pos
+
+
+class ArrayField(NamedTuple):
+    name: str
+    number: int
+    type: int
+    dtype: str
+    wire_type: int
+    wire_dtype: str
+
+
+class ArrayFields:
+    """
+    converts repeated numeric fields of message type to numpy arrays and back, on serialized message.
+    fixed size elements (double, float, fixed, sfixed) are read as view of request bytes without copy.
+    """
+
+    def __init__(self, message_class, names=None):
+        self.np = import_numpy()
+        self.message_class = message_class
+        descriptor = message_class.DESCRIPTOR
+        fields = [f for f in descriptor.fields if is_array_field(f) and (names is None or f.name in names)]
+        self.fields: Dict[str, ArrayField] = {
+            field.name: ArrayField(field.name, field.number, field.type, *FIELD_TYPES[field.type]) for field in fields
+        }
+        self._by_number = {field.number: field for field in self.fields.values()}
+
+    def split(self, data: bytes) -> Tuple[Dict[str, List[memoryview]], bytes]:
+        """element bytes of array fields, and serialized message of other fields"""
+        view = memoryview(data)
+        chunks: Dict[str, List[memoryview]] = {}
+        rest = []
+        # start of other fields which are not copied yet
+        rest_start = pos = 0
+        end = len(data)
+        while pos < end:
+            field_start = pos
+            tag, pos = _read_varint(view, pos)
+            number, wire_type = tag >> 3, tag & 7
+            field = self._by_number.get(number)
+            if field is None:
+                pos = _skip_field(view, pos, number, wire_type)
+                continue
+            if wire_type == WIRE_LENGTH_DELIMITED:
+                # packed elements
+                length, value_start = _read_varint(view, pos)
+                pos = value_start + length
+            elif wire_type == field.wire_type:
+                # element which is not packed
+                value_start = pos
+                pos = _skip_field(view, pos, number, wire_type)
+            else:
+                raise DecodeError(f'wire type {wire_type} of field {field.name} does not match')
+            if pos > end:
+                raise DecodeError('truncated message')
+            chunks.setdefault(field.name, []).append(view[value_start:pos])
+            rest.append(view[rest_start:field_start])
+            rest_start = pos
+        if rest_start == 0:
+            return chunks, data
+        rest.append(view[rest_start:])
+        return chunks, b''.join(rest)
+
+    def _decode(self, field: ArrayField, data):
+        np = self.np
+        if field.wire_dtype is not None:
+            if len(data) % np.dtype(field.wire_dtype).itemsize:
+                raise DecodeError(f'truncated packed field {field.name}')
+            return np.frombuffer(data, field.wire_dtype).astype(field.dtype, copy=False)
+        values = self._decode_varints(data)
+        if field.type in ZIGZAG_TYPES:
+            values = (values >> np.uint64(1)) ^ (np.uint64(0) - (values & np.uint64(1)))
+        if field.type == FieldDescriptor.TYPE_BOOL:
+            return values != 0
+        # negative int32 is sign extended to 64 bits on wire
+        return values.view(np.int64).astype(field.dtype, copy=False) if field.dtype != 'uint64' else values
+
+    def _decode_varints(self, data):
+        np = self.np
+        buffer = np.frombuffer(data, np.uint8)
+        if not buffer.size:
+            return np.zeros(0, np.uint64)
+        if buffer[-1] >= 0x80:
+            raise DecodeError('truncated varint')
+        ends = np.flatnonzero(buffer < 0x80)
+        starts = np.empty_like(ends)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        lengths = ends - starts + 1
+        if lengths.max() > MAX_VARINT_BYTES:
+            raise DecodeError('too long varint')
+        # index of each byte in its varint
+        position = np.arange(buffer.size) - np.repeat(starts, lengths)
+        groups = (buffer & 0x7f).astype(np.uint64) << (position * 7).astype(np.uint64)
+        return np.bitwise_or.reduceat(groups, starts)
+
+    def read(self, data: bytes):
+        """(arrays of every array field, message parsed from other fields). absent field is empty array"""
+        if not self.fields:
+            return {}, self.message_class.FromString(data)
+        chunks, rest = self.split(data)
+        arrays = {}
+        for name, field in self.fields.items():
+            field_chunks = chunks.get(name, ())
+            # one chunk is decoded from request bytes without copy
+            buffer = field_chunks[0] if len(field_chunks) == 1 else b''.join(field_chunks)
+            arrays[name] = self._decode(field, buffer)
+        return arrays, self.message_class.FromString(rest)
+
+    def _encode(self, field: ArrayField, array) -> bytes:
+        np = self.np
+        array = np.asarray(array)
+        if field.wire_dtype is not None:
+            return np.ascontiguousarray(array, dtype=field.wire_dtype).tobytes()
+        if field.type == FieldDescriptor.TYPE_SINT32:
+            values = array.astype(np.int32)
+            values = ((values << np.int32(1)) ^ (values >> np.int32(31))).view(np.uint32).astype(np.uint64)
+        elif field.type == FieldDescriptor.TYPE_SINT64:
+            values = array.astype(np.int64)
+            values = ((values << np.int64(1)) ^ (values >> np.int64(63))).view(np.uint64)
+        elif field.dtype in ('uint32', 'uint64', 'bool'):
+            values = array.astype(np.uint64)
+        else:
+            values = array.astype(np.int64).view(np.uint64)
+        return self._encode_varints(values)
+
+    def _encode_varints(self, values) -> bytes:
+        np = self.np
+        if not values.size:
+            return b''
+        shifts = np.arange(MAX_VARINT_BYTES, dtype=np.uint64) * np.uint64(7)
+        # 7 bits groups of each value, (values, MAX_VARINT_BYTES)
+        groups = ((values[:, None] >> shifts) & np.uint64(0x7f)).astype(np.uint8)
+        index = np.arange(MAX_VARINT_BYTES)
+        # index of highest non zero group + 1, zero is one byte
+        lengths = MAX_VARINT_BYTES - np.argmax(groups[:, ::-1] != 0, axis=1)
+        lengths[~groups.any(axis=1)] = 1
+        groups[index < lengths[:, None] - 1] |= 0x80
+        return groups[index < lengths[:, None]].tobytes()
+
+    def write(self, message: bytes, arrays: Dict) -> bytes:
+        """append arrays to serialized message as packed fields"""
+        out = [message]
+        for name, array in arrays.items():
+            field = self.fields[name]
+            payload = self._encode(field, array)
+            if payload:
+                out += [encode_varint(field.number << 3 | WIRE_LENGTH_DELIMITED), encode_varint(len(payload)), payload]
+        return b''.join(out)
+
+    def is_array(self, value) -> bool:
+        return isinstance(value, self.np.ndarray)
@@ -0,0 +1,120 @@
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import threading
+from types import CodeType
+from typing import Dict, Optional
+
+from . import __version__
+
+# marshal format and generated code change with python and homi version
+_VERSION_TAG = f'homi-{__version__}-{sys.implementation.cache_tag}'.encode()
+
+
+class PlanCache:
+    """
+    disk cache of compiled converter code.
+    compiling generated converter source takes most of app startup when app has many services,
+    so compiled code objects are kept in one file per proto file, keyed by hash of serialized proto file.
+    entry in the file is keyed by hash of generated source, so changed message never gets stale code.
+
+    enable it before services are made (before app module is imported), and save it after app is made.
+    `homi run --plan_cache DIR` does both. forked workers reuse converters which are compiled before fork.
+
+    ```python
+    from homi.plan_cache import PlanCache, use_plan_cache
+
+    cache = use_plan_cache(PlanCache('/var/cache/homi'))
+    from app import app
+    cache.save()
+    ```
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        # proto file name -> plan key
+        self._keys: Dict[str, Optional[str]] = {}
+        # plan key -> {source key: code}
+        self._plans: Dict[str, Dict[str, CodeType]] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def _plan_key(self, file) -> Optional[str]:
+        try:
+            return self._keys[file.name]
+        except KeyError:
+            pass
+        serialized = getattr(file, 'serialized_pb', None)
+        if serialized:
+            key = self._keys[file.name] = hashlib.sha256(_VERSION_TAG + serialized).hexdigest()
+        else:
+            # descriptor which is not made from serialized file can not be identified
+            key = self._keys[file.name] = None
+        return key
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.plan')
+
+    def _load(self, key: str) -> Dict[str, CodeType]:
+        try:
+            return self._plans[key]
+        except KeyError:
+            pass
+        try:
+            with open(self._path(key), 'rb') as f:
+                plan = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            plan = {}
+        if not isinstance(plan, dict):
+            plan = {}
+        self._plans[key] = plan
+        return plan
+
+    def compile(self, source: str, filename: str, file) -> CodeType:
+        """same as `compile(source, filename, 'exec')`, code of message in proto `file` is cached"""
+        key = self._plan_key(file)
+        if key is None:
+            return compile(source, filename, 'exec')
+        source_key = hashlib.sha1(f'{filename}\0{source}'.encode()).hexdigest()
+        with self._lock:
+            plan = self._load(key)
+            code = plan.get(source_key)
+            if code is not None:
+                self.hits += 1
+                return code
+        code = compile(source, filename, 'exec')
+        with self._lock:
+            plan[source_key] = code
+            self._dirty.add(key)
+            self.misses += 1
+        return code
+
+    def save(self):
+        """write plans which have new code. file is replaced atomically, so other process can write it too"""
+        with self._lock:
+            dirty = {key: dict(self._plans[key]) for key in self._dirty}
+            self._dirty.clear()
+        if not dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for key, plan in dirty.items():
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    marshal.dump(plan, f)
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+
+def use_plan_cache(cache: Optional[PlanCache]) -> Optional[PlanCache]:
+    """compile converters through cache, None disables it"""
+    from . import converter
+
+    converter.plan_cache = cache
+    return cache
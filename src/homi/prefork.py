@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from typing import Callable, Dict
+
+from .exception import ServerConfigError
+
+
+class Prefork:
+    """
+    run `target` in forked worker processes and supervise them.
+    app must be imported before `run`, so workers share it. grpc server must be made in target (after fork),
+    and it must set `reuse_port` so every worker can bind same port.
+
+    - crashed worker is restarted. worker which dies within `restart_delay` seconds is restarted after delay.
+    - SIGTERM, SIGINT to supervisor are forwarded to workers as SIGTERM, workers should stop gracefully (see `serve`)
+
+    ```python
+    Prefork(lambda: serve(Server(app, port='50051', reuse_port=True), grace=10), processes=4).run()
+    ```
+    """
+
+    def __init__(self, target: Callable[[], None], processes: int, restart_delay: float = 1.0):
+        if processes < 1:
+            raise ServerConfigError('processes must be positive')
+        if not hasattr(os, 'fork'):
+            raise ServerConfigError('pre-fork serving needs os.fork, it is not supported on this platform')
+        self.target = target
+        self.processes = processes
+        self.restart_delay = restart_delay
+        # pid: started time
+        self.workers: Dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                # supervisor forwards signal, and terminal sends SIGINT to every process of group
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                self.target()
+            except SystemExit as e:
+                # normal exit of worker, e.g. `sys.exit(0)` in signal handler
+                code = _exit_code(e)
+            except BaseException:
+                logging.exception(f'worker {os.getpid()} failed')
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        if self.stopping:
+            self._kill(pid)
+        return pid
+
+    @staticmethod
+    def _kill(pid: int):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.workers):
+            self._kill(pid)
+
+    def run(self):
+        previous = {sig: signal.signal(sig, self.stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            for _ in range(self.processes):
+                self.spawn()
+            print(f'# processes : {self.processes}')
+            while self.workers:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                started = self.workers.pop(pid, None)
+                if started is None or self.stopping:
+                    continue
+                logging.warning(f'worker {pid} exited (status {status}), restart it')
+                if time.monotonic() - started < self.restart_delay:
+                    time.sleep(self.restart_delay)
+                if not self.stopping:
+                    self.spawn()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+
+def _exit_code(error: SystemExit) -> int:
+    """process exit status of `SystemExit` same as python interpreter"""
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=sys.stderr)
+    return 1
+
+
+def serve(server, grace: float = None):
+    """run `Server` until SIGTERM, then stop it with `grace` seconds for running rpc"""
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.stop(grace))
+    server.run()
+
+
+async def serve_async(server, grace: float = None):
+    """`serve` for `AsyncServer`"""
+    loop = asyncio.get_event_loop()
+    loop.add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(server.stop(grace)))
+    await server.run()
@@ -1,13 +1,31 @@
+import asyncio
+import sys
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
 from enum import Enum
-from functools import partial
-from inspect import signature
-from typing import Any, Dict, NamedTuple, Tuple, TypeVar
+from functools import partial, wraps
+from time import perf_counter
+from inspect import isasyncgenfunction, iscoroutinefunction, isgeneratorfunction, signature
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, NamedTuple, Tuple, TypeVar, Union
 
 import grpc
 from google.protobuf import json_format, symbol_database
-from google.protobuf.descriptor import MethodDescriptor, ServiceDescriptor
+from google.protobuf.descriptor import Error as DescriptorError, FieldDescriptor, MethodDescriptor, ServiceDescriptor
 from google.protobuf.descriptor_pb2 import MethodDescriptorProto, ServiceDescriptorProto
 
+from .converter import BUILD_FAST, BUILD_STRICT, MessageConverter, get_builder, get_converter
+from .deadline import expired_calls, is_expired
+from .exception import MethodNotFound, RegisterError
+
+if TYPE_CHECKING:
+    # modules of optional features are imported by functions which use them, not by `import homi`
+    from .cache import LRU
+    from .columnar import ColumnarBatch
+    from .metrics import Metrics
+    from .ndarray import ArrayFields
+    from .single_flight import AsyncSingleFlight, BaseSingleFlight, SingleFlight
+    from .topic import BaseTopic
+
 
 class MethodType(Enum):
     UNARY_UNARY = 'unary_unary'
@@ -37,9 +55,13 @@ MethodTypeMatch: Dict[Tuple[IS_REQUEST_STREAM, IS_RESPONSE_STREAM], MethodType]
 
 class MethodMetaData(NamedTuple):
     name: str
+    # grpc method path, `/package.Service/Method`
+    path: str
     input_type: Any
     output_type: Any
     method_type: MethodType
+    input_converter: MessageConverter
+    output_converter: MessageConverter
 
 
 class ServiceMetaData(NamedTuple):
@@ -50,20 +72,36 @@ class ServiceMetaData(NamedTuple):
 
 def get_method_metadata(descriptor: MethodDescriptor, proto: MethodDescriptorProto) -> MethodMetaData:
     symbol_db = symbol_database.Default()
+    input_type = symbol_db.GetPrototype(descriptor.input_type)
+    output_type = symbol_db.GetPrototype(descriptor.output_type)
     return MethodMetaData(
         name=descriptor.name,
-        input_type=symbol_db.GetPrototype(descriptor.input_type),
-        output_type=symbol_db.GetPrototype(descriptor.output_type),
+        path=f'/{descriptor.containing_service.full_name}/{descriptor.name}',
+        input_type=input_type,
+        output_type=output_type,
         method_type=MethodTypeMatch[(proto.client_streaming, proto.server_streaming)],
+        input_converter=get_converter(input_type),
+        output_converter=get_converter(output_type),
     )
 
 
-def service_metadata_from_descriptor(service_descriptor: ServiceDescriptor) -> ServiceMetaData:
+def _method_protos(service_descriptor: ServiceDescriptor):
     svc_desc_proto = ServiceDescriptorProto()
-    service_descriptor.CopyToProto(svc_desc_proto)
+    try:
+        service_descriptor.CopyToProto(svc_desc_proto)
+    except DescriptorError:
+        # descriptor made without serialized file (e.g. `DescriptorPool.Add`) has streaming flags itself.
+        # old generated code does not set the flags, so serialized proto is preferred
+        return [MethodDescriptorProto(name=method.name, client_streaming=method.client_streaming,
+                                      server_streaming=method.server_streaming)
+                for method in service_descriptor.methods]
+    return svc_desc_proto.method
+
+
+def service_metadata_from_descriptor(service_descriptor: ServiceDescriptor) -> ServiceMetaData:
     methods = {
         proto.name: get_method_metadata(service_descriptor.methods_by_name[proto.name], proto)
-        for proto in svc_desc_proto.method
+        for proto in _method_protos(service_descriptor)
     }
 
     return ServiceMetaData(
@@ -73,21 +111,276 @@ def service_metadata_from_descriptor(service_descriptor: ServiceDescriptor) -> S
     )
 
 
-def make_grpc_method_handler(method_meta: MethodMetaData, func):
+def serialize_response(response) -> bytes:
+    return response if type(response) is bytes else response.SerializeToString()
+
+
+def is_bytes_transport(raw_bytes: bool = False, cache=None, single_flight=None, numpy: bool = False, **kwargs) -> bool:
+    """handler made with these method options gets serialized request, and can return serialized response"""
+    return raw_bytes or numpy or cache is not None or single_flight is not None
+
+
+def is_bytes_response(topic=None, **options) -> bool:
+    """handler made with these method options can return serialized response"""
+    return topic is not None or is_bytes_transport(**options)
+
+
+def make_method_options(
+        meta: ServiceMetaData,
+        name: str,
+        topic_type: str,
+        raw: bool = False,
+        builder: str = None,
+        cache: 'LRU' = None,
+        single_flight: 'BaseSingleFlight' = None,
+        raw_bytes: bool = False,
+        executor: Union[str, Executor] = None,
+        concurrency: int = None,
+        batch_size: int = None,
+        batch_timeout: float = None,
+        numpy: bool = False,
+        columnar: bool = False,
+        topic: 'BaseTopic' = None,
+        **kwargs,
+) -> Dict[str, Any]:
+    """
+    check method options of `Service.method` and `AsyncService.method` for method `name`, dict of them.
+
+    :param topic_type: name of `homi.topic` class which service can use as topic
+    :param raw: handler get grpc request object & context as it is (`handler(request, context)`),
+                and it must return grpc response object. homi does not convert anything.
+    :param builder: how to make response message from returned dict.
+                    None(default) works like `json_format.ParseDict`,
+                    'strict' assigns value directly and rejects unknown key, 'fast' skips validation too.
+    :param cache: response cache(`homi.cache.LRU`) of unary-unary method
+    :param single_flight: `homi.single_flight.SingleFlight` (`AsyncSingleFlight` for `AsyncApp`)
+                          which coalesces concurrent identical unary-unary calls
+    :param raw_bytes: handler gets serialized request bytes (iterator of bytes for stream request)
+                      as it is (`handler(request, context)`), and can return bytes (iterator of bytes for stream)
+                      which is sent without serialization.
+    :param executor: executor (or name of executor added to app) where handler runs. None is thread pool of `Server`.
+                     with `AsyncApp`, only sync(not `async def`) handler runs in it,
+                     None is thread pool of `AsyncServer`, its size is `worker`
+    :param concurrency: max number of running calls, more calls are rejected with RESOURCE_EXHAUSTED
+    :param batch_size: stream request handler gets iterator of message lists (up to `batch_size` messages)
+                       instead of messages, for bulk write or vectorized processing
+    :param batch_timeout: seconds to wait for full batch since its first message, then partial batch is given
+    :param numpy: repeated numeric fields named in handler parameters are given as numpy arrays
+                  (read from serialized unary request without per element objects, not set in `request`),
+                  and numpy arrays in returned dict are written to response in bulk.
+                  stream request handler gets `ArrayStreamMessage` whose repeated numeric fields are numpy arrays
+    :param columnar: stream-unary handler gets `homi.columnar.ColumnarBatch` of whole request stream
+                     (`batch['field']` is list of field values) instead of iterator of messages.
+                     with `batch_size`, stream request handler gets iterator of `ColumnarBatch` of each batch.
+                     with `numpy`, numeric columns are numpy arrays of dtype of field type
+    :param topic: `homi.topic.Topic` (`AsyncTopic` for `AsyncApp`) whose events are streamed by this server
+                  streaming method. serialized events of subscription returned by handler are sent as they are
+    """
+    if name not in meta.methods:
+        raise MethodNotFound(name, meta.full_name, available_methods=meta.methods.keys())
+    method_meta = meta.methods[name]
+    method_type = method_meta.method_type
+    if builder is not None and builder not in (BUILD_STRICT, BUILD_FAST):
+        raise RegisterError(f'builder must be one of {BUILD_STRICT!r}, {BUILD_FAST!r}')
+    if concurrency is not None and concurrency < 1:
+        raise RegisterError('concurrency must be positive')
+    if batch_size is not None and batch_size < 1:
+        raise RegisterError('batch_size must be positive')
+    if batch_timeout is not None and (batch_size is None or batch_timeout <= 0):
+        raise RegisterError('batch_timeout must be positive and it needs batch_size')
+    if numpy:
+        from .ndarray import import_numpy
+        import_numpy()
+    if (cache is not None or single_flight is not None) and method_type != MethodType.UNARY_UNARY:
+        raise RegisterError(f'{name} is not unary-unary method, only unary-unary method can use cache or single_flight')
+    if batch_size is not None and (raw or raw_bytes or method_type.is_unary_request):
+        raise RegisterError(f'batch_size works with stream request method whose messages are converted, '
+                            f'{name} is unary request method or raw method')
+    if numpy and (raw or raw_bytes):
+        raise RegisterError(f'numpy option works with method whose messages are converted, {name} is raw method')
+    collects_stream = batch_size is None and method_type != MethodType.STREAM_UNARY
+    if columnar and (raw or raw_bytes or method_type.is_unary_request or collects_stream):
+        raise RegisterError(f'columnar works with stream-unary method (or stream request method with '
+                            f'batch_size) whose messages are converted, {name} can not use it')
+    if topic is not None:
+        from . import topic as topic_module
+        if not isinstance(topic, getattr(topic_module, topic_type)):
+            raise RegisterError(f'topic must be homi.topic.{topic_type}')
+        if method_type.is_unary_response:
+            raise RegisterError(f'{name} is not server streaming method, only it can use topic')
+        if topic.message_type is not method_meta.output_type:
+            raise RegisterError(f'{name} does not return message type of topic '
+                                f'{topic.message_type.DESCRIPTOR.full_name}')
+    return {
+        'raw': raw,
+        'builder': builder,
+        'cache': cache,
+        'single_flight': single_flight,
+        'raw_bytes': raw_bytes,
+        'executor': executor,
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'batch_timeout': batch_timeout,
+        'numpy': numpy,
+        'columnar': columnar,
+        'topic': topic,
+    }
+
+
+def handler_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """options of `warp_handler` (`warp_async_handler`), topic only changes response serializer"""
+    return {k: v for k, v in options.items() if k != 'topic'}
+
+
+def _pass_bytes(request: bytes) -> bytes:
+    return request
+
+
+def make_grpc_method_handler(method_meta: MethodMetaData, func, metrics: 'Metrics' = None, **options):
     handler = getattr(grpc, f"{method_meta.method_type.value}_rpc_method_handler")
-    return handler(
-        func,
-        request_deserializer=method_meta.input_type.FromString,
-        response_serializer=method_meta.output_type.SerializeToString,
-    )
+    if is_bytes_transport(**options):
+        deserializer, serializer = None, serialize_response
+    else:
+        deserializer, serializer = method_meta.input_type.FromString, method_meta.output_type.SerializeToString
+        if is_bytes_response(**options):
+            serializer = serialize_response
+    if metrics is not None:
+        # bytes are passed through deserializer only to count request size
+        deserializer = metrics.timed_deserializer(method_meta.path, deserializer or _pass_bytes)
+        serializer = metrics.timed_serializer(method_meta.path, serializer)
+    return handler(func, request_deserializer=deserializer, response_serializer=serializer)
+
+
+_json_printer = json_format._Printer(preserving_proto_field_name=True)
+
+
+def field_to_dict_value(field: FieldDescriptor, value):
+    """convert one field value same as `json_format.MessageToDict(preserving_proto_field_name=True)`"""
+    if json_format._IsMapEntry(field):
+        v_field = field.message_type.fields_by_name['value']
+        return {
+            (('true' if key else 'false') if isinstance(key, bool) else str(key)):
+                _json_printer._FieldToJsonObject(v_field, value[key])
+            for key in value
+        }
+    elif field.label == FieldDescriptor.LABEL_REPEATED:
+        return [_json_printer._FieldToJsonObject(field, v) for v in value]
+    return _json_printer._FieldToJsonObject(field, value)
+
+
+class LazyMessageDict(Mapping):
+    """
+    read only dict view of protobuf message.
+    each field is converted only when it is accessed, and converted value is memoized.
+    keys and values are same as `json_format.MessageToDict(message, preserving_proto_field_name=True)`
+    """
+    __slots__ = ('_message', '_converter', '_fields', '_values')
+
+    def __init__(self, message, converter: MessageConverter = None):
+        self._message = message
+        self._converter = converter or get_converter(type(message))
+        self._fields = None
+        # made on first access, view which is never read stays small
+        self._values = None
+
+    @property
+    def message(self):
+        return self._message
+
+    @property
+    def fields(self) -> Dict[str, Tuple[FieldDescriptor, Any]]:
+        if self._fields is None:
+            self._fields = {
+                (f'[{field.full_name}]' if field.is_extension and field.label != FieldDescriptor.LABEL_REPEATED
+                 else field.name): (field, value)
+                for field, value in self._message.ListFields()
+            }
+        return self._fields
+
+    def __getitem__(self, key):
+        if self._values is None:
+            self._values = {}
+        else:
+            try:
+                return self._values[key]
+            except KeyError:
+                pass
+        getter = self._converter.field_getters.get(key) if self._fields is None else None
+        # getter reads one field without listing all fields, None is unset field (or null value)
+        converted = getter(self._message) if getter else None
+        if converted is None:
+            field, value = self.fields[key]
+            func = None if field.is_extension else self._converter.field_to_dict.get(field.name)
+            converted = func(value) if func else field_to_dict_value(field, value)
+        self._values[key] = converted
+        return converted
+
+    def __iter__(self):
+        return iter(self.fields)
 
+    def __len__(self):
+        return len(self.fields)
 
-class StreamMessage(Dict):
-    _raw_data = None
+    def __repr__(self):
+        return f'{self.__class__.__name__}({dict(self)!r})'
+
+
+class StreamMessage(LazyMessageDict):
+    """
+    message of request stream. it is read only dict view (`msg['name']`, `msg.get('name')`, `dict(msg)`),
+    and raw message is `msg.raw_data`. it has no instance dict and does not copy converted message,
+    so long request stream holds only messages themselves.
+    """
+    __slots__ = ()
+
+    @property
+    def raw_data(self):
+        return self._message
+
+
+class ArrayStreamMessage(StreamMessage):
+    """
+    `StreamMessage` of numpy option. repeated numeric fields are numpy arrays (`msg['values']`) read from
+    serialized message (empty array if field is not set), they are not set in `msg.raw_data`
+    """
+    __slots__ = ('_arrays',)
+
+    def __init__(self, message, arrays: Dict[str, Any], converter: MessageConverter = None):
+        super().__init__(message, converter)
+        self._arrays = arrays
+
+    @property
+    def arrays(self) -> Dict[str, Any]:
+        return self._arrays
+
+    def __getitem__(self, key):
+        try:
+            return self._arrays[key]
+        except KeyError:
+            return super().__getitem__(key)
+
+    def __iter__(self):
+        yield from self._arrays
+        yield from self.fields
+
+    def __len__(self):
+        return len(self._arrays) + len(self.fields)
+
+
+def _read_array_stream_message(arrays: 'ArrayFields', converter: MessageConverter, data: bytes) -> ArrayStreamMessage:
+    values, message = arrays.read(data)
+    return ArrayStreamMessage(message, values, converter)
+
+
+def stream_message_maker(converter: MessageConverter, arrays: 'ArrayFields' = None) -> Callable[[Any], StreamMessage]:
+    """function making `StreamMessage` of request message, `ArrayStreamMessage` of serialized one with `arrays`"""
+    if arrays is not None:
+        return partial(_read_array_stream_message, arrays, converter)
+    return partial(StreamMessage, converter=converter)
 
 
 def parse_request(parameters, request) -> Dict:
-    request_dict = json_format.MessageToDict(request, preserving_proto_field_name=True)
+    request_dict = LazyMessageDict(request)
     args = {}
     for p in parameters:
         if p != "context":
@@ -96,87 +389,943 @@ def parse_request(parameters, request) -> Dict:
     return args
 
 
-def parse_stream_request(request_iterator) -> Dict:
-    for req in request_iterator:
-        msg = StreamMessage(**json_format.MessageToDict(req, preserving_proto_field_name=True))
-        msg.raw_data = req
-        yield msg
+def _lazy_getter(name: str):
+    def getter(request):
+        return LazyMessageDict(request).get(name)
+
+    return getter
+
+
+def _none_getter(request):
+    return None
 
 
-async def parse_async_stream_request(request_iterator):
+def make_request_parser(method_meta: MethodMetaData, parameters) -> Callable[[Any], Dict]:
+    """
+    precompute extraction plan of handler arguments.
+    only fields named in handler parameters are converted, `request` and `context` are passed untouched,
+    and `time_remaining` is injected by handler wrapper unless it is field name.
+    """
+    getters = method_meta.input_converter.field_getters
+    fields = method_meta.input_type.DESCRIPTOR.fields_by_name
+    plan = []
+    for p in parameters:
+        if p in RAW_PARAMETERS or (p == TIME_REMAINING and p not in fields):
+            continue
+        if p in getters:
+            plan.append((p, getters[p]))
+        elif p in fields:
+            plan.append((p, _lazy_getter(p)))
+        else:
+            plan.append((p, _none_getter))
+    plan = tuple(plan)
+
+    def parser(request) -> Dict:
+        args = {p: getter(request) for p, getter in plan}
+        args['request'] = request
+        return args
+
+    return parser
+
+
+def parse_stream_request(request_iterator, converter: MessageConverter = None, batch_size: int = None,
+                         batch_timeout: float = None, columns: Callable[[list], 'ColumnarBatch'] = None,
+                         make_message: Callable[[Any], StreamMessage] = None, arrays: 'ArrayFields' = None):
+    """
+    iterator of `StreamMessage`.
+    with `batch_size`, lists of up to `batch_size` messages, or messages which arrived within `batch_timeout` seconds
+    with `columns`, one `ColumnarBatch` of whole stream, or iterator of `ColumnarBatch` of each batch
+
+    :param make_message: function making `StreamMessage` of request message, default uses `converter` and `arrays`
+    :param arrays: serialized request messages are read to `ArrayStreamMessage` with numpy arrays of these fields
+    """
+    if columns is not None:
+        if batch_size is None:
+            return columns(list(request_iterator))
+        from .batch import batch_stream
+        return map(columns, batch_stream(request_iterator, batch_size, batch_timeout))
+    messages = map(make_message or stream_message_maker(converter, arrays), request_iterator)
+    if batch_size is None:
+        return messages
+    from .batch import batch_stream
+    return batch_stream(messages, batch_size, batch_timeout)
+
+
+async def _async_stream_messages(request_iterator, make_message: Callable[[Any], StreamMessage]):
     async for req in request_iterator:
-        msg = StreamMessage(**json_format.MessageToDict(req, preserving_proto_field_name=True))
-        msg.raw_data = req
-        yield msg
+        yield make_message(req)
+
+
+async def _collect_async_stream(request_iterator, columns: Callable[[list], 'ColumnarBatch']) -> 'ColumnarBatch':
+    return columns([req async for req in request_iterator])
+
+
+async def _async_columnar_batches(batches, columns: Callable[[list], 'ColumnarBatch']):
+    async for batch in batches:
+        yield columns(batch)
+
+
+def parse_async_stream_request(request_iterator, converter: MessageConverter = None, batch_size: int = None,
+                               batch_timeout: float = None, columns: Callable[[list], 'ColumnarBatch'] = None,
+                               make_message: Callable[[Any], StreamMessage] = None, arrays: 'ArrayFields' = None):
+    """`parse_stream_request` of async stream, `ColumnarBatch` of whole stream is awaitable"""
+    if columns is not None:
+        if batch_size is None:
+            return _collect_async_stream(request_iterator, columns)
+        from .batch import batch_async_stream
+        return _async_columnar_batches(batch_async_stream(request_iterator, batch_size, batch_timeout), columns)
+    messages = _async_stream_messages(request_iterator, make_message or stream_message_maker(converter, arrays))
+    if batch_size is None:
+        return messages
+    from .batch import batch_async_stream
+    return batch_async_stream(messages, batch_size, batch_timeout)
+
+
+def _message_view_to_response(output_type, item: LazyMessageDict):
+    """returned message view (e.g. `StreamMessage` of request) is sent as its message when types are same"""
+    if type(item.message) is output_type and not isinstance(item, ArrayStreamMessage):
+        return item.message
+    return dict(item)
 
 
 def parse_to_dict(input_type, item):
-    return json_format.ParseDict(item, input_type()) if isinstance(item, dict) else item
+    if isinstance(item, LazyMessageDict):
+        item = _message_view_to_response(input_type, item)
+    return get_converter(input_type).from_dict(item) if isinstance(item, dict) else item
+
 
+def make_response_builder(output_type, builder: str = None, arrays: 'ArrayFields' = None) -> Callable[[Any], Any]:
+    """
+    make function which converts handler's return value to response message.
 
-def parse_stream_return(input_type, items):
+    :param builder: None converts dict like `json_format.ParseDict`,
+                    'strict' or 'fast' assigns dict value to message directly (see `converter.get_builder`)
+    :param arrays: numpy arrays of these fields in returned dict are written to serialized response in bulk
+    """
+    if arrays is not None:
+        return _make_array_response_builder(make_response_builder(output_type, builder), arrays)
+    if builder is None:
+        return partial(parse_to_dict, output_type)
+    from_dict = get_builder(output_type, builder)
+
+    def build(item):
+        if isinstance(item, LazyMessageDict):
+            item = _message_view_to_response(output_type, item)
+        return from_dict(item) if isinstance(item, dict) else item
+
+    return build
+
+
+def _make_array_response_builder(build: Callable[[Any], Any], arrays: 'ArrayFields') -> Callable[[Any], Any]:
+    def build_with_arrays(item):
+        if isinstance(item, LazyMessageDict):
+            item = _message_view_to_response(arrays.message_class, item)
+        if isinstance(item, dict):
+            values = {k: v for k, v in item.items() if k in arrays.fields and arrays.is_array(v)}
+            if values:
+                message = build({k: v for k, v in item.items() if k not in values})
+                return arrays.write(message.SerializeToString(), values)
+        return build(item)
+
+    return build_with_arrays
+
+
+def parse_stream_return(input_type, items, builder: str = None, arrays: 'ArrayFields' = None):
+    build = make_response_builder(input_type, builder, arrays)
     for item in items:
-        yield parse_to_dict(input_type, item)
+        yield build(item)
+
+
+async def parse_async_stream_return(input_type, items, builder: str = None, arrays: 'ArrayFields' = None):
+    build = make_response_builder(input_type, builder, arrays)
+    async for item in items:
+        yield build(item)
 
 
-async def parse_async_stream_return(input_type, items):
+async def _build_async_stream(build: Callable[[Any], Any], items):
     async for item in items:
-        yield parse_to_dict(input_type, item)
+        yield build(item)
+
+
+def _make_stage_funcs(method_meta: MethodMetaData, metrics: 'Metrics', numpy: bool, columnar: bool, build):
+    """stream request message (or batch) maker and response builder, timed as to_dict and from_dict stages"""
+    columns = arrays = None
+    if columnar:
+        from .columnar import make_columnar_batch_maker
+        columns = make_columnar_batch_maker(method_meta.input_type, numpy)
+    # every array field of stream message is read, handler parameters do not name fields of messages
+    elif numpy and not method_meta.method_type.is_unary_request:
+        from .ndarray import ArrayFields
+        arrays = ArrayFields(method_meta.input_type)
+    make_message = stream_message_maker(method_meta.input_converter, arrays)
+    if metrics is not None:
+        from .metrics import FROM_DICT, TO_DICT
+        if columns is not None:
+            columns = metrics.timed(method_meta.path, TO_DICT, columns)
+        # fields of stream message are converted when handler reads them, that is handler stage
+        make_message = metrics.timed(method_meta.path, TO_DICT, make_message)
+        build = metrics.timed(method_meta.path, FROM_DICT, build)
+    return columns, make_message, build
+
+
+# handler with these positional parameters only use grpc request object
+RAW_PARAMETERS = ('request', 'context')
+# handler parameter which gets seconds until client deadline (None if client has no deadline)
+TIME_REMAINING = 'time_remaining'
+EXPIRED_DETAILS = 'deadline exceeded before handler ran'
+
+
+def count_expired(method_meta: MethodMetaData, metrics: 'Metrics' = None):
+    expired_calls.add(method_meta.path)
+    if metrics is not None:
+        metrics.count_expired(method_meta.path)
+
+
+def check_deadline(method_meta: MethodMetaData, context, metrics: 'Metrics' = None):
+    """abort call whose client deadline already passed, work for it is wasted"""
+    if is_expired(context):
+        count_expired(method_meta, metrics)
+        context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, EXPIRED_DETAILS)
+
 
+async def check_async_deadline(method_meta: MethodMetaData, context, metrics: 'Metrics' = None):
+    if is_expired(context):
+        count_expired(method_meta, metrics)
+        await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, EXPIRED_DETAILS)
 
-def warp_handler(method_meta: MethodMetaData, func):
+
+def warp_handler(
+        method_meta: MethodMetaData,
+        func,
+        raw: bool = False,
+        builder: str = None,
+        cache: 'LRU' = None,
+        single_flight: 'SingleFlight' = None,
+        raw_bytes: bool = False,
+        executor: Executor = None,
+        concurrency: int = None,
+        metrics: 'Metrics' = None,
+        batch_size: int = None,
+        batch_timeout: float = None,
+        numpy: bool = False,
+        columnar: bool = False,
+):
+    if executor is not None:
+        check_executor(method_meta, executor)
+        # thread pool runs whole call (see `warp_thread_pool_handler`), other executors run handler func only
+        if not isinstance(executor, ThreadPoolExecutor):
+            func = warp_executor_func(func, executor)
+    if raw_bytes:
+        handler = func
+    else:
+        handler = func if raw else _warp_convert_handler(
+            method_meta, func, builder, metrics,
+            batch_size=batch_size, batch_timeout=batch_timeout, numpy=numpy, columnar=columnar,
+        )
+        # handler of numpy option reads serialized request itself
+        if (cache is not None or single_flight is not None) and not numpy:
+            handler = warp_deserialize_handler(method_meta, handler)
+    if single_flight is not None:
+        handler = warp_single_flight_handler(method_meta, handler, single_flight)
+    if concurrency is not None:
+        handler = warp_concurrency_handler(method_meta, handler, concurrency)
+    if cache is not None:
+        handler = warp_cache_handler(method_meta, handler, cache)
+    # raw handler is called as it is
+    if handler is not func:
+        handler = warp_deadline_handler(method_meta, handler, metrics)
+    if metrics is not None:
+        handler = warp_metrics_handler(method_meta, handler, metrics)
+    if isinstance(executor, ThreadPoolExecutor):
+        handler = warp_thread_pool_handler(method_meta, handler, executor)
+    return handler
+
+
+def _injects_time_remaining(method_meta: MethodMetaData, parameters) -> bool:
+    if TIME_REMAINING not in parameters:
+        return False
+    return not method_meta.method_type.is_unary_request \
+        or TIME_REMAINING not in method_meta.input_type.DESCRIPTOR.fields_by_name
+
+
+def _array_fields(method_meta: MethodMetaData, parameters, numpy: bool) -> Tuple['ArrayFields', 'ArrayFields']:
+    """numpy array fields of request (only named in handler parameters) and response"""
+    if not numpy:
+        return None, None
+    from .ndarray import ArrayFields
+    return ArrayFields(method_meta.input_type, parameters), ArrayFields(method_meta.output_type)
+
+
+def _make_array_request_parser(method_meta: MethodMetaData, parameters, arrays: 'ArrayFields'):
+    """parser of serialized request which gives array fields as numpy arrays, other fields as usual"""
+    parse = make_request_parser(method_meta, parameters)
+
+    def parser(request: bytes) -> Dict:
+        values, message = arrays.read(request)
+        args = parse(message)
+        args.update(values)
+        return args
+
+    return parser
+
+
+def _warp_convert_handler(method_meta: MethodMetaData, func, builder: str = None, metrics: 'Metrics' = None,
+                          batch_size: int = None, batch_timeout: float = None, numpy: bool = False,
+                          columnar: bool = False, checks_deadline: bool = True):
+    """
+    :param checks_deadline: False if caller checks deadline, context of async server can not abort in executor thread
+    """
     sig = signature(func)
     parameters = tuple(k for k, v in sig._parameters.items() if v.kind.value == 1)
+    output_type = method_meta.output_type
+    injects_time = _injects_time_remaining(method_meta, parameters)
+    request_arrays, response_arrays = _array_fields(method_meta, parameters, numpy)
 
+    build = make_response_builder(output_type, builder, response_arrays)
+    columns, make_message, build = _make_stage_funcs(method_meta, metrics, numpy, columnar, build)
+    if metrics is not None:
+        from .metrics import HANDLER, TO_DICT
     if method_meta.method_type.is_unary_response:
-        return_func = partial(parse_to_dict, method_meta.output_type)
+        return_func = build
+        if metrics is not None:
+            func = metrics.timed(method_meta.path, HANDLER, func)
     else:
-        return_func = partial(parse_stream_return, method_meta.output_type)
+        return_func = partial(map, build)
+        if metrics is not None:
+            func = metrics.timed_stream(method_meta.path, HANDLER, func)
 
-    if method_meta.method_type.is_unary_request:
-        request_parser = partial(parse_request, parameters)
+    if method_meta.method_type.is_unary_request and parameters == RAW_PARAMETERS:
+        if numpy:
+            func = warp_deserialize_handler(method_meta, func)
+        if method_meta.method_type.is_unary_response:
+            def wrapper(request, context):
+                result = func(request, context)
+                return result if isinstance(result, output_type) else return_func(result)
+        else:
+            def wrapper(request, context):
+                return return_func(func(request, context))
+    elif method_meta.method_type.is_unary_request:
+        if numpy:
+            request_parser = _make_array_request_parser(method_meta, parameters, request_arrays)
+        else:
+            request_parser = make_request_parser(method_meta, parameters)
+        if metrics is not None:
+            request_parser = metrics.timed(method_meta.path, TO_DICT, request_parser)
 
         def wrapper(request, context):
-            result = func(**request_parser(request), context=context)
+            args = request_parser(request)
+            if checks_deadline:
+                check_deadline(method_meta, context, metrics)
+            if injects_time:
+                args[TIME_REMAINING] = context.time_remaining()
+            result = func(**args, context=context)
             return return_func(result)
     else:
+        request_parser = partial(parse_stream_request, batch_size=batch_size, batch_timeout=batch_timeout,
+                                 columns=columns, make_message=make_message)
+
         def wrapper(request, context):
-            result = func(parse_stream_request(request), context=context)
+            kwargs = {TIME_REMAINING: context.time_remaining()} if injects_time else {}
+            result = func(request_parser(request), context=context, **kwargs)
             return return_func(result)
 
     return wrapper
 
 
-def warp_async_handler(method_meta: MethodMetaData, func):
+def warp_async_handler(
+        method_meta: MethodMetaData,
+        func,
+        raw: bool = False,
+        builder: str = None,
+        cache: 'LRU' = None,
+        single_flight: 'AsyncSingleFlight' = None,
+        raw_bytes: bool = False,
+        executor: Executor = None,
+        concurrency: int = None,
+        metrics: 'Metrics' = None,
+        batch_size: int = None,
+        batch_timeout: float = None,
+        numpy: bool = False,
+        columnar: bool = False,
+):
+    is_async = iscoroutinefunction(func) or isasyncgenfunction(func)
+    if executor is not None:
+        check_executor(method_meta, executor)
+    if not is_async and is_process_pool(executor):
+        # closure of handler can not be sent to other process, only handler func runs there
+        func = warp_executor_func(func, executor)
+        executor = None
+    if raw_bytes or raw:
+        handler = func
+    elif is_async:
+        handler = _warp_async_convert_handler(method_meta, func, builder, metrics, batch_size=batch_size,
+                                              batch_timeout=batch_timeout, numpy=numpy, columnar=columnar)
+    else:
+        # `warp_executor_handler` checks deadline in executor thread and aborts on event loop
+        handler = _warp_convert_handler(method_meta, func, builder, metrics, batch_size=batch_size,
+                                        batch_timeout=batch_timeout, numpy=numpy, columnar=columnar,
+                                        checks_deadline=False)
+    if not is_async:
+        handler = warp_executor_handler(method_meta, handler, executor, metrics)
+    if not raw_bytes and not numpy and (cache is not None or single_flight is not None):
+        handler = warp_async_deserialize_handler(method_meta, handler)
+    if single_flight is not None:
+        handler = warp_async_single_flight_handler(method_meta, handler, single_flight)
+    if concurrency is not None:
+        handler = warp_async_concurrency_handler(method_meta, handler, concurrency)
+    if cache is not None:
+        handler = warp_async_cache_handler(method_meta, handler, cache)
+    # raw handler is called as it is
+    if handler is not func:
+        handler = warp_async_deadline_handler(method_meta, handler, metrics)
+    if metrics is not None:
+        handler = warp_async_metrics_handler(method_meta, handler, metrics)
+    return handler
+
+
+def _warp_async_convert_handler(method_meta: MethodMetaData, func, builder: str = None, metrics: 'Metrics' = None,
+                                batch_size: int = None, batch_timeout: float = None, numpy: bool = False,
+                                columnar: bool = False):
     sig = signature(func)
     parameters = tuple(k for k, v in sig._parameters.items() if v.kind.value == 1)
+    output_type = method_meta.output_type
 
     is_unary_response = method_meta.method_type.is_unary_response
     is_unary_request = method_meta.method_type.is_unary_request
+    injects_time = _injects_time_remaining(method_meta, parameters)
+    request_arrays, response_arrays = _array_fields(method_meta, parameters, numpy)
 
+    build = make_response_builder(output_type, builder, response_arrays)
+    columns, make_message, build = _make_stage_funcs(method_meta, metrics, numpy, columnar, build)
+    if metrics is not None:
+        from .metrics import HANDLER, TO_DICT
     if is_unary_response:
-        return_func = partial(parse_to_dict, method_meta.output_type)
+        return_func = build
+        if metrics is not None:
+            func = metrics.timed_async(method_meta.path, HANDLER, func)
     else:
-        return_func = partial(parse_async_stream_return, method_meta.output_type)
+        return_func = partial(_build_async_stream, build)
+        if metrics is not None:
+            func = metrics.timed_async_stream(method_meta.path, HANDLER, func)
 
-    if is_unary_request:
-        request_parser = partial(parse_request, parameters)
-        return_func = partial(parse_to_dict, method_meta.output_type)
-        async def wrapper(request, context):
-            result = func(**request_parser(request), context=context)
-            return return_func(await result)
+    if is_unary_request and parameters == RAW_PARAMETERS:
+        if numpy:
+            func = warp_deserialize_handler(method_meta, func)
+        if is_unary_response:
+            async def wrapper(request, context):
+                result = await func(request, context)
+                return result if isinstance(result, output_type) else return_func(result)
+        else:
+            async def wrapper(request, context):
+                async for msg in return_func(func(request, context)):
+                    yield msg
+    elif is_unary_request:
+        if numpy:
+            request_parser = _make_array_request_parser(method_meta, parameters, request_arrays)
+        else:
+            request_parser = make_request_parser(method_meta, parameters)
+        if metrics is not None:
+            request_parser = metrics.timed(method_meta.path, TO_DICT, request_parser)
+
+        async def call(request, context):
+            args = request_parser(request)
+            await check_async_deadline(method_meta, context, metrics)
+            if injects_time:
+                args[TIME_REMAINING] = context.time_remaining()
+            return func(**args, context=context)
 
-    else:
         if is_unary_response:
             async def wrapper(request, context):
-                result = func(parse_async_stream_request(request), context=context)
+                result = await call(request, context)
                 return return_func(await result)
         else:
             async def wrapper(request, context):
-                result = func(parse_async_stream_request(request), context=context)
+                result = await call(request, context)
                 async for msg in return_func(result):
                     yield msg
 
+    else:
+        request_parser = partial(parse_async_stream_request, batch_size=batch_size, batch_timeout=batch_timeout,
+                                 columns=columns, make_message=make_message)
+
+        def call(request, context):
+            kwargs = {TIME_REMAINING: context.time_remaining()} if injects_time else {}
+            return func(request_parser(request), context=context, **kwargs)
+
+        if columns is not None and batch_size is None:
+            # whole stream is collected before handler is called
+            async def wrapper(request, context):
+                kwargs = {TIME_REMAINING: context.time_remaining()} if injects_time else {}
+                batch = await request_parser(request)
+                return return_func(await func(batch, context=context, **kwargs))
+        elif is_unary_response:
+            async def wrapper(request, context):
+                return return_func(await call(request, context))
+        else:
+            async def wrapper(request, context):
+                async for msg in return_func(call(request, context)):
+                    yield msg
+
+    return wrapper
+
+
+def warp_deadline_handler(method_meta: MethodMetaData, handler, metrics: 'Metrics' = None):
+    """drop call which waited in queue until its deadline passed, before request is converted"""
+    if method_meta.method_type.is_unary_response:
+        def wrapper(request, context):
+            check_deadline(method_meta, context, metrics)
+            return handler(request, context)
+    else:
+        def wrapper(request, context):
+            check_deadline(method_meta, context, metrics)
+            yield from handler(request, context)
+
+    return wrapper
+
+
+def warp_async_deadline_handler(method_meta: MethodMetaData, handler, metrics: 'Metrics' = None):
+    if method_meta.method_type.is_unary_response:
+        async def wrapper(request, context):
+            await check_async_deadline(method_meta, context, metrics)
+            return await handler(request, context)
+    else:
+        async def wrapper(request, context):
+            await check_async_deadline(method_meta, context, metrics)
+            async for response in handler(request, context):
+                yield response
+
+    return wrapper
+
+
+def _status_code(code, error: BaseException = None):
+    """status code set to context, or code of error which ended call without it"""
+    if code is not None or error is None:
+        return code
+    if isinstance(error, (GeneratorExit, asyncio.CancelledError)):
+        return grpc.StatusCode.CANCELLED
+    return grpc.StatusCode.UNKNOWN
+
+
+def warp_metrics_handler(method_meta: MethodMetaData, handler, metrics: 'Metrics'):
+    """record latency and status code of whole call, response stream is timed until it ends"""
+    from .cache import context_status
+
+    path = method_meta.path
+
+    if method_meta.method_type.is_unary_response:
+        def wrapper(request, context):
+            started = perf_counter()
+            error = None
+            try:
+                return handler(request, context)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                metrics.observe_call(path, _status_code(context_status(context)[0], error), perf_counter() - started)
+    else:
+        def wrapper(request, context):
+            started = perf_counter()
+            error = None
+            try:
+                yield from handler(request, context)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                metrics.observe_call(path, _status_code(context_status(context)[0], error), perf_counter() - started)
+
+    return wrapper
+
+
+def warp_async_metrics_handler(method_meta: MethodMetaData, handler, metrics: 'Metrics'):
+    from .cache import context_status
+
+    path = method_meta.path
+
+    if method_meta.method_type.is_unary_response:
+        async def wrapper(request, context):
+            started = perf_counter()
+            error = None
+            try:
+                return await handler(request, context)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                metrics.observe_call(path, _status_code(context_status(context)[0], error), perf_counter() - started)
+    else:
+        async def wrapper(request, context):
+            started = perf_counter()
+            error = None
+            try:
+                async for response in handler(request, context):
+                    yield response
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                metrics.observe_call(path, _status_code(context_status(context)[0], error), perf_counter() - started)
+
+    return wrapper
+
+
+def warp_deserialize_handler(method_meta: MethodMetaData, handler):
+    """let handler which expects request message get serialized unary request"""
+    from_string = method_meta.input_type.FromString
+
+    def wrapper(request, context):
+        return handler(from_string(request), context)
+
+    return wrapper
+
+
+def _collect(func, args, kwargs) -> list:
+    return list(func(*args, **kwargs))
+
+
+def is_process_pool(executor: Executor) -> bool:
+    """executor is `ProcessPoolExecutor`, checked without importing multiprocessing if nothing imported it"""
+    process = sys.modules.get('concurrent.futures.process')
+    return process is not None and isinstance(executor, process.ProcessPoolExecutor)
+
+
+def check_executor(method_meta: MethodMetaData, executor: Executor):
+    if is_process_pool(executor) and not method_meta.method_type.is_unary_request:
+        raise RegisterError(f'{method_meta.name} is stream request method, it can not run in ProcessPoolExecutor')
+
+
+def supports_thread_pool_behavior() -> bool:
+    """grpc server runs behavior in its `experimental_thread_pool` (not supported by older grpcio)"""
+    from grpc import _server
+    return hasattr(_server, '_select_thread_pool_for_behavior')
+
+
+def warp_thread_pool_handler(method_meta: MethodMetaData, handler, executor: ThreadPoolExecutor):
+    """
+    run call of sync server in its own thread pool. grpc server runs behavior which has `experimental_thread_pool`
+    in that pool instead of its pool, so slow method does not take thread of server.
+    older grpcio ignores it, then thread of server submits call to the pool and waits for it
+    """
+    if not supports_thread_pool_behavior():
+        return warp_submit_handler(method_meta, handler, executor)
+
+    def wrapper(request, context):
+        return handler(request, context)
+
+    wrapper.experimental_thread_pool = executor
+    return wrapper
+
+
+def warp_testing_thread_pool(method_meta: MethodMetaData, handler):
+    """grpc_testing servicer ignores `experimental_thread_pool`, call is run in the pool and waited"""
+    executor = getattr(handler, 'experimental_thread_pool', None)
+    if executor is None:
+        return handler
+    return warp_submit_handler(method_meta, handler, executor)
+
+
+def warp_submit_handler(method_meta: MethodMetaData, handler, executor: ThreadPoolExecutor):
+    """calling thread submits call to thread pool and waits for it, response stream is collected in the pool"""
+    if method_meta.method_type.is_unary_response:
+        def wrapper(request, context):
+            return executor.submit(handler, request, context).result()
+    else:
+        def wrapper(request, context):
+            return iter(executor.submit(_collect, handler, (request, context), {}).result())
+
+    return wrapper
+
+
+def warp_executor_func(func, executor: Executor):
+    """
+    run handler func of sync server in executor (not thread pool), calling thread of grpc server waits for it.
+    context can not be sent to other process, so handler in `ProcessPoolExecutor` gets None as context,
+    and gets request message only when it declares `request` parameter.
+    response stream of handler is collected in executor before it is sent.
+    """
+    is_process = is_process_pool(executor)
+    is_generator = isgeneratorfunction(func)
+    drop_request = 'request' not in signature(func).parameters
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if is_process:
+            args = tuple(None if isinstance(arg, grpc.ServicerContext) else arg for arg in args)
+            if 'context' in kwargs:
+                kwargs['context'] = None
+            if drop_request:
+                kwargs.pop('request', None)
+        if is_generator:
+            return iter(executor.submit(_collect, func, args, kwargs).result())
+        return executor.submit(func, *args, **kwargs).result()
+
+    return wrapper
+
+
+def warp_concurrency_handler(method_meta: MethodMetaData, handler, limit: int):
+    """reject call with RESOURCE_EXHAUSTED while `limit` calls of method are running"""
+    slots = threading.BoundedSemaphore(limit)
+    details = f'{method_meta.name} is over concurrency limit {limit}'
+
+    if method_meta.method_type.is_unary_response:
+        def wrapper(request, context):
+            if not slots.acquire(blocking=False):
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, details)
+            try:
+                return handler(request, context)
+            finally:
+                slots.release()
+    else:
+        def wrapper(request, context):
+            if not slots.acquire(blocking=False):
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, details)
+            try:
+                yield from handler(request, context)
+            finally:
+                slots.release()
+
+    return wrapper
+
+
+def warp_async_concurrency_handler(method_meta: MethodMetaData, handler, limit: int):
+    # every call runs on one event loop, so plain counter is enough
+    running = 0
+    details = f'{method_meta.name} is over concurrency limit {limit}'
+
+    if method_meta.method_type.is_unary_response:
+        async def wrapper(request, context):
+            nonlocal running
+            if running >= limit:
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, details)
+            running += 1
+            try:
+                return await handler(request, context)
+            finally:
+                running -= 1
+    else:
+        async def wrapper(request, context):
+            nonlocal running
+            if running >= limit:
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, details)
+            running += 1
+            try:
+                async for response in handler(request, context):
+                    yield response
+            finally:
+                running -= 1
+
+    return wrapper
+
+
+def _sync_iterator(async_iterator, loop):
+    """iterate async iterator of event loop in other thread"""
+    async_iterator = async_iterator.__aiter__()
+    while True:
+        try:
+            yield asyncio.run_coroutine_threadsafe(async_iterator.__anext__(), loop).result()
+        except StopAsyncIteration:
+            return
+
+
+def warp_executor_handler(method_meta: MethodMetaData, handler, executor: Executor = None, metrics: 'Metrics' = None):
+    """
+    run sync handler of async server in executor, so it does not block event loop.
+    None is default executor of event loop (`AsyncServer` sets thread pool sized by `worker`).
+    call whose deadline passed while it waited for executor thread is aborted without running handler
+    """
+    is_unary_request = method_meta.method_type.is_unary_request
+    expired = object()
+
+    def call(request, context, loop):
+        # abort of async context is coroutine, so it is awaited on event loop (if call is not cancelled yet)
+        if is_expired(context):
+            count_expired(method_meta, metrics)
+            return expired
+        if not is_unary_request:
+            request = _sync_iterator(request, loop)
+        return handler(request, context)
+
+    if method_meta.method_type.is_unary_response:
+        async def wrapper(request, context):
+            loop = asyncio.get_event_loop()
+            response = await loop.run_in_executor(executor, call, request, context, loop)
+            if response is expired:
+                await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, EXPIRED_DETAILS)
+            return response
+    else:
+        end = object()
+
+        async def wrapper(request, context):
+            loop = asyncio.get_event_loop()
+            iterator = await loop.run_in_executor(executor, call, request, context, loop)
+            if iterator is expired:
+                await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, EXPIRED_DETAILS)
+            iterator = iter(iterator)
+            while True:
+                response = await loop.run_in_executor(executor, next, iterator, end)
+                if response is end:
+                    break
+                yield response
+
+    return wrapper
+
+
+def warp_async_deserialize_handler(method_meta: MethodMetaData, handler):
+    from_string = method_meta.input_type.FromString
+
+    async def wrapper(request, context):
+        return await handler(from_string(request), context)
+
+    return wrapper
+
+
+def warp_cache_handler(method_meta: MethodMetaData, handler, cache: 'LRU'):
+    """handler gets serialized request bytes and returns serialized response bytes"""
+    from .cache import canonical_request, is_ok_context
+
+    use_metadata = bool(cache.metadata_keys)
+    from_string = method_meta.input_type.FromString
+
+    def wrapper(request, context):
+        key = cache.make_key(canonical_request(from_string(request)),
+                             context.invocation_metadata() if use_metadata else None)
+        response = cache.get(key)
+        if response is None:
+            response = serialize_response(handler(request, context))
+            if is_ok_context(context):
+                cache.set(key, response)
+        return response
+
+    return wrapper
+
+
+def warp_async_cache_handler(method_meta: MethodMetaData, handler, cache: 'LRU'):
+    from .cache import canonical_request, is_ok_context
+
+    use_metadata = bool(cache.metadata_keys)
+    from_string = method_meta.input_type.FromString
+
+    async def wrapper(request, context):
+        key = cache.make_key(canonical_request(from_string(request)),
+                             context.invocation_metadata() if use_metadata else None)
+        response = cache.get(key)
+        if response is None:
+            response = serialize_response(await handler(request, context))
+            if is_ok_context(context):
+                cache.set(key, response)
+        return response
+
+    return wrapper
+
+
+def warp_single_flight_handler(method_meta: MethodMetaData, handler, flight: 'SingleFlight'):
+    """concurrent calls with same request bytes share one handler call"""
+    from .cache import context_status
+
+    use_metadata = bool(flight.metadata_keys)
+
+    def call(request, context):
+        try:
+            response = serialize_response(handler(request, context))
+        except Exception as e:
+            return None, e, context_status(context)
+        return response, None, context_status(context)
+
+    def wrapper(request, context):
+        key = flight.make_key(request, context.invocation_metadata() if use_metadata else None)
+        (response, error, (code, details)), coalesced = flight.do(key, call, request, context)
+        if coalesced and code is not None:
+            if error is not None:
+                context.abort(code, details)
+            context.set_code(code)
+            context.set_details(details)
+        if error is not None:
+            raise error
+        return response
+
+    return wrapper
+
+
+def warp_async_single_flight_handler(method_meta: MethodMetaData, handler, flight: 'AsyncSingleFlight'):
+    from .cache import context_status
+
+    use_metadata = bool(flight.metadata_keys)
+
+    async def call(request, context):
+        try:
+            response = serialize_response(await handler(request, context))
+        except Exception as e:
+            return None, e, context_status(context)
+        return response, None, context_status(context)
+
+    async def wrapper(request, context):
+        key = flight.make_key(request, context.invocation_metadata() if use_metadata else None)
+        (response, error, (code, details)), coalesced = await flight.do(key, call, request, context)
+        if coalesced and code is not None:
+            if error is not None:
+                await context.abort(code, details)
+            context.set_code(code)
+            context.set_details(details)
+        if error is not None:
+            raise error
+        return response
+
+    return wrapper
+
+
+def _to_bytes(request) -> bytes:
+    return request if type(request) is bytes else request.SerializeToString()
+
+
+def _message_transport_funcs(method_meta: MethodMetaData, bytes_request: bool = True):
+    output_type = method_meta.output_type
+    is_unary_request = method_meta.method_type.is_unary_request
+
+    def to_message(response):
+        return output_type.FromString(response) if type(response) is bytes else response
+
+    def to_bytes(request):
+        if not bytes_request:
+            return request
+        if is_unary_request:
+            return _to_bytes(request)
+        return (_to_bytes(item) for item in request)
+
+    return to_bytes, to_message
+
+
+def warp_message_transport(method_meta: MethodMetaData, handler, bytes_request: bool = True):
+    """
+    adapt handler using bytes transport to grpc_testing servicer,
+    which passes request message object and expects response message object
+
+    :param bytes_request: False if handler gets request message and only its response can be bytes
+    """
+    to_bytes, to_message = _message_transport_funcs(method_meta, bytes_request)
+
+    if method_meta.method_type.is_unary_response:
+        def wrapper(request, context):
+            return to_message(handler(to_bytes(request), context))
+    else:
+        def wrapper(request, context):
+            for response in handler(to_bytes(request), context):
+                yield to_message(response)
+
+    return wrapper
+
+
+def warp_async_message_transport(method_meta: MethodMetaData, handler, bytes_request: bool = True):
+    to_bytes, to_message = _message_transport_funcs(method_meta, bytes_request)
+
+    if method_meta.method_type.is_unary_response:
+        async def wrapper(request, context):
+            return to_message(await handler(to_bytes(request), context))
+    else:
+        async def wrapper(request, context):
+            async for response in handler(to_bytes(request), context):
+                yield to_message(response)
+
     return wrapper
 
 
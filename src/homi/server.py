@@ -6,6 +6,8 @@ import grpc
 from grpc_interceptor import ServerInterceptor
 
 from .app import App
+from .admission import AdmissionControl, AdmissionInterceptor, AdmissionThreadPool
+from .config import Listener, ServerOptions
 from .exception import ServerSSLConfigError
 
 
@@ -19,7 +21,11 @@ class Server:
                  alts: bool = False,
                  private_key: bytes = None,
                  certificate: bytes = None,
-                 interceptors: List[ServerInterceptor] = None
+                 interceptors: List[ServerInterceptor] = None,
+                 reuse_port: bool = False,
+                 server_options: ServerOptions = None,
+                 admission: AdmissionControl = None,
+                 listeners: List[Listener] = None,
                  ):
         self.host = host
         self.port = port
@@ -34,10 +40,29 @@ class Server:
         self._server_credentials = None
         self.thread_pool = futures.ThreadPoolExecutor(max_workers=self.worker)
         self.interceptors = interceptors
+        self.admission = admission
+        if admission is not None:
+            self.thread_pool = AdmissionThreadPool(self.worker, admission)
+            # admission control runs first, so rejected rpc does not reach other interceptors
+            self.interceptors = [AdmissionInterceptor(admission), *(interceptors or [])]
+        self.reuse_port = reuse_port
+        if server_options is None:
+            server_options = ServerOptions.from_dict(app.config.get('server'))
+        self.server_options = server_options
+        # host, port are not used when listeners are set
+        self._listeners = [listener.validate() for listener in listeners or []]
+        self.ports: List[int] = []
 
     def load_config_from_env(self):
         pass
 
+    @property
+    def options(self):
+        options = self.server_options.grpc_options
+        if self.reuse_port:
+            options.append(('grpc.so_reuseport', 1))
+        return options
+
     @property
     def endpoint(self):
         host = self.host if self.host else "[::]"
@@ -50,26 +75,37 @@ class Server:
                 ((self.private_key, self.certificate,),))
         return self._server_credentials
 
-    def _add_port(self):
+    @property
+    def listeners(self) -> List[Listener]:
+        if self._listeners:
+            return self._listeners
         if self.alts:
-            self.server.add_secure_port(self.endpoint, grpc.alts_server_credentials())
-        elif self.private_key and self.certificate:
-            self.server.add_secure_port(self.endpoint, self.server_credentials)
-        elif self.private_key or self.certificate:
+            return [Listener(self.endpoint, alts=True)]
+        return [Listener(self.endpoint, tls=bool(self.private_key and self.certificate))]
+
+    def _add_port(self):
+        if bool(self.private_key) != bool(self.certificate) and not self.alts:
             # error
             raise ServerSSLConfigError('If you want enable ssl feature, You Must set tls_key, certificate config both ')
-        else:
-            self.server.add_insecure_port(self.endpoint)
+        ssl_credentials = self.server_credentials if self.private_key and self.certificate else None
+        self.ports = [listener.add_to(self.server, ssl_credentials) for listener in self.listeners]
 
     def run(self, wait=True):
         if self.debug:
             os.environ['GRPC_VERBOSITY'] = 'debug'
-        self.server = grpc.server(self.thread_pool, interceptors=self.interceptors)
+        self.server = grpc.server(
+            self.thread_pool,
+            interceptors=self.interceptors,
+            options=self.options,
+            maximum_concurrent_rpcs=self.server_options.maximum_concurrent_rpcs,
+            compression=self.server_options.grpc_compression,
+        )
         self.app.bind_to_server(self.server)
         self._add_port()
         self.server.start()
         print('run server')
-        print(f'# port : {self.port}')
+        for listener in self.listeners:
+            print(f'# listen : {listener.address}')
         if wait:
             self.wait_for_termination()
 
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Sequence, Tuple
+
+from .cache import make_request_key
+
+
+class FlightStats(NamedTuple):
+    calls: int
+    coalesced: int
+    in_flight: int
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BaseSingleFlight:
+    def __init__(self, metadata_keys: Sequence[str] = ()):
+        self.metadata_keys = frozenset(metadata_keys)
+        self._calls: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._total = 0
+        self._coalesced = 0
+
+    @property
+    def stats(self) -> FlightStats:
+        with self._lock:
+            return FlightStats(calls=self._total, coalesced=self._coalesced, in_flight=len(self._calls))
+
+    def make_key(self, request: bytes, metadata=None) -> Hashable:
+        return make_request_key(request, metadata, self.metadata_keys)
+
+
+class SingleFlight(BaseSingleFlight):
+    """
+    coalesce concurrent identical unary-unary calls of thread pool `Server`.
+    while one handler is running for request bytes, other calls with same request bytes
+    wait for it and share its response (and status), instead of running handler again.
+
+    ```python
+    @app.method('helloworld.Greeter', single_flight=SingleFlight())
+    def SayHello(name, **kwargs):
+        return {"message": f"Hello {name}!"}
+    ```
+
+    :param metadata_keys: invocation metadata keys which are part of flight key
+    """
+
+    def do(self, key: Hashable, func: Callable, *args) -> Tuple[Any, bool]:
+        """
+        run func(*args) once for concurrent calls with same key.
+        return (result, coalesced), coalesced is True when result came from another caller
+        """
+        with self._lock:
+            self._total += 1
+            call = self._calls.get(key)
+            coalesced = call is not None
+            if coalesced:
+                self._coalesced += 1
+            else:
+                call = self._calls[key] = _Call()
+        if coalesced:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class AsyncSingleFlight(BaseSingleFlight):
+    """
+    `SingleFlight` for `AsyncServer`. calls must run on same event loop.
+    """
+
+    async def do(self, key: Hashable, func: Callable, *args) -> Tuple[Any, bool]:
+        with self._lock:
+            self._total += 1
+            task = self._calls.get(key)
+            coalesced = task is not None
+            if coalesced:
+                self._coalesced += 1
+            else:
+                # shared call runs in its own task, it does not belong to rpc of first caller
+                task = self._calls[key] = asyncio.ensure_future(func(*args))
+                task.add_done_callback(partial(self._done, key))
+        # shield, cancel of one waiting call (client deadline, disconnect) must not cancel shared result
+        return await asyncio.shield(task), coalesced
+
+    def _done(self, key: Hashable, task: asyncio.Future):
+        with self._lock:
+            del self._calls[key]
+        if not task.cancelled():
+            # mark exception retrieved, every waiting call may be cancelled
+            task.exception()
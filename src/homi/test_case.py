@@ -8,11 +8,6 @@ from time import sleep
 from typing import Any, Dict
 
 import grpc
-import grpc_testing
-from cryptography import x509
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.x509.oid import NameOID
 
 from . import App, AsyncApp, AsyncServer, Server, Service
 
@@ -23,6 +18,7 @@ class HomiTestCase(unittest.TestCase):
 
     def get_test_server(self):
         if not self._test_server:
+            import grpc_testing
             servicers = {}
             for svc in self.app.services:
                 if isinstance(svc, Service):
@@ -66,12 +62,16 @@ class HomiRealServerTestCase(unittest.TestCase):
     @property
     def tls_key(self):
         if not self._tls_key:
+            from cryptography.hazmat.primitives.asymmetric import rsa
             self._tls_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
         return self._tls_key
 
     @property
     def certificate(self):
         if not self._certificate:
+            from cryptography import x509
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.x509.oid import NameOID
             subject = issuer = x509.Name([
                 x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
                 x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, u"California"),
@@ -98,6 +98,7 @@ class HomiRealServerTestCase(unittest.TestCase):
         if self.alts:
             return grpc.alts_channel_credentials()
         elif self.tls:
+            from cryptography.hazmat.primitives import serialization
             cert = self.certificate.public_bytes(serialization.Encoding.PEM)
             return grpc.ssl_channel_credentials(cert)
         return None
@@ -107,6 +108,7 @@ class HomiRealServerTestCase(unittest.TestCase):
         if not self.tls:
             return {}
         else:
+            from cryptography.hazmat.primitives import serialization
             return {
                 "private_key": self.tls_key.private_bytes(
                     encoding=serialization.Encoding.PEM,
@@ -116,6 +118,14 @@ class HomiRealServerTestCase(unittest.TestCase):
                 "certificate": self.certificate.public_bytes(serialization.Encoding.PEM),
             }
 
+    @property
+    def target(self) -> str:
+        """address of test server for client channel, first one of `listeners` in server config if it is set"""
+        config = {**self.default_server_config, **self.test_server_config}
+        if config.get('listeners'):
+            return config['listeners'][0].address
+        return f'{config["host"]}:{config["port"]}'
+
     def get_server_config(self, merge_config: dict = None):
         config = merge_config or {}
 
@@ -153,7 +163,11 @@ class HomiRealServerTestCase(unittest.TestCase):
         config = merge_config or {}
         if self.test_server:
             try:
-                self.test_server.stop()
+                if isinstance(self.app, AsyncApp):
+                    # async server is stopped in its event loop thread
+                    self.server_stop()
+                else:
+                    self.test_server.stop()
             except Exception:
                 pass
         if isinstance(self.app, AsyncApp):
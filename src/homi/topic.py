@@ -0,0 +1,298 @@
+import asyncio
+import threading
+from collections import deque
+from time import monotonic
+from typing import NamedTuple
+
+import grpc
+
+from .exception import RegisterError
+
+# slow subscriber whose queue is full
+DROP = 'drop'  # oldest queued event is dropped
+DISCONNECT = 'disconnect'  # stream is ended with RESOURCE_EXHAUSTED
+BLOCK = 'block'  # publisher waits for free space (up to `timeout`, then subscriber is disconnected)
+POLICIES = (DROP, DISCONNECT, BLOCK)
+
+SLOW_SUBSCRIBER_DETAILS = 'subscriber is too slow, events are not delivered'
+
+
+class TopicStats(NamedTuple):
+    published: int
+    subscribers: int
+    dropped: int
+    disconnected: int
+
+
+class BaseTopic:
+    def __init__(self, message_type, maxsize: int = 100, policy: str = DROP, timeout: float = None,
+                 builder: str = None):
+        if policy not in POLICIES:
+            raise RegisterError(f'policy must be one of {", ".join(POLICIES)}')
+        if maxsize < 1:
+            raise RegisterError('maxsize must be positive')
+        from .proto_meta import make_response_builder
+
+        self.message_type = message_type
+        self.maxsize = maxsize
+        self.policy = policy
+        self.timeout = timeout
+        self._build = make_response_builder(message_type, builder)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._published = 0
+        self._dropped = 0
+        self._disconnected = 0
+        self.closed = False
+
+    @property
+    def stats(self) -> TopicStats:
+        with self._lock:
+            # drops of current subscribers and of removed ones
+            dropped = self._dropped + sum(subscription.dropped for subscription in self._subscribers)
+            return TopicStats(published=self._published, subscribers=len(self._subscribers),
+                              dropped=dropped, disconnected=self._disconnected)
+
+    def serialize(self, event) -> bytes:
+        """event (dict, message or serialized message) is built and serialized only once for every subscriber"""
+        if type(event) is bytes:
+            return event
+        return self._build(event).SerializeToString()
+
+    def _subscribers_of_event(self) -> list:
+        with self._lock:
+            if self.closed:
+                raise RuntimeError('topic is closed')
+            self._published += 1
+            return list(self._subscribers)
+
+    def _add(self, subscription):
+        with self._lock:
+            if self.closed:
+                subscription.closed = True
+            else:
+                self._subscribers.add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+                self._dropped += subscription.dropped
+                self._disconnected += subscription.overflowed
+
+
+class Subscription:
+    """serialized events of topic for one response stream, return it from handler"""
+
+    def __init__(self, topic: 'Topic', context=None):
+        self._topic = topic
+        self._context = context
+        self._events = deque()
+        self._cond = threading.Condition()
+        self.closed = False
+        self.overflowed = False
+        self.dropped = 0
+        topic._add(self)
+        if context is not None:
+            # wake stream waiting for event when call ends (client cancel, deadline)
+            context.add_callback(self.close)
+
+    def _put(self, data: bytes) -> bool:
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self._events) < self._topic.maxsize or self._make_space():
+                self._events.append(data)
+                self._cond.notify_all()
+                return True
+            if self.closed:
+                return False
+            self.overflowed = True
+            self._events.clear()
+        self.close()
+        return False
+
+    def _make_space(self) -> bool:
+        """free space in full queue with policy of topic, False if subscriber must be disconnected"""
+        topic = self._topic
+        if topic.policy == DROP:
+            self._events.popleft()
+            self.dropped += 1
+            return True
+        if topic.policy == DISCONNECT:
+            return False
+        deadline = None if topic.timeout is None else monotonic() + topic.timeout
+        while len(self._events) >= topic.maxsize and not self.closed:
+            remaining = None if deadline is None else deadline - monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._cond.wait(remaining)
+        return not self.closed
+
+    def close(self):
+        """end stream after queued events"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._topic._remove(self)
+
+    def __iter__(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._events and not self.closed:
+                        self._cond.wait()
+                    if not self._events:
+                        break
+                    data = self._events.popleft()
+                    # wake publisher waiting for space
+                    self._cond.notify_all()
+                yield data
+        finally:
+            self.close()
+        if self.overflowed and self._context is not None:
+            self._context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, SLOW_SUBSCRIBER_DETAILS)
+
+
+class Topic(BaseTopic):
+    """
+    broadcast of server streaming method. event is built and serialized once, and same bytes are sent to
+    every subscribed stream. each subscriber has queue of `maxsize` events, `policy` decides what happens
+    when subscriber is too slow and its queue is full (`DROP`, `DISCONNECT`, `BLOCK`)
+
+    ```python
+    prices = Topic(PriceEvent, maxsize=1000, policy=DROP)
+
+    @app.method('market.Market', 'Watch', topic=prices)
+    def watch(context, **kwargs):
+        return prices.subscribe(context)
+
+    prices.publish({'symbol': 'homi', 'price': 100})  # from any thread
+    ```
+
+    :param message_type: response message class of method
+    :param timeout: seconds which publisher waits for slow subscriber with `BLOCK` policy, None waits forever
+    :param builder: how to make message from dict event, same as `builder` method option
+    """
+
+    def subscribe(self, context=None) -> Subscription:
+        """
+        iterator of serialized events for response stream.
+        with grpc `context`, subscription ends when call ends, and disconnected stream gets RESOURCE_EXHAUSTED
+        """
+        return Subscription(self, context)
+
+    def publish(self, event) -> int:
+        """send event to every subscriber, return number of subscribers which got it"""
+        data = self.serialize(event)
+        return sum(subscription._put(data) for subscription in self._subscribers_of_event())
+
+    def close(self):
+        """end every subscribed stream after its queued events"""
+        with self._lock:
+            self.closed = True
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.close()
+
+
+class AsyncSubscription:
+    """`Subscription` of `AsyncTopic`, async iterator"""
+
+    def __init__(self, topic: 'AsyncTopic', context=None):
+        self._topic = topic
+        self._context = context
+        self._events = deque()
+        self._cond = asyncio.Condition()
+        self.closed = False
+        self.overflowed = False
+        self.dropped = 0
+        topic._add(self)
+
+    async def _put(self, data: bytes) -> bool:
+        async with self._cond:
+            if self.closed:
+                return False
+            if len(self._events) < self._topic.maxsize or await self._make_space():
+                self._events.append(data)
+                self._cond.notify_all()
+                return True
+            if self.closed:
+                return False
+            self.overflowed = True
+            self._events.clear()
+        await self.close()
+        return False
+
+    async def _make_space(self) -> bool:
+        topic = self._topic
+        if topic.policy == DROP:
+            self._events.popleft()
+            self.dropped += 1
+            return True
+        if topic.policy == DISCONNECT:
+            return False
+        try:
+            await asyncio.wait_for(
+                self._cond.wait_for(lambda: len(self._events) < topic.maxsize or self.closed), topic.timeout,
+            )
+        except asyncio.TimeoutError:
+            return False
+        return not self.closed
+
+    async def close(self):
+        async with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._topic._remove(self)
+
+    async def __aiter__(self):
+        try:
+            while True:
+                async with self._cond:
+                    await self._cond.wait_for(lambda: self._events or self.closed)
+                    if not self._events:
+                        break
+                    data = self._events.popleft()
+                    self._cond.notify_all()
+                yield data
+        finally:
+            # stream may be cancelled, lock of condition is not awaited here
+            self.closed = True
+            self._topic._remove(self)
+        if self.overflowed and self._context is not None:
+            await self._context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, SLOW_SUBSCRIBER_DETAILS)
+
+
+class AsyncTopic(BaseTopic):
+    """
+    `Topic` of `AsyncApp`, it must be used in event loop of server
+
+    ```python
+    prices = AsyncTopic(PriceEvent, maxsize=1000, policy=BLOCK, timeout=1)
+
+    @app.method('market.Market', 'Watch', topic=prices)
+    async def watch(context, **kwargs):
+        async for event in prices.subscribe(context):
+            yield event
+
+    await prices.publish({'symbol': 'homi', 'price': 100})
+    ```
+    """
+
+    def subscribe(self, context=None) -> AsyncSubscription:
+        return AsyncSubscription(self, context)
+
+    async def publish(self, event) -> int:
+        data = self.serialize(event)
+        delivered = 0
+        for subscription in self._subscribers_of_event():
+            delivered += await subscription._put(data)
+        return delivered
+
+    async def close(self):
+        with self._lock:
+            self.closed = True
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            await subscription.close()
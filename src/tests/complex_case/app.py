@@ -0,0 +1,35 @@
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App
+
+app = App(
+    services=[
+        _COMPLEX,
+    ]
+)
+service_name = 'complex.Complex'
+
+
+# raw handler detected by signature
+@app.method(service_name)
+def Echo(request, context):
+    if request.name == 'dict':
+        return {'name': request.name, 'i64': request.i64}
+    return request
+
+
+# explicit raw handler
+@app.method(service_name, raw=True)
+def Split(request, context):
+    for tag in request.tags:
+        yield ComplexMessage(name=tag)
+
+
+@app.method(service_name, raw=True)
+def Collect(request_iterator, context):
+    return ComplexMessage(tags=[req.name for req in request_iterator])
+
+
+@app.method(service_name)
+def EchoStream(request_iterator, context):
+    for req in request_iterator:
+        yield dict(req)
@@ -0,0 +1,76 @@
+"""
+compare compiled converter with json_format
+
+    python -m src.tests.complex_case.bench_converter
+"""
+from timeit import timeit
+
+from google.protobuf import json_format
+
+from .complex_pb2 import ComplexMessage, Inner, Point
+from .sample import make_complex_message, make_inner
+from ...homi.converter import BUILD_FAST, BUILD_STRICT, get_builder, get_converter
+
+MESSAGES = {
+    'nested': make_inner('nested', depth=8),
+    'repeated': ComplexMessage(
+        tags=[f'tag-{i}' for i in range(200)],
+        ids=list(range(200)),
+        inners=[Inner(name=str(i), points=[Point(x=i, y=i)]) for i in range(100)],
+    ),
+    'map': ComplexMessage(
+        labels={i: str(i) for i in range(200)},
+        inner_map={str(i): Inner(name=str(i), counts={'a': i}) for i in range(100)},
+    ),
+    'complex': make_complex_message(),
+}
+
+
+def to_python_value(message):
+    """dict which handler would return, values are not json style"""
+    value = {}
+    for field, field_value in message.ListFields():
+        if field.message_type and field.message_type.GetOptions().map_entry:
+            value_field = field.message_type.fields_by_name['value']
+            if value_field.message_type:
+                field_value = {k: to_python_value(v) for k, v in field_value.items()}
+            value[field.name] = dict(field_value)
+        elif field.label == field.LABEL_REPEATED:
+            value[field.name] = [to_python_value(v) if field.message_type else v for v in field_value]
+        else:
+            value[field.name] = to_python_value(field_value) if field.message_type else field_value
+    return value
+
+
+def bench(number=200):
+    print(f'{"message":<10}{"direction":<14}{"json_format":>14}{"compiled":>14}{"speedup":>10}')
+    for name, message in MESSAGES.items():
+        message_class = type(message)
+        converter = get_converter(message_class)
+        js = json_format.MessageToDict(message, preserving_proto_field_name=True)
+        python_value = to_python_value(message)
+        strict = get_builder(message_class, BUILD_STRICT)
+        fast = get_builder(message_class, BUILD_FAST)
+        cases = (
+            ('to_dict',
+             lambda: json_format.MessageToDict(message, preserving_proto_field_name=True),
+             lambda: converter.to_dict(message)),
+            ('from_dict',
+             lambda: json_format.ParseDict(js, message_class()),
+             lambda: converter.from_dict(js)),
+            ('build_strict',
+             lambda: json_format.ParseDict(js, message_class()),
+             lambda: strict(python_value)),
+            ('build_fast',
+             lambda: json_format.ParseDict(js, message_class()),
+             lambda: fast(python_value)),
+        )
+        for direction, baseline, compiled in cases:
+            base_time = timeit(baseline, number=number) / number
+            compiled_time = timeit(compiled, number=number) / number
+            print(f'{name:<10}{direction:<14}{base_time * 1e6:>12.1f}us{compiled_time * 1e6:>12.1f}us'
+                  f'{base_time / compiled_time:>9.1f}x')
+
+
+if __name__ == '__main__':
+    bench()
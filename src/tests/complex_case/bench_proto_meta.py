@@ -0,0 +1,152 @@
+"""
+time homi's own conversion overhead of request and response, without grpc
+
+    python -m src.tests.complex_case.bench_proto_meta --save baseline.json
+    # after change, fails (exit code 1) when any case is slower than baseline by threshold
+    python -m src.tests.complex_case.bench_proto_meta --compare baseline.json --threshold 1.2
+"""
+import argparse
+import json
+import platform
+import sys
+from inspect import Parameter, Signature
+from timeit import repeat as timeit_repeat
+from typing import Callable, Dict, List, Tuple
+
+from google.protobuf import __version__ as protobuf_version
+from google.protobuf.internal import api_implementation
+
+from .complex_pb2 import BLUE, RED, ComplexMessage, Inner, Point, _COMPLEX
+from .sample import make_inner
+from ...homi.converter import get_converter
+from ...homi.proto_meta import (
+    parse_request,
+    parse_stream_request,
+    parse_stream_return,
+    parse_to_dict,
+    service_metadata_from_descriptor,
+    warp_handler,
+)
+
+STREAM_LENGTH = 10
+
+SHAPES = {
+    'flat': ComplexMessage(name='homi', i32=-7, i64=2 ** 40, u64=2 ** 63, f=1.5, d=0.25, flag=True, opt=3),
+    'nested': ComplexMessage(inner=make_inner('nested', depth=8)),
+    'repeated': ComplexMessage(
+        tags=[f'tag-{i}' for i in range(200)],
+        ids=list(range(200)),
+        values=[i * 0.5 for i in range(200)],
+        inners=[Inner(name=str(i), points=[Point(x=i, y=i)]) for i in range(100)],
+    ),
+    'map': ComplexMessage(
+        labels={i: str(i) for i in range(200)},
+        inner_map={str(i): Inner(name=str(i), counts={'a': i}) for i in range(100)},
+    ),
+    'bytes': ComplexMessage(data=bytes(range(256)) * 256),
+    'enum': ComplexMessage(color=BLUE, colors=[RED, BLUE] * 100, flags={True: RED, False: BLUE}),
+}
+
+ECHO = service_metadata_from_descriptor(_COMPLEX).methods['Echo']
+
+
+class Context:
+    def time_remaining(self):
+        return None
+
+
+def make_echo(fields: List[str]) -> Callable:
+    """handler which declares `fields` as parameters and returns them"""
+
+    def echo(**kwargs):
+        return {field: kwargs[field] for field in fields if kwargs[field] is not None}
+
+    parameters = [Parameter(field, Parameter.POSITIONAL_OR_KEYWORD) for field in fields]
+    echo.__signature__ = Signature([*parameters, Parameter('kwargs', Parameter.VAR_KEYWORD)])
+    return echo
+
+
+def make_cases(message) -> List[Tuple[str, Callable]]:
+    message_class = type(message)
+    fields = [field.name for field, _ in message.ListFields()]
+    value = get_converter(message_class).to_dict(message)
+    stream = [message] * STREAM_LENGTH
+    values = [value] * STREAM_LENGTH
+    handler = warp_handler(ECHO, make_echo(fields))
+    context = Context()
+    return [
+        # parse_request converts only fields named in parameters, so every field is named
+        ('parse_request', lambda: parse_request(fields, message)),
+        # stream messages are lazy views, every field is read so conversion is measured as before
+        ('parse_stream_request', lambda: [dict(msg) for msg in parse_stream_request(iter(stream))]),
+        ('parse_to_dict', lambda: parse_to_dict(message_class, value)),
+        ('parse_stream_return', lambda: list(parse_stream_return(message_class, values))),
+        ('warp_handler', lambda: handler(message, context)),
+    ]
+
+
+def run(number: int = 200, repeat: int = 5) -> Dict[str, float]:
+    """microseconds of each `shape/case`, best of `repeat` runs"""
+    results = {}
+    for shape, message in SHAPES.items():
+        for case, func in make_cases(message):
+            results[f'{shape}/{case}'] = min(timeit_repeat(func, number=number, repeat=repeat)) / number * 1e6
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """results are comparable only in same environment"""
+    return {
+        'python': platform.python_version(),
+        'protobuf': protobuf_version,
+        'implementation': api_implementation.Type(),
+        'machine': platform.machine(),
+    }
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[Tuple[str, float]]:
+    """cases slower than baseline by more than `threshold` times, with ratio"""
+    return [
+        (name, results[name] / baseline[name])
+        for name in results
+        if name in baseline and results[name] / baseline[name] > threshold
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=200, help='calls of each case in one run')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each case, best one is taken')
+    parser.add_argument('--save', help='write results to json file')
+    parser.add_argument('--compare', help='json file of baseline results')
+    parser.add_argument('--threshold', type=float, default=1.25, help='allowed slowdown ratio to baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.number, args.repeat)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding='utf8') as f:
+            saved = json.load(f)
+        if saved['environment'] != environment():
+            print(f'warning: baseline is measured in other environment {saved["environment"]}', file=sys.stderr)
+        baseline = saved['results']
+
+    print(f'{"case":<34}{"time":>12}{"baseline":>12}{"ratio":>8}')
+    for name, took in results.items():
+        if name in baseline:
+            print(f'{name:<34}{took:>10.1f}us{baseline[name]:>10.1f}us{took / baseline[name]:>7.2f}x')
+        else:
+            print(f'{name:<34}{took:>10.1f}us')
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, ratio in regressions:
+        print(f'regression: {name} is {ratio:.2f}x of baseline (threshold {args.threshold}x)', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
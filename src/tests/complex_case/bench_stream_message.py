@@ -0,0 +1,65 @@
+"""
+memory and time of request stream messages which handler keeps, dict copy vs `StreamMessage` view
+
+    python -m src.tests.complex_case.bench_stream_message --messages 100000
+"""
+import argparse
+import gc
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from .complex_pb2 import ComplexMessage, Inner, Point
+from ...homi.converter import get_converter
+from ...homi.proto_meta import parse_stream_request
+
+MESSAGE = ComplexMessage(
+    name='homi',
+    i64=2 ** 40,
+    tags=['a', 'b', 'c'],
+    inner=Inner(name='inner', points=[Point(x=1, y=2)]),
+    labels={1: 'one', 2: 'two'},
+)
+
+
+def dict_copy(requests: List) -> List[Dict]:
+    """every message converted to dict, same as stream message before it became view"""
+    to_dict = get_converter(ComplexMessage).to_dict
+    return [to_dict(req) for req in requests]
+
+
+def stream_view(requests: List) -> List:
+    return list(parse_stream_request(iter(requests), get_converter(ComplexMessage)))
+
+
+def measure(wrap: Callable[[List], List], requests: List) -> Dict[str, float]:
+    """bytes per message which handler keeps (raw messages are not counted), seconds of wrapping, reading and gc"""
+    gc.collect()
+    tracemalloc.start()
+    started = perf_counter()
+    messages = wrap(requests)
+    names = [msg['name'] for msg in messages]
+    took = perf_counter() - started
+    kept, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = perf_counter()
+    gc.collect()
+    gc_took = perf_counter() - started
+    assert len(names) == len(requests)
+    return {'bytes': kept / len(requests), 'seconds': took, 'gc_seconds': gc_took}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=100000, help='length of request stream')
+    args = parser.parse_args(argv)
+
+    requests = [ComplexMessage.FromString(MESSAGE.SerializeToString()) for _ in range(args.messages)]
+    print(f'{"case":<16}{"bytes/msg":>12}{"time":>10}{"gc":>10}')
+    for name, wrap in (('dict copy', dict_copy), ('StreamMessage', stream_view)):
+        result = measure(wrap, requests)
+        print(f'{name:<16}{result["bytes"]:>12.0f}{result["seconds"]:>9.3f}s{result["gc_seconds"]:>9.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: complex.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rcomplex.proto\x12\x07\x63omplex\x1a\x1fgoogle/protobuf/timestamp.proto\"\x1d\n\x05Point\x12\t\n\x01x\x18\x01 \x01(\x01\x12\t\n\x01y\x18\x02 \x01(\x01\"\xaf\x01\n\x05Inner\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x1e\n\x06points\x18\x02 \x03(\x0b\x32\x0e.complex.Point\x12\x1d\n\x05\x63hild\x18\x03 \x01(\x0b\x32\x0e.complex.Inner\x12*\n\x06\x63ounts\x18\x04 \x03(\x0b\x32\x1a.complex.Inner.CountsEntry\x1a-\n\x0b\x43ountsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x03:\x02\x38\x01\"\x92\x06\n\x0e\x43omplexMessage\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0b\n\x03i32\x18\x02 \x01(\x05\x12\x0b\n\x03i64\x18\x03 \x01(\x03\x12\x0b\n\x03u64\x18\x04 \x01(\x04\x12\t\n\x01\x66\x18\x05 \x01(\x02\x12\t\n\x01\x64\x18\x06 \x01(\x01\x12\x0c\n\x04\x66lag\x18\x07 \x01(\x08\x12\x0c\n\x04\x64\x61ta\x18\x08 \x01(\x0c\x12\x1d\n\x05\x63olor\x18\t \x01(\x0e\x32\x0e.complex.Color\x12\x0c\n\x04tags\x18\n \x03(\t\x12\x0e\n\x06values\x18\x0b \x03(\x01\x12\x0b\n\x03ids\x18\x0c \x03(\x03\x12\x1d\n\x05inner\x18\r \x01(\x0b\x32\x0e.complex.Inner\x12\x1e\n\x06inners\x18\x0e \x03(\x0b\x32\x0e.complex.Inner\x12\x38\n\tinner_map\x18\x0f \x03(\x0b\x32%.complex.ComplexMessage.InnerMapEntry\x12\x33\n\x06labels\x18\x10 \x03(\x0b\x32#.complex.ComplexMessage.LabelsEntry\x12\x0e\n\x04text\x18\x11 \x01(\tH\x00\x12\x1f\n\x05point\x18\x12 \x01(\x0b\x32\x0e.complex.PointH\x00\x12\x10\n\x03opt\x18\x13 \x01(\x05H\x01\x88\x01\x01\x12+\n\x07\x63reated\x18\x14 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x1e\n\x06\x63olors\x18\x15 \x03(\x0e\x32\x0e.complex.Color\x12\x31\n\x05\x66lags\x18\x16 \x03(\x0b\x32\".complex.ComplexMessage.FlagsEntry\x12\x0e\n\x06\x66loats\x18\x17 \x03(\x02\x12\x0e\n\x06\x63ounts\x18\x18 \x03(\x05\x1a?\n\rInnerMapEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1d\n\x05value\x18\x02 \x01(\x0b\x32\x0e.complex.Inner:\x02\x38\x01\x1a-\n\x0bLabelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a<\n\nFlagsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x08\x12\x1d\n\x05value\x18\x02 \x01(\x0e\x32\x0e.complex.Color:\x02\x38\x01\x42\x08\n\x06\x63hoiceB\x06\n\x04_opt*\'\n\x05\x43olor\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x07\n\x03RED\x10\x01\x12\x08\n\x04\x42LUE\x10\x02\x32\x8b\x02\n\x07\x43omplex\x12:\n\x04\x45\x63ho\x12\x17.complex.ComplexMessage\x1a\x17.complex.ComplexMessage\"\x00\x12=\n\x05Split\x12\x17.complex.ComplexMessage\x1a\x17.complex.ComplexMessage\"\x00\x30\x01\x12?\n\x07\x43ollect\x12\x17.complex.ComplexMessage\x1a\x17.complex.ComplexMessage\"\x00(\x01\x12\x44\n\nEchoStream\x12\x17.complex.ComplexMessage\x1a\x17.complex.ComplexMessage\"\x00(\x01\x30\x01\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'complex_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _INNER_COUNTSENTRY._options = None
+  _INNER_COUNTSENTRY._serialized_options = b'8\001'
+  _COMPLEXMESSAGE_INNERMAPENTRY._options = None
+  _COMPLEXMESSAGE_INNERMAPENTRY._serialized_options = b'8\001'
+  _COMPLEXMESSAGE_LABELSENTRY._options = None
+  _COMPLEXMESSAGE_LABELSENTRY._serialized_options = b'8\001'
+  _COMPLEXMESSAGE_FLAGSENTRY._options = None
+  _COMPLEXMESSAGE_FLAGSENTRY._serialized_options = b'8\001'
+  _COLOR._serialized_start=1057
+  _COLOR._serialized_end=1096
+  _POINT._serialized_start=59
+  _POINT._serialized_end=88
+  _INNER._serialized_start=91
+  _INNER._serialized_end=266
+  _INNER_COUNTSENTRY._serialized_start=221
+  _INNER_COUNTSENTRY._serialized_end=266
+  _COMPLEXMESSAGE._serialized_start=269
+  _COMPLEXMESSAGE._serialized_end=1055
+  _COMPLEXMESSAGE_INNERMAPENTRY._serialized_start=865
+  _COMPLEXMESSAGE_INNERMAPENTRY._serialized_end=928
+  _COMPLEXMESSAGE_LABELSENTRY._serialized_start=930
+  _COMPLEXMESSAGE_LABELSENTRY._serialized_end=975
+  _COMPLEXMESSAGE_FLAGSENTRY._serialized_start=977
+  _COMPLEXMESSAGE_FLAGSENTRY._serialized_end=1037
+  _COMPLEX._serialized_start=1099
+  _COMPLEX._serialized_end=1366
+# @@protoc_insertion_point(module_scope)
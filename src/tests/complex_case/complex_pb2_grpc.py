@@ -0,0 +1,168 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from . import complex_pb2 as complex__pb2
+
+
+class ComplexStub(object):
+    """Service Definition
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Echo = channel.unary_unary(
+                '/complex.Complex/Echo',
+                request_serializer=complex__pb2.ComplexMessage.SerializeToString,
+                response_deserializer=complex__pb2.ComplexMessage.FromString,
+                )
+        self.Split = channel.unary_stream(
+                '/complex.Complex/Split',
+                request_serializer=complex__pb2.ComplexMessage.SerializeToString,
+                response_deserializer=complex__pb2.ComplexMessage.FromString,
+                )
+        self.Collect = channel.stream_unary(
+                '/complex.Complex/Collect',
+                request_serializer=complex__pb2.ComplexMessage.SerializeToString,
+                response_deserializer=complex__pb2.ComplexMessage.FromString,
+                )
+        self.EchoStream = channel.stream_stream(
+                '/complex.Complex/EchoStream',
+                request_serializer=complex__pb2.ComplexMessage.SerializeToString,
+                response_deserializer=complex__pb2.ComplexMessage.FromString,
+                )
+
+
+class ComplexServicer(object):
+    """Service Definition
+    """
+
+    def Echo(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Split(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Collect(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def EchoStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_ComplexServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Echo': grpc.unary_unary_rpc_method_handler(
+                    servicer.Echo,
+                    request_deserializer=complex__pb2.ComplexMessage.FromString,
+                    response_serializer=complex__pb2.ComplexMessage.SerializeToString,
+            ),
+            'Split': grpc.unary_stream_rpc_method_handler(
+                    servicer.Split,
+                    request_deserializer=complex__pb2.ComplexMessage.FromString,
+                    response_serializer=complex__pb2.ComplexMessage.SerializeToString,
+            ),
+            'Collect': grpc.stream_unary_rpc_method_handler(
+                    servicer.Collect,
+                    request_deserializer=complex__pb2.ComplexMessage.FromString,
+                    response_serializer=complex__pb2.ComplexMessage.SerializeToString,
+            ),
+            'EchoStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.EchoStream,
+                    request_deserializer=complex__pb2.ComplexMessage.FromString,
+                    response_serializer=complex__pb2.ComplexMessage.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'complex.Complex', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Complex(object):
+    """Service Definition
+    """
+
+    @staticmethod
+    def Echo(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/complex.Complex/Echo',
+            complex__pb2.ComplexMessage.SerializeToString,
+            complex__pb2.ComplexMessage.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Split(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/complex.Complex/Split',
+            complex__pb2.ComplexMessage.SerializeToString,
+            complex__pb2.ComplexMessage.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Collect(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/complex.Complex/Collect',
+            complex__pb2.ComplexMessage.SerializeToString,
+            complex__pb2.ComplexMessage.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def EchoStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/complex.Complex/EchoStream',
+            complex__pb2.ComplexMessage.SerializeToString,
+            complex__pb2.ComplexMessage.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
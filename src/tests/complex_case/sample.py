@@ -0,0 +1,42 @@
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from .complex_pb2 import BLUE, RED, ComplexMessage, Inner, Point
+
+
+def make_inner(name: str, depth: int = 2) -> Inner:
+    inner = Inner(
+        name=name,
+        points=[Point(x=i, y=i * 0.5) for i in range(3)],
+        counts={'a': 1, 'b': 2 ** 40},
+    )
+    if depth:
+        inner.child.CopyFrom(make_inner(f'{name}-child', depth - 1))
+    return inner
+
+
+def make_complex_message() -> ComplexMessage:
+    return ComplexMessage(
+        name='homi',
+        i32=-7,
+        i64=2 ** 40,
+        u64=2 ** 63,
+        f=1.5,
+        d=float('inf'),
+        flag=True,
+        data=b'\x00\x01homi',
+        color=BLUE,
+        tags=['a', 'b'],
+        values=[0.5, 1.5, -2.0],
+        ids=[1, 2 ** 40],
+        inner=make_inner('inner'),
+        inners=[make_inner(f'inners-{i}', 1) for i in range(2)],
+        inner_map={'x': make_inner('x', 0)},
+        labels={1: 'one', -2: 'minus two'},
+        point=Point(x=1, y=2),
+        opt=0,
+        created=Timestamp(seconds=1600000000, nanos=500),
+        colors=[RED, BLUE],
+        flags={True: RED, False: BLUE},
+        floats=[0.25, 0.5],
+        counts=[1, 2, 3],
+    )
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi import admission as admission_module
+from ...homi.admission import AdmissionControl
+from ...homi.test_case import HomiRealServerTestCase
+
+ECHO = '/complex.Complex/Echo'
+
+
+class AdmissionControlTestCase(unittest.TestCase):
+
+    def test_max_pending(self):
+        admission = AdmissionControl(max_pending=1, exclude_methods=['/grpc.health.v1.Health/Check'])
+        self.assertTrue(admission.admit(ECHO))
+        admission.enter()
+        self.assertFalse(admission.admit(ECHO))
+        self.assertTrue(admission.admit('/grpc.health.v1.Health/Check'))
+        admission.leave()
+        self.assertTrue(admission.admit(ECHO))
+        self.assertEqual(admission.stats, (0, 0.0, 2, {ECHO: 1}))
+
+    def test_queue_latency(self):
+        admission = AdmissionControl(target_queue_latency=0.1, latency_weight=1)
+        admission.enter()
+        admission.observe_queue_latency(0.2)
+        self.assertFalse(admission.admit(ECHO))
+        # old sample is not used
+        with mock.patch.object(admission_module, 'monotonic', return_value=time.monotonic() + 2):
+            self.assertTrue(admission.admit(ECHO))
+        admission.observe_queue_latency(0.05)
+        self.assertTrue(admission.admit(ECHO))
+        # idle server admits rpc
+        admission.observe_queue_latency(0.2)
+        admission.leave()
+        self.assertTrue(admission.admit(ECHO))
+
+
+release = threading.Event()
+app = App(services=[_COMPLEX])
+async_app = AsyncApp(services=[_COMPLEX])
+
+
+@app.method('complex.Complex')
+def Echo(name, **kwargs):
+    release.wait(2)
+    return {'name': name}
+
+
+@async_app.method('complex.Complex')
+async def Echo(name, **kwargs):  # noqa: F811
+    while not release.is_set():
+        await asyncio.sleep(0.005)
+    return {'name': name}
+
+
+class AdmissionServerTestCase(HomiRealServerTestCase):
+    app = app
+
+    def setUp(self):
+        release.clear()
+        self.admission = AdmissionControl(max_pending=1)
+        self.test_server_config = {'worker': 1, 'admission': self.admission}
+        super().setUp()
+        self.channel = grpc.insecure_channel(
+            f'{self.default_server_config["host"]}:{self.default_server_config["port"]}')
+        self.stub = complex_pb2_grpc.ComplexStub(self.channel)
+
+    def tearDown(self):
+        release.set()
+        self.channel.close()
+        super().tearDown()
+
+    def test_shed(self):
+        running = self.stub.Echo.future(ComplexMessage(name='a'))
+        time.sleep(0.1)
+        started = time.monotonic()
+        with self.assertRaises(grpc.RpcError) as e:
+            self.stub.Echo(ComplexMessage(name='b'), timeout=1)
+        # rejected without waiting for busy worker
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(e.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertEqual(self.admission.stats.shed, {ECHO: 1})
+
+        release.set()
+        self.assertEqual(running.result(), ComplexMessage(name='a'))
+        self.assertEqual(self.stub.Echo(ComplexMessage(name='c')), ComplexMessage(name='c'))
+        self.assertEqual(self.admission.stats.admitted, 2)
+
+
+class AsyncAdmissionServerTestCase(AdmissionServerTestCase):
+    app = async_app
+
+
+pool_app = App(services=[_COMPLEX], executors={'slow': ThreadPoolExecutor(2)})
+
+
+@pool_app.method('complex.Complex', executor='slow')
+def Echo(name, **kwargs):  # noqa: F811
+    release.wait(2)
+    return {'name': name}
+
+
+class MethodPoolAdmissionTestCase(AdmissionServerTestCase):
+    app = pool_app
+
+    def test_shed(self):
+        # rpc running in thread pool of method is pending rpc of admission control
+        super().test_shed()
+        # task of pool ends after response is sent
+        end = time.monotonic() + 1
+        while self.admission.stats.pending and time.monotonic() < end:
+            time.sleep(0.005)
+        self.assertEqual(self.admission.stats.pending, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import AsyncApp, Service
+from ...homi.test_case import HomiRealServerTestCase
+
+echo_executor = ThreadPoolExecutor(1, thread_name_prefix='echo')
+threads = []
+
+app = AsyncApp(services=[_COMPLEX])
+
+
+@app.method('complex.Complex', executor=echo_executor)
+def Echo(name, **kwargs):
+    threads.append(threading.current_thread().name)
+    # blocking call must not block event loop
+    time.sleep(0.3)
+    return {'name': name}
+
+
+@app.method('complex.Complex')
+def Split(tags, **kwargs):
+    for tag in tags:
+        threads.append(threading.current_thread().name)
+        yield {'name': tag}
+
+
+@app.method('complex.Complex')
+async def Collect(request_iterator, **kwargs):
+    await asyncio.sleep(0)
+    return {'tags': [request['name'] async for request in request_iterator]}
+
+
+@app.method('complex.Complex')
+def EchoStream(request_iterator, **kwargs):
+    for request in request_iterator:
+        yield {'name': request['name']}
+
+
+sync_service = Service(_COMPLEX)
+
+
+@sync_service.method()
+def Echo(name, **kwargs):  # noqa: F811
+    threads.append(threading.current_thread().name)
+    return {'name': name}
+
+
+sync_service_app = AsyncApp(services=[sync_service])
+
+
+class AsyncSyncHandlerTestCase(HomiRealServerTestCase):
+    app = app
+
+    def setUp(self):
+        super().setUp()
+        threads.clear()
+        self.channel = grpc.insecure_channel(
+            f'{self.default_server_config["host"]}:{self.default_server_config["port"]}')
+        self.stub = complex_pb2_grpc.ComplexStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        super().tearDown()
+
+    def test_unary_unary_in_method_executor(self):
+        future = self.stub.Echo.future(ComplexMessage(name='slow'))
+        # async method is served while sync one is blocked
+        response = self.stub.Collect(iter([ComplexMessage(name='a')]), timeout=0.2)
+        self.assertEqual(response, ComplexMessage(tags=['a']))
+        self.assertFalse(future.done())
+        self.assertEqual(future.result(), ComplexMessage(name='slow'))
+        self.assertTrue(threads[0].startswith('echo'))
+
+    def test_unary_stream_in_server_executor(self):
+        responses = list(self.stub.Split(ComplexMessage(tags=['a', 'b'])))
+        self.assertEqual(responses, [ComplexMessage(name='a'), ComplexMessage(name='b')])
+        self.assertTrue(all(not name.startswith('echo') and name != 'MainThread' for name in threads))
+
+    def test_stream_stream(self):
+        requests = [ComplexMessage(name='a'), ComplexMessage(name='b')]
+        self.assertEqual(list(self.stub.EchoStream(iter(requests))), requests)
+
+    def test_restart_shuts_down_thread_pool(self):
+        pool = self.test_server.thread_pool
+        self.assertEqual(pool._max_workers, self.test_server.worker)
+        self.server_restart()
+        with self.assertRaises(RuntimeError):
+            pool.submit(time.sleep, 0)
+        self.assertIsNot(self.test_server.thread_pool, pool)
+        self.assertEqual(list(self.stub.Split(ComplexMessage(tags=['a']))), [ComplexMessage(name='a')])
+
+
+class AsyncSyncServiceTestCase(HomiRealServerTestCase):
+    app = sync_service_app
+
+    def test_sync_service(self):
+        with grpc.insecure_channel(
+                f'{self.default_server_config["host"]}:{self.default_server_config["port"]}') as channel:
+            stub = complex_pb2_grpc.ComplexStub(channel)
+            self.assertEqual(stub.Echo(ComplexMessage(name='a')), ComplexMessage(name='a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
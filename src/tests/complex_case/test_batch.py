@@ -0,0 +1,121 @@
+import asyncio
+import time
+import unittest
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi.batch import batch_async_stream, batch_stream
+from ...homi.exception import RegisterError
+from ...homi.test_case import HomiRealServerTestCase
+
+
+def slow_items(delays):
+    for idx, delay in enumerate(delays):
+        time.sleep(delay)
+        yield idx
+
+
+async def slow_async_items(delays):
+    for idx, delay in enumerate(delays):
+        await asyncio.sleep(delay)
+        yield idx
+
+
+async def collect(iterator):
+    return [batch async for batch in iterator]
+
+
+class BatchStreamTestCase(unittest.TestCase):
+
+    def test_size(self):
+        self.assertEqual(list(batch_stream(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(batch_stream([], 3)), [])
+
+    def test_timeout(self):
+        # item 3 arrives after timeout of batch which started from item 0
+        batches = list(batch_stream(slow_items([0, 0, 0, 0.3, 0]), 10, timeout=0.1))
+        self.assertEqual(batches, [[0, 1, 2], [3, 4]])
+
+    def test_error(self):
+        def broken():
+            yield 1
+            raise ValueError('broken stream')
+
+        with self.assertRaises(ValueError):
+            list(batch_stream(broken(), 10, timeout=0.1))
+
+    def test_stop_consumer_early(self):
+        batches = batch_stream(slow_items([0] * 100), 2, timeout=1)
+        self.assertEqual(next(batches), [0, 1])
+        # reader thread blocked on full queue is released
+        batches.close()
+
+    def test_async(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        batches = loop.run_until_complete(collect(batch_async_stream(slow_async_items([0, 0, 0.3, 0]), 10, 0.1)))
+        self.assertEqual(batches, [[0, 1], [2, 3]])
+        batches = loop.run_until_complete(collect(batch_async_stream(slow_async_items([0] * 5), 2)))
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
+
+    def test_register_error(self):
+        app = App(services=[_COMPLEX])
+        with self.assertRaises(RegisterError):
+            app.method('complex.Complex', 'Echo', batch_size=10)(lambda name, **kwargs: {})
+        with self.assertRaises(RegisterError):
+            app.method('complex.Complex', 'Collect', batch_timeout=0.1)(lambda request_iterator, **kwargs: {})
+
+
+batch_app = App(services=[_COMPLEX])
+
+
+@batch_app.method('complex.Complex', batch_size=3, batch_timeout=1)
+def Collect(request_iterator, **kwargs):
+    return {'ids': [len(batch) for batch in request_iterator]}
+
+
+@batch_app.method('complex.Complex', batch_size=2)
+def EchoStream(request_iterator, **kwargs):
+    for batch in request_iterator:
+        yield {'tags': [msg['name'] for msg in batch]}
+
+
+async_batch_app = AsyncApp(services=[_COMPLEX])
+
+
+@async_batch_app.method('complex.Complex', batch_size=3, batch_timeout=1)
+async def Collect(request_iterator, **kwargs):  # noqa: F811
+    return {'ids': [len(batch) async for batch in request_iterator]}
+
+
+@async_batch_app.method('complex.Complex', batch_size=2)
+async def EchoStream(request_iterator, **kwargs):  # noqa: F811
+    async for batch in request_iterator:
+        yield {'tags': [msg['name'] for msg in batch]}
+
+
+class BatchHandlerTestCase(HomiRealServerTestCase):
+    app = batch_app
+
+    def test_stream_unary(self):
+        with grpc.insecure_channel(self.target) as channel:
+            requests = (ComplexMessage(name=str(i)) for i in range(7))
+            response = complex_pb2_grpc.ComplexStub(channel).Collect(requests)
+        self.assertEqual(list(response.ids), [3, 3, 1])
+
+    def test_stream_stream(self):
+        with grpc.insecure_channel(self.target) as channel:
+            requests = (ComplexMessage(name=str(i)) for i in range(3))
+            responses = list(complex_pb2_grpc.ComplexStub(channel).EchoStream(requests))
+        self.assertEqual([list(response.tags) for response in responses], [['0', '1'], ['2']])
+
+
+class AsyncBatchHandlerTestCase(BatchHandlerTestCase):
+    app = async_batch_app
+
+
+if __name__ == '__main__':
+    unittest.main()
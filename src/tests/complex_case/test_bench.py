@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from .app import app
+from .complex_pb2 import ComplexMessage
+from ...homi.bench import OPEN_LOOP, bench_method, find_methods, make_payload, percentile, report
+from ...homi.exception import MethodNotFound
+from ...homi.test_case import HomiRealServerTestCase
+
+
+class PayloadTestCase(unittest.TestCase):
+    def test_make_payload(self):
+        message = make_payload(ComplexMessage, string_size=8, repeated_size=2)
+        self.assertEqual(len(message.name), 8)
+        self.assertEqual(len(message.tags), 2)
+        self.assertTrue(message.i64)
+        # same payload is made every time
+        self.assertEqual(message, make_payload(ComplexMessage, string_size=8, repeated_size=2))
+
+    def test_percentile(self):
+        latencies = [i / 1000 for i in range(1, 1001)]
+        self.assertEqual(percentile(latencies, 50), 0.5)
+        self.assertEqual(percentile(latencies, 99.9), 0.999)
+        self.assertEqual(percentile([0.1], 99), 0.1)
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_find_methods(self):
+        self.assertEqual([meta.name for meta in find_methods(app)], ['Echo', 'Split', 'Collect', 'EchoStream'])
+        self.assertEqual([meta.name for meta in find_methods(app, ['complex.Complex/Split'])], ['Split'])
+        with self.assertRaises(MethodNotFound):
+            find_methods(app, ['complex.Complex/Unknown'])
+
+
+class BenchTestCase(HomiRealServerTestCase):
+    app = app
+
+    def test_every_method_type(self):
+        requests = [ComplexMessage(name='a', tags=['a', 'b'])]
+        for meta in find_methods(app):
+            result = bench_method(self.target, meta, requests, duration=0.2, concurrency=2, channels=2,
+                                  stream_messages=3)
+            self.assertEqual(result.errors, {}, meta.name)
+            self.assertGreater(result.calls, 0, meta.name)
+            self.assertLessEqual(result.latency['p50'], result.latency['p999'])
+        # stream-stream call receives one response per request message
+        self.assertEqual(result.method, 'complex.Complex/EchoStream')
+        self.assertEqual(result.messages, result.calls * 3)
+
+    def test_open_loop(self):
+        meta = find_methods(app, ['complex.Complex/Echo'])[0]
+        result = bench_method(self.target, meta, [ComplexMessage(name='a')], mode=OPEN_LOOP, rps=50,
+                              duration=0.4, concurrency=2)
+        self.assertEqual(result.calls, 20)
+        self.assertEqual(result.rps, 50)
+        self.assertEqual(json.loads(json.dumps(report([result])))['results'][0]['calls'], 20)
+
+    def test_open_loop_needs_rps(self):
+        meta = find_methods(app, ['complex.Complex/Echo'])[0]
+        with self.assertRaises(ValueError):
+            bench_method(self.target, meta, [ComplexMessage(name='a')], mode=OPEN_LOOP)
+
+
+if __name__ == '__main__':
+    unittest.main()
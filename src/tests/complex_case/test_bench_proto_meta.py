@@ -0,0 +1,32 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from .bench_proto_meta import SHAPES, compare, main, make_cases
+
+
+class BenchProtoMetaTestCase(unittest.TestCase):
+    def test_cases_do_real_work(self):
+        for shape, message in SHAPES.items():
+            cases = dict(make_cases(message))
+            self.assertEqual(cases['warp_handler'](), message, shape)
+            self.assertEqual(cases['parse_to_dict'](), message, shape)
+            self.assertTrue(all(type(msg) is dict for msg in cases['parse_stream_request']()), shape)
+
+    def test_compare(self):
+        baseline = {'a': 10.0, 'b': 10.0}
+        self.assertEqual(compare({'a': 13.0, 'b': 11.0, 'c': 100.0}, baseline, 1.2), [('a', 1.3)])
+
+    def test_threshold_check(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            with redirect_stdout(StringIO()):
+                self.assertEqual(main(['--number', '1', '--repeat', '1', '--save', path]), 0)
+                self.assertEqual(main(['--number', '1', '--repeat', '1', '--compare', path,
+                                       '--threshold', '1000']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
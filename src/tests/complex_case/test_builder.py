@@ -0,0 +1,112 @@
+import unittest
+
+import grpc
+
+from .complex_pb2 import BLUE, ComplexMessage, Inner, Point, _COMPLEX
+from ...homi import App
+from ...homi.converter import BUILD_FAST, BUILD_STRICT, get_builder
+from ...homi.exception import MessageBuildError, RegisterError
+from ...homi.test_case import HomiTestCase
+
+python_value = {
+    'name': 'homi',
+    'i64': 2 ** 40,
+    'd': float('inf'),
+    'data': b'\x00homi',
+    'color': BLUE,
+    'tags': ('a', 'b'),
+    'inner': {'name': 'inner', 'points': [{'x': 1}, Point(y=2)], 'child': {}},
+    'inners': [Inner(name='a'), {'name': 'b'}],
+    'inner_map': {'x': {'counts': {'a': 1}}, 'y': Inner(name='y')},
+    'labels': {1: 'one'},
+    'point': Point(x=1),
+}
+expected = ComplexMessage(
+    name='homi',
+    i64=2 ** 40,
+    d=float('inf'),
+    data=b'\x00homi',
+    color=BLUE,
+    tags=['a', 'b'],
+    inner=Inner(name='inner', points=[Point(x=1), Point(y=2)], child=Inner()),
+    inners=[Inner(name='a'), Inner(name='b')],
+    inner_map={'x': Inner(counts={'a': 1}), 'y': Inner(name='y')},
+    labels={1: 'one'},
+    point=Point(x=1),
+)
+
+
+class BuilderTestCase(unittest.TestCase):
+
+    def test_build(self):
+        for mode in (BUILD_STRICT, BUILD_FAST):
+            self.assertEqual(get_builder(ComplexMessage, mode)(python_value), expected)
+
+    def test_strict_reject_unknown_key(self):
+        with self.assertRaises(MessageBuildError):
+            get_builder(ComplexMessage, BUILD_STRICT)({'unknown': 1})
+        with self.assertRaises(MessageBuildError):
+            get_builder(ComplexMessage, BUILD_STRICT)({'inner': {'child': {'unknown': 1}}})
+
+    def test_strict_wrap_value_error(self):
+        with self.assertRaises(MessageBuildError):
+            get_builder(ComplexMessage, BUILD_STRICT)({'i32': 'a'})
+
+    def test_strict_skip_none(self):
+        self.assertEqual(get_builder(ComplexMessage, BUILD_STRICT)({'name': None}), ComplexMessage())
+
+    def test_fast_skip_validation(self):
+        with self.assertRaises(KeyError):
+            get_builder(ComplexMessage, BUILD_FAST)({'unknown': 1})
+
+    def test_wrong_mode(self):
+        with self.assertRaises(ValueError):
+            get_builder(ComplexMessage, 'json')
+        with self.assertRaises(RegisterError):
+            App(services=[_COMPLEX]).register_method('complex.Complex', 'Echo', lambda request, context: {},
+                                                     builder='json')
+
+
+app = App(services=[_COMPLEX])
+
+
+@app.method('complex.Complex', builder=BUILD_STRICT)
+def Echo(name, **kwargs):
+    return {'name': name, 'point': Point(x=1)}
+
+
+@app.method('complex.Complex', builder=BUILD_FAST)
+def Split(tags, **kwargs):
+    for tag in tags:
+        yield {'name': tag}
+
+
+class BuilderOptionTestCase(HomiTestCase):
+    app = app
+
+    def test_unary(self):
+        server = self.get_test_server()
+        method = server.invoke_unary_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Echo'],
+            invocation_metadata={},
+            request=ComplexMessage(name='homi'), timeout=1)
+
+        response, metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+        self.assertEqual(response, ComplexMessage(name='homi', point=Point(x=1)))
+
+    def test_stream(self):
+        server = self.get_test_server()
+        method = server.invoke_unary_stream(
+            method_descriptor=_COMPLEX.methods_by_name['Split'],
+            invocation_metadata={},
+            request=ComplexMessage(tags=['a', 'b']), timeout=1)
+
+        reps = self.get_all_response(method)
+        self.assertEqual(reps, [ComplexMessage(name='a'), ComplexMessage(name='b')])
+        metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+
+
+if __name__ == '__main__':
+    unittest.main()
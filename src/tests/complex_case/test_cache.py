@@ -0,0 +1,161 @@
+import unittest
+from unittest import mock
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi import cache as cache_module
+from ...homi.cache import LRU
+from ...homi.exception import RegisterError
+from ...homi.test_case import HomiRealServerTestCase, HomiTestCase
+
+
+class LRUTestCase(unittest.TestCase):
+
+    def test_evict_least_recently_used(self):
+        cache = LRU(maxsize=2)
+        cache.set(b'a', b'1')
+        cache.set(b'b', b'2')
+        self.assertEqual(cache.get(b'a'), b'1')
+        cache.set(b'c', b'3')
+        self.assertIsNone(cache.get(b'b'))
+        self.assertEqual(cache.get(b'a'), b'1')
+        self.assertEqual(cache.get(b'c'), b'3')
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertEqual(cache.stats.size, 2)
+
+    def test_ttl(self):
+        cache = LRU(ttl=1)
+        with mock.patch.object(cache_module, 'monotonic', return_value=100):
+            cache.set(b'a', b'1')
+            self.assertEqual(cache.get(b'a'), b'1')
+        with mock.patch.object(cache_module, 'monotonic', return_value=101):
+            self.assertIsNone(cache.get(b'a'))
+        self.assertEqual(cache.stats.expirations, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_metadata_key(self):
+        cache = LRU(metadata_keys=['tenant'])
+        a = cache.make_key(b'req', [('tenant', 'a'), ('trace', '1')])
+        b = cache.make_key(b'req', [('tenant', 'b'), ('trace', '1')])
+        self.assertNotEqual(a, b)
+        self.assertEqual(a, cache.make_key(b'req', [('tenant', 'a'), ('trace', '2')]))
+
+    def test_invalidate(self):
+        cache = LRU()
+        request = ComplexMessage(name='homi')
+        cache.set(request.SerializeToString(), b'1')
+        self.assertTrue(cache.invalidate(request))
+        self.assertFalse(cache.invalidate(request))
+        cache.set(b'a', b'1')
+        cache.clear()
+        self.assertEqual(cache.stats.invalidations, 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_only_unary_unary(self):
+        with self.assertRaises(RegisterError):
+            App(services=[_COMPLEX]).register_method('complex.Complex', 'Split', lambda tags, **kwargs: [],
+                                                     cache=LRU())
+
+
+def make_apps(cache: LRU, calls: list):
+    app = App(services=[_COMPLEX])
+    async_app = AsyncApp(services=[_COMPLEX])
+
+    @app.method('complex.Complex', cache=cache)
+    def Echo(name, context, **kwargs):
+        calls.append(name)
+        if name == 'error':
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+        return {'name': name}
+
+    @async_app.method('complex.Complex', cache=cache)
+    async def Echo(name, context, **kwargs):  # noqa: F811
+        calls.append(name)
+        if name == 'error':
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+        return {'name': name}
+
+    return app, async_app
+
+
+test_cache = LRU()
+test_calls = []
+app, _ = make_apps(test_cache, test_calls)
+
+
+class CacheTestCase(HomiTestCase):
+    app = app
+
+    def setUp(self):
+        super().setUp()
+        test_cache.clear()
+        test_calls.clear()
+
+    def test_hit(self):
+        server = self.get_test_server()
+        for _ in range(2):
+            method = server.invoke_unary_unary(
+                method_descriptor=_COMPLEX.methods_by_name['Echo'],
+                invocation_metadata={},
+                request=ComplexMessage(name='homi'), timeout=1)
+            response, metadata, code, details = method.termination()
+            self.assertEqual(code, grpc.StatusCode.OK)
+            self.assertEqual(response, ComplexMessage(name='homi'))
+        self.assertEqual(test_calls, ['homi'])
+        self.assertEqual(test_cache.stats.hits, 1)
+
+
+real_cache = LRU()
+real_calls = []
+real_app, real_async_app = make_apps(real_cache, real_calls)
+
+
+class RealServerCacheTestCase(HomiRealServerTestCase):
+    app = real_app
+
+    def setUp(self):
+        super().setUp()
+        real_cache.clear()
+        real_calls.clear()
+        self.channel = grpc.insecure_channel(
+            f'{self.default_server_config["host"]}:{self.default_server_config["port"]}')
+        self.stub = complex_pb2_grpc.ComplexStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        super().tearDown()
+
+    def test_hit(self):
+        for _ in range(2):
+            self.assertEqual(self.stub.Echo(ComplexMessage(name='homi')), ComplexMessage(name='homi'))
+        self.assertEqual(self.stub.Echo(ComplexMessage(name='other')), ComplexMessage(name='other'))
+        self.assertEqual(real_calls, ['homi', 'other'])
+
+    def test_key_of_equal_messages(self):
+        request = ComplexMessage(name='homi', i64=1)
+        echo = self.channel.unary_unary('/complex.Complex/Echo', response_deserializer=ComplexMessage.FromString)
+        # fields are not in order of field number, as other protobuf library may serialize them
+        data = ComplexMessage(i64=1).SerializeToString() + ComplexMessage(name='homi').SerializeToString()
+        self.assertNotEqual(data, request.SerializeToString())
+        self.assertEqual(echo(data), ComplexMessage(name='homi'))
+        self.assertEqual(self.stub.Echo(request), ComplexMessage(name='homi'))
+        self.assertEqual(real_calls, ['homi'])
+        self.assertTrue(real_cache.invalidate(request))
+
+    def test_error_is_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(grpc.RpcError):
+                self.stub.Echo(ComplexMessage(name='error'))
+        self.assertEqual(real_calls, ['error', 'error'])
+        self.assertEqual(len(real_cache), 0)
+
+
+class AsyncRealServerCacheTestCase(RealServerCacheTestCase):
+    app = real_async_app
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import BLUE, ComplexMessage, Inner, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi.columnar import ColumnarBatch
+from ...homi.exception import RegisterError
+from ...homi.test_case import HomiRealServerTestCase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MESSAGES = [
+    ComplexMessage(name='a', i64=2 ** 40, color=BLUE, values=[0.5, 1.5], inner=Inner(name='inner'), labels={1: 'one'}),
+    ComplexMessage(name='b', i64=-1, d=2.5),
+]
+
+
+class ColumnarBatchTestCase(unittest.TestCase):
+    def test_columns(self):
+        batch = ColumnarBatch(MESSAGES, ComplexMessage)
+        self.assertEqual(batch.size, 2)
+        self.assertEqual(batch['name'], ['a', 'b'])
+        self.assertEqual(batch['i64'], [2 ** 40, -1])
+        self.assertEqual(batch['color'], [BLUE, 0])
+        self.assertEqual(batch['d'], [0.0, 2.5])
+        self.assertEqual(batch['values'], [[0.5, 1.5], []])
+        self.assertEqual(batch['inner'], [{'name': 'inner'}, None])
+        self.assertEqual(batch['labels'], [{'1': 'one'}, {}])
+        self.assertIs(batch['name'], batch['name'])
+        self.assertIn('tags', batch)
+        with self.assertRaises(KeyError):
+            batch['unknown']
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_numpy_columns(self):
+        batch = ColumnarBatch(MESSAGES, ComplexMessage, np)
+        self.assertEqual(batch['i64'].dtype, np.int64)
+        self.assertEqual(batch['flag'].dtype, np.bool_)
+        self.assertEqual(batch['values'][0].tolist(), [0.5, 1.5])
+        self.assertEqual(batch['name'], ['a', 'b'])
+
+
+sync_app = App(services=[_COMPLEX])
+async_app = AsyncApp(services=[_COMPLEX])
+
+
+@sync_app.method('complex.Complex', columnar=True)
+def Collect(batch, **kwargs):
+    return {'name': ''.join(batch['name']), 'i64': sum(batch['i64'])}
+
+
+@sync_app.method('complex.Complex', columnar=True, batch_size=2)
+def EchoStream(batches, **kwargs):
+    for batch in batches:
+        yield {'tags': batch['name']}
+
+
+@async_app.method('complex.Complex', columnar=True)
+async def Collect(batch, **kwargs):  # noqa: F811
+    return {'name': ''.join(batch['name']), 'i64': sum(batch['i64'])}
+
+
+@async_app.method('complex.Complex', columnar=True, batch_size=2)
+async def EchoStream(batches, **kwargs):  # noqa: F811
+    async for batch in batches:
+        yield {'tags': batch['name']}
+
+
+class ColumnarHandlerTestCase(HomiRealServerTestCase):
+    app = sync_app
+
+    def test_stream_unary(self):
+        with grpc.insecure_channel(self.target) as channel:
+            response = complex_pb2_grpc.ComplexStub(channel).Collect(iter(MESSAGES))
+        self.assertEqual((response.name, response.i64), ('ab', 2 ** 40 - 1))
+
+    def test_stream_stream(self):
+        with grpc.insecure_channel(self.target) as channel:
+            requests = (ComplexMessage(name=str(i)) for i in range(3))
+            responses = list(complex_pb2_grpc.ComplexStub(channel).EchoStream(requests))
+        self.assertEqual([list(response.tags) for response in responses], [['0', '1'], ['2']])
+
+    def test_register_error(self):
+        app = App(services=[_COMPLEX])
+        with self.assertRaises(RegisterError):
+            app.method('complex.Complex', 'Echo', columnar=True)(lambda name, **kwargs: {})
+        # stream-stream method needs batch_size
+        with self.assertRaises(RegisterError):
+            app.method('complex.Complex', 'EchoStream', columnar=True)(lambda batch, **kwargs: {})
+
+
+class AsyncColumnarHandlerTestCase(ColumnarHandlerTestCase):
+    app = async_app
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class NumpyColumnarHandlerTestCase(HomiRealServerTestCase):
+    @property
+    def app(self):
+        app = App(services=[_COMPLEX])
+
+        @app.method('complex.Complex', columnar=True, numpy=True)
+        def Collect(batch, **kwargs):
+            return {'values': batch['d'] * 2, 'i64': int(batch['i64'].sum())}
+
+        return app
+
+    def test_numpy_columns(self):
+        with grpc.insecure_channel(self.target) as channel:
+            response = complex_pb2_grpc.ComplexStub(channel).Collect(iter(MESSAGES))
+        self.assertEqual(list(response.values), [0.0, 5.0])
+        self.assertEqual(response.i64, 2 ** 40 - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
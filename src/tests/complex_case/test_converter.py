@@ -0,0 +1,115 @@
+import unittest
+
+from google.protobuf import json_format
+
+from .complex_pb2 import ComplexMessage, Inner, Point
+from .sample import make_complex_message, make_inner
+from ...homi.converter import _compile_fill, get_converter
+
+
+def message_to_dict(message):
+    return json_format.MessageToDict(message, preserving_proto_field_name=True)
+
+
+class ToDictTestCase(unittest.TestCase):
+
+    def test_same_as_message_to_dict(self):
+        for message in (make_complex_message(), ComplexMessage(), make_inner('recursive', 5), Point(x=-0.5)):
+            converter = get_converter(type(message))
+            self.assertEqual(converter.to_dict(message), message_to_dict(message))
+
+    def test_special_float(self):
+        message = ComplexMessage(d=float('-inf'), f=float('nan'), floats=[0.1, float('inf')])
+        self.assertEqual(get_converter(ComplexMessage).to_dict(message), message_to_dict(message))
+
+    def test_unknown_enum_number(self):
+        message = ComplexMessage(color=10, colors=[1, 20])
+        self.assertEqual(get_converter(ComplexMessage).to_dict(message), message_to_dict(message))
+
+    def test_field_to_dict(self):
+        message = make_complex_message()
+        expected = message_to_dict(message)
+        converter = get_converter(ComplexMessage)
+        for field, value in message.ListFields():
+            self.assertEqual(converter.field_to_dict[field.name](value), expected[field.name])
+
+    def test_field_getters(self):
+        converter = get_converter(ComplexMessage)
+        for message in (make_complex_message(), ComplexMessage(text='', opt=0)):
+            expected = message_to_dict(message)
+            for name, getter in converter.field_getters.items():
+                self.assertEqual(getter(message), expected.get(name))
+
+    def test_compiled_once(self):
+        self.assertIs(get_converter(ComplexMessage), get_converter(ComplexMessage))
+
+
+class FromDictTestCase(unittest.TestCase):
+
+    def assertSameAsParseDict(self, js, message_class=ComplexMessage, fast=True):
+        expected = json_format.ParseDict(js, message_class())
+        self.assertEqual(get_converter(message_class).from_dict(js), expected)
+        if fast:
+            message = message_class()
+            _compile_fill(message_class.DESCRIPTOR)(js, message)
+            self.assertEqual(message, expected)
+
+    def test_round_trip(self):
+        message = make_complex_message()
+        self.assertSameAsParseDict(message_to_dict(message))
+        self.assertEqual(get_converter(ComplexMessage).from_dict(message_to_dict(message)), message)
+
+    def test_python_value(self):
+        self.assertSameAsParseDict({
+            'name': 'homi',
+            'i64': 2 ** 40,
+            'u64': '18446744073709551615',
+            'f': 1,
+            'd': 0.1,
+            'data': 'aG9taQ',
+            'color': 2,
+            'colors': ['RED', 1],
+            'ids': [1, '2'],
+            'labels': {1: 'one', '-2': 'minus two'},
+            'flags': {'true': 'RED'},
+            'inner': {'name': 'inner', 'points': [{'x': 1}, {}], 'child': {}},
+            'innerMap': {'x': {'counts': {'a': 1}}},
+            'point': {'y': 2.5},
+            'opt': 0,
+            'created': '2020-09-13T12:26:40.000000500Z',
+        })
+
+    def test_fallback(self):
+        for js in (
+                {'name': None},
+                {'i32': 1.0},
+                {'color': '1'},
+                {'inner': {'child': None}},
+        ):
+            self.assertSameAsParseDict(js, fast=False)
+
+    def test_same_error(self):
+        for js in (
+                {'unknown': 1},
+                {'i32': 'a b'},
+                {'i32': 2 ** 40},
+                {'f': 1e39},
+                {'flag': 1},
+                {'tags': 'a'},
+                {'color': 'GREEN'},
+                {'text': 'a', 'point': {}},
+                {'inner': {'points': [None]}},
+                {'flags': {True: 'RED'}},
+        ):
+            with self.assertRaises(json_format.ParseError) as expected:
+                json_format.ParseDict(js, ComplexMessage())
+            with self.assertRaises(json_format.ParseError) as error:
+                get_converter(ComplexMessage).from_dict(js)
+            self.assertEqual(str(error.exception), str(expected.exception))
+
+    def test_recursive_message(self):
+        self.assertSameAsParseDict(message_to_dict(make_inner('recursive', 10)), Inner)
+
+
+if __name__ == '__main__':
+    unittest.main()
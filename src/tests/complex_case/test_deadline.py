@@ -0,0 +1,182 @@
+import asyncio
+import time
+import unittest
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi.deadline import expired_calls
+from ...homi.metrics import Metrics
+from ...homi.proto_meta import warp_async_handler, warp_handler
+from ...homi.test_case import HomiRealServerTestCase, HomiTestCase
+
+ECHO = '/complex.Complex/Echo'
+calls = []
+
+app = App(services=[_COMPLEX])
+
+
+@app.method('complex.Complex')
+def Echo(name, time_remaining, **kwargs):
+    calls.append(name)
+    return {'name': name, 'd': time_remaining or 0}
+
+
+@app.method('complex.Complex')
+def Collect(request_iterator, time_remaining, **kwargs):
+    return {'d': time_remaining or 0}
+
+
+async_app = AsyncApp(services=[_COMPLEX])
+
+
+@async_app.method('complex.Complex', 'Echo')
+def sync_echo(name, **kwargs):
+    calls.append(name)
+    if name == 'slow':
+        time.sleep(0.5)
+    return {'name': name}
+
+
+class TimeRemainingTestCase(HomiTestCase):
+    app = app
+
+    def test_inject(self):
+        method = self.get_test_server().invoke_unary_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Echo'],
+            invocation_metadata={},
+            request=ComplexMessage(name='homi'), timeout=5)
+        response, metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+        self.assertTrue(0 < response.d <= 5)
+
+    def test_inject_stream_request(self):
+        method = self.get_test_server().invoke_stream_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Collect'],
+            invocation_metadata={},
+            timeout=5)
+        method.requests_closed()
+        response, metadata, code, details = method.termination()
+        self.assertTrue(0 < response.d <= 5)
+
+
+class ExpiredContext:
+    def __init__(self, remaining):
+        self.remaining = remaining
+        self.code = None
+
+    def time_remaining(self):
+        return self.remaining
+
+    def abort(self, code, details):
+        self.code = code
+        raise Exception(details)
+
+
+class AsyncExpiredContext(ExpiredContext):
+    async def abort(self, code, details):
+        super().abort(code, details)
+
+
+class AsyncDeadlineContext(AsyncExpiredContext):
+    def __init__(self, timeout):
+        super().__init__(None)
+        self.deadline = time.monotonic() + timeout
+
+    def time_remaining(self):
+        return self.deadline - time.monotonic()
+
+
+class DeadlineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        calls.clear()
+        expired_calls.clear()
+        self.method_meta = app.get_service_by_full_name('complex.Complex').meta.methods['Echo']
+
+    def test_drop_expired(self):
+        handler = warp_handler(self.method_meta, Echo)
+        context = ExpiredContext(-0.1)
+        with self.assertRaises(Exception):
+            handler(ComplexMessage(name='homi'), context)
+        self.assertEqual(context.code, grpc.StatusCode.DEADLINE_EXCEEDED)
+        self.assertEqual(calls, [])
+        self.assertEqual(expired_calls.counts, {ECHO: 1})
+
+    def test_no_deadline(self):
+        handler = warp_handler(self.method_meta, Echo)
+        self.assertEqual(handler(ComplexMessage(name='homi'), ExpiredContext(None)), ComplexMessage(name='homi'))
+        self.assertEqual(expired_calls.counts, {})
+
+    def test_async_drop_expired(self):
+        async def echo(name, **kwargs):
+            calls.append(name)
+            return {'name': name}
+
+        handler = warp_async_handler(self.method_meta, echo)
+        context = AsyncExpiredContext(0)
+        with self.assertRaises(Exception):
+            asyncio.new_event_loop().run_until_complete(handler(ComplexMessage(name='homi'), context))
+        self.assertEqual(context.code, grpc.StatusCode.DEADLINE_EXCEEDED)
+        self.assertEqual(calls, [])
+        self.assertEqual(expired_calls.counts, {ECHO: 1})
+
+    def test_metrics_of_app(self):
+        metrics, other = Metrics(), Metrics()
+        handler = warp_handler(self.method_meta, Echo, metrics=metrics)
+        context = mock.Mock(time_remaining=mock.Mock(return_value=0), abort=mock.Mock(side_effect=Exception),
+                            code=mock.Mock(return_value=grpc.StatusCode.DEADLINE_EXCEEDED))
+        with self.assertRaises(Exception):
+            handler(ComplexMessage(name='homi'), context)
+        key = ('homi_expired_total', (('method', ECHO),))
+        self.assertEqual(metrics.collect()[key], 1)
+        # expired calls of other app are not counted
+        self.assertNotIn(key, other.collect())
+
+    def test_async_drop_expired_in_executor(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        handler = warp_async_handler(self.method_meta, sync_echo, executor=executor)
+        context = AsyncDeadlineContext(0.1)
+        # deadline passes while call waits for executor thread
+        executor.submit(time.sleep, 0.3)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            with self.assertRaises(Exception):
+                asyncio.new_event_loop().run_until_complete(handler(ComplexMessage(name='homi'), context))
+        executor.shutdown()
+        self.assertEqual(context.code, grpc.StatusCode.DEADLINE_EXCEEDED)
+        self.assertEqual(calls, [])
+        self.assertEqual(expired_calls.counts, {ECHO: 1})
+
+
+class AsyncServerDeadlineTestCase(HomiRealServerTestCase):
+    app = async_app
+    # one executor thread, second call waits for it
+    test_server_config = {'worker': 1}
+
+    def setUp(self):
+        calls.clear()
+        expired_calls.clear()
+        super().setUp()
+
+    def test_drop_expired_in_executor(self):
+        with grpc.insecure_channel(self.target) as channel:
+            stub = complex_pb2_grpc.ComplexStub(channel)
+            slow = stub.Echo.future(ComplexMessage(name='slow'))
+            time.sleep(0.1)
+            with self.assertRaises(grpc.RpcError) as error:
+                stub.Echo(ComplexMessage(name='homi'), timeout=0.2)
+            self.assertEqual(error.exception.code(), grpc.StatusCode.DEADLINE_EXCEEDED)
+            self.assertEqual(slow.result().name, 'slow')
+            self.assertEqual(stub.Echo(ComplexMessage(name='next')).name, 'next')
+        # expired call does not run handler when executor thread becomes free
+        self.assertEqual(calls, ['slow', 'next'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi import proto_meta
+from ...homi.exception import RegisterError
+from ...homi.test_case import HomiRealServerTestCase, HomiTestCase
+
+threads = []
+
+app = App(services=[_COMPLEX], executors={'reports': ThreadPoolExecutor(1, thread_name_prefix='reports')})
+
+
+@app.method('complex.Complex', executor='reports')
+def Echo(name, **kwargs):
+    threads.append(threading.current_thread().name)
+    return {'name': name}
+
+
+@app.method('complex.Complex', executor='reports')
+def Split(tags, **kwargs):
+    for tag in tags:
+        threads.append(threading.current_thread().name)
+        yield {'name': tag}
+
+
+def process_echo(name, context, **kwargs):
+    return {'name': name, 'i32': os.getpid(), 'flag': context is None}
+
+
+process_app = App(services=[_COMPLEX])
+process_app.register_method('complex.Complex', 'Echo', process_echo, executor=ProcessPoolExecutor(1))
+
+
+class ExecutorTestCase(HomiTestCase):
+    app = app
+
+    def setUp(self):
+        super().setUp()
+        threads.clear()
+
+    def test_unary_unary(self):
+        method = self.get_test_server().invoke_unary_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Echo'],
+            invocation_metadata={},
+            request=ComplexMessage(name='homi'), timeout=1)
+        response, metadata, code, details = method.termination()
+        self.assertEqual(response, ComplexMessage(name='homi'))
+        self.assertTrue(threads[0].startswith('reports'))
+
+    def test_unary_stream(self):
+        method = self.get_test_server().invoke_unary_stream(
+            method_descriptor=_COMPLEX.methods_by_name['Split'],
+            invocation_metadata={},
+            request=ComplexMessage(tags=['a', 'b']), timeout=1)
+        self.assertEqual(self.get_all_response(method), [ComplexMessage(name='a'), ComplexMessage(name='b')])
+        self.assertTrue(all(name.startswith('reports') for name in threads))
+
+    def test_unknown_executor(self):
+        app = App(services=[_COMPLEX])
+        app.register_method('complex.Complex', 'Echo', lambda name, **kwargs: {}, executor='unknown')
+        with self.assertRaises(RegisterError):
+            app.get_service_by_full_name('complex.Complex').make_servicer_class()
+
+    def test_process_executor_only_unary_request(self):
+        app = App(services=[_COMPLEX])
+        app.register_method('complex.Complex', 'Collect', lambda request_iterator, **kwargs: {},
+                            executor=ProcessPoolExecutor(1))
+        with self.assertRaises(RegisterError):
+            app.get_service_by_full_name('complex.Complex').make_servicer_class()
+
+    def test_grpc_without_thread_pool_behavior(self):
+        def echo(name, **kwargs):
+            threads.append(threading.current_thread().name)
+            return {'name': name}
+
+        method_meta = app.get_service_by_full_name('complex.Complex').meta.methods['Echo']
+        with mock.patch.object(proto_meta, 'supports_thread_pool_behavior', return_value=False):
+            handler = proto_meta.warp_handler(method_meta, echo, executor=app.get_executor('reports'))
+        # server thread submits call to pool and waits for it
+        self.assertFalse(hasattr(handler, 'experimental_thread_pool'))
+        context = mock.Mock(time_remaining=mock.Mock(return_value=None))
+        self.assertEqual(handler(ComplexMessage(name='homi'), context), ComplexMessage(name='homi'))
+        self.assertTrue(threads[0].startswith('reports'))
+
+
+class ProcessExecutorTestCase(HomiTestCase):
+    app = process_app
+
+    def test_unary_unary(self):
+        method = self.get_test_server().invoke_unary_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Echo'],
+            invocation_metadata={},
+            request=ComplexMessage(name='homi'), timeout=5)
+        response, metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+        self.assertEqual(response.name, 'homi')
+        self.assertNotEqual(response.i32, os.getpid())
+        # context can not be sent to other process
+        self.assertTrue(response.flag)
+
+
+slow_release = threading.Event()
+pool_app = App(services=[_COMPLEX], executors={'slow': ThreadPoolExecutor(8, thread_name_prefix='slow')})
+
+
+@pool_app.method('complex.Complex', executor='slow')
+def Echo(name, **kwargs):  # noqa: F811
+    threads.append(threading.current_thread().name)
+    slow_release.wait(2)
+    return {'name': name}
+
+
+@pool_app.method('complex.Complex')
+def Split(tags, **kwargs):  # noqa: F811
+    for tag in tags:
+        yield {'name': tag}
+
+
+class ThreadPoolExecutorServerTestCase(HomiRealServerTestCase):
+    app = pool_app
+    test_server_config = {'worker': 2}
+
+    def setUp(self):
+        super().setUp()
+        threads.clear()
+        slow_release.clear()
+        self.channel = grpc.insecure_channel(self.target)
+        self.stub = complex_pb2_grpc.ComplexStub(self.channel)
+
+    def tearDown(self):
+        slow_release.set()
+        self.channel.close()
+        super().tearDown()
+
+    def test_slow_calls_do_not_take_server_threads(self):
+        slow = [self.stub.Echo.future(ComplexMessage(name=str(i)), timeout=5) for i in range(2)]
+        end = time.monotonic() + 2
+        while len(threads) < 2 and time.monotonic() < end:
+            time.sleep(0.005)
+        # both server threads would be waiting for slow calls if they ran in server pool
+        start = time.monotonic()
+        self.assertEqual([r.name for r in self.stub.Split(ComplexMessage(tags=['a']), timeout=5)], ['a'])
+        self.assertLess(time.monotonic() - start, 0.5)
+        slow_release.set()
+        self.assertEqual([f.result().name for f in slow], ['0', '1'])
+        self.assertTrue(all(name.startswith('slow') for name in threads))
+
+
+release = threading.Event()
+concurrency_app = App(services=[_COMPLEX])
+async_concurrency_app = AsyncApp(services=[_COMPLEX])
+
+
+@concurrency_app.method('complex.Complex', concurrency=1)
+def Echo(name, **kwargs):  # noqa: F811
+    release.wait(2)
+    return {'name': name}
+
+
+@async_concurrency_app.method('complex.Complex', concurrency=1)
+async def Echo(name, **kwargs):  # noqa: F811
+    while not release.is_set():
+        await asyncio.sleep(0.005)
+    return {'name': name}
+
+
+class ConcurrencyTestCase(HomiRealServerTestCase):
+    app = concurrency_app
+
+    def setUp(self):
+        super().setUp()
+        release.clear()
+        self.channel = grpc.insecure_channel(
+            f'{self.default_server_config["host"]}:{self.default_server_config["port"]}')
+        self.stub = complex_pb2_grpc.ComplexStub(self.channel)
+
+    def tearDown(self):
+        release.set()
+        self.channel.close()
+        super().tearDown()
+
+    def test_reject_over_limit(self):
+        running = self.stub.Echo.future(ComplexMessage(name='a'))
+        time.sleep(0.1)
+        with self.assertRaises(grpc.RpcError) as e:
+            self.stub.Echo(ComplexMessage(name='b'))
+        self.assertEqual(e.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        release.set()
+        self.assertEqual(running.result(), ComplexMessage(name='a'))
+        # slot is released
+        self.assertEqual(self.stub.Echo(ComplexMessage(name='c')), ComplexMessage(name='c'))
+
+    def test_wrong_limit(self):
+        with self.assertRaises(RegisterError):
+            App(services=[_COMPLEX]).register_method('complex.Complex', 'Echo', lambda name, **kwargs: {},
+                                                     concurrency=0)
+
+
+class AsyncConcurrencyTestCase(ConcurrencyTestCase):
+    app = async_concurrency_app
+
+
+if __name__ == '__main__':
+    unittest.main()
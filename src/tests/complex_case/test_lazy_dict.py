@@ -0,0 +1,95 @@
+import unittest
+
+from google.protobuf import json_format
+
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from .sample import make_complex_message
+from ...homi import App
+from ...homi.proto_meta import (
+    LazyMessageDict,
+    StreamMessage,
+    make_response_builder,
+    parse_request,
+    parse_stream_request,
+)
+from ...homi.test_case import HomiTestCase
+
+
+class LazyMessageDictTestCase(unittest.TestCase):
+
+    def test_same_as_message_to_dict(self):
+        msg = make_complex_message()
+        expected = json_format.MessageToDict(msg, preserving_proto_field_name=True)
+        self.assertEqual(dict(LazyMessageDict(msg)), expected)
+        self.assertEqual(set(LazyMessageDict(msg)), set(expected))
+
+    def test_empty_message(self):
+        lazy = LazyMessageDict(ComplexMessage())
+        self.assertEqual(len(lazy), 0)
+        self.assertIsNone(lazy.get('name'))
+        with self.assertRaises(KeyError):
+            lazy['name']
+
+    def test_convert_only_accessed_field(self):
+        lazy = LazyMessageDict(make_complex_message())
+        self.assertEqual(lazy['name'], 'homi')
+        self.assertEqual(lazy['i64'], str(2 ** 40))
+        self.assertEqual(set(lazy._values), {'name', 'i64'})
+        self.assertIs(lazy['ids'], lazy['ids'])
+
+    def test_parse_request(self):
+        msg = make_complex_message()
+        args = parse_request(('name', 'unknown', 'context'), msg)
+        self.assertEqual(args, {'name': 'homi', 'unknown': None, 'request': msg})
+
+
+class StreamMessageTestCase(unittest.TestCase):
+
+    def test_view_of_raw_message(self):
+        msg = make_complex_message()
+        stream_msg, = parse_stream_request(iter([msg]))
+        self.assertIs(stream_msg.raw_data, msg)
+        self.assertEqual(stream_msg['name'], 'homi')
+        self.assertEqual(stream_msg, json_format.MessageToDict(msg, preserving_proto_field_name=True))
+        self.assertEqual(stream_msg['opt'], 0)
+
+    def test_slotted_read_only(self):
+        stream_msg = StreamMessage(ComplexMessage(name='homi'))
+        self.assertFalse(hasattr(stream_msg, '__dict__'))
+        self.assertIsNone(stream_msg.get('i32'))
+        with self.assertRaises(TypeError):
+            stream_msg['name'] = 'other'
+        with self.assertRaises(AttributeError):
+            stream_msg.raw_data = ComplexMessage()
+
+    def test_returned_as_response(self):
+        msg = make_complex_message()
+        for builder in (None, 'strict'):
+            self.assertIs(make_response_builder(ComplexMessage, builder)(StreamMessage(msg)), msg)
+
+
+echo_app = App(services=[_COMPLEX])
+
+
+@echo_app.method('complex.Complex')
+def EchoStream(request_iterator, **kwargs):
+    for request in request_iterator:
+        yield request
+
+
+class EchoStreamMessageTestCase(HomiTestCase):
+    app = echo_app
+
+    def test_echo_stream(self):
+        requests = [make_complex_message(), ComplexMessage(name='other')]
+        method = self.get_test_server().invoke_stream_stream(
+            method_descriptor=_COMPLEX.methods_by_name['EchoStream'],
+            invocation_metadata={},
+            timeout=1,
+        )
+        self.send_request_all(method, requests)
+        self.assertEqual(self.get_all_response(method), requests)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import threading
+import unittest
+import urllib.request
+from concurrent import futures
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App, AsyncApp, AsyncService, Service
+from ...homi.metrics import Metrics, start_http_server
+from ...homi.test_case import HomiRealServerTestCase
+
+ECHO = '/complex.Complex/Echo'
+SPLIT = '/complex.Complex/Split'
+ECHO_STREAM = '/complex.Complex/EchoStream'
+
+app = App(services=[_COMPLEX], metrics=Metrics())
+async_app = AsyncApp(services=[_COMPLEX], metrics=Metrics())
+
+
+@app.method('complex.Complex')
+def Echo(name, context, **kwargs):
+    if name == 'error':
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'error')
+    return {'name': name}
+
+
+@app.method('complex.Complex')
+def Split(tags, **kwargs):
+    for tag in tags:
+        yield {'name': tag}
+
+
+@app.method('complex.Complex')
+def EchoStream(request_iterator, **kwargs):
+    for request in request_iterator:
+        yield {'name': request['name']}
+
+
+@async_app.method('complex.Complex')
+async def Echo(name, context, **kwargs):  # noqa: F811
+    if name == 'error':
+        await context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'error')
+    return {'name': name}
+
+
+@async_app.method('complex.Complex')
+async def Split(tags, **kwargs):  # noqa: F811
+    for tag in tags:
+        yield {'name': tag}
+
+
+@async_app.method('complex.Complex')
+async def EchoStream(request_iterator, **kwargs):  # noqa: F811
+    async for request in request_iterator:
+        yield {'name': request['name']}
+
+
+class MetricsTestCase(unittest.TestCase):
+    def test_counts_of_threads_are_summed(self):
+        metrics = Metrics()
+        threads = [threading.Thread(target=lambda: [metrics.observe_call(ECHO, None, 0.001) for _ in range(100)])
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        collected = metrics.collect()
+        self.assertEqual(collected[('homi_requests_total', (('method', ECHO), ('code', 'OK')))], 400)
+        self.assertEqual(sum(collected[('homi_request_seconds', (('method', ECHO),))][:-1]), 400)
+
+    def test_render(self):
+        metrics = Metrics(latency_buckets=(0.01, 0.1))
+        metrics.observe_latency(ECHO, 'handler', 0.05)
+        metrics.observe_latency(ECHO, 'handler', 1)
+        metrics.observe_call(ECHO, grpc.StatusCode.NOT_FOUND, 0.05)
+        text = metrics.render()
+        self.assertIn('# TYPE homi_stage_seconds histogram', text)
+        self.assertIn(f'homi_stage_seconds_bucket{{method="{ECHO}",stage="handler",le="0.01"}} 0', text)
+        self.assertIn(f'homi_stage_seconds_bucket{{method="{ECHO}",stage="handler",le="0.1"}} 1', text)
+        self.assertIn(f'homi_stage_seconds_bucket{{method="{ECHO}",stage="handler",le="+Inf"}} 2', text)
+        self.assertIn(f'homi_stage_seconds_sum{{method="{ECHO}",stage="handler"}} 1.05', text)
+        self.assertIn(f'homi_stage_seconds_count{{method="{ECHO}",stage="handler"}} 2', text)
+        self.assertIn(f'homi_requests_total{{method="{ECHO}",code="NOT_FOUND"}} 1', text)
+
+    def test_http_server(self):
+        metrics = Metrics()
+        metrics.observe_call(ECHO, None, 0.001)
+        server = start_http_server(metrics, 0, '127.0.0.1')
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+            with urllib.request.urlopen(url, timeout=2) as response:
+                body = response.read().decode()
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+            self.assertIn(f'homi_requests_total{{method="{ECHO}",code="OK"}} 1', body)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_service_without_app(self):
+        for service_class in (Service, AsyncService):
+            service = service_class(_COMPLEX)
+            service.register_method('Echo', lambda name, **kwargs: {'name': name})
+            # service is not added to app, so it has no metrics
+            self.assertIn('Echo', vars(service.make_servicer_class()))
+            service.add_to_server(grpc.server(futures.ThreadPoolExecutor(max_workers=1)))
+
+
+class ServerMetricsTestCase(HomiRealServerTestCase):
+    app = app
+
+    def setUp(self):
+        super().setUp()
+        self.channel = grpc.insecure_channel(
+            f'{self.default_server_config["host"]}:{self.default_server_config["port"]}')
+        self.stub = complex_pb2_grpc.ComplexStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        super().tearDown()
+
+    def test_method_metrics(self):
+        self.stub.Echo(ComplexMessage(name='homi'))
+        with self.assertRaises(grpc.RpcError):
+            self.stub.Echo(ComplexMessage(name='error'))
+        self.assertEqual(len(list(self.stub.Split(ComplexMessage(tags=['a', 'b'])))), 2)
+
+        collected = self.app.metrics.collect()
+        self.assertEqual(collected[('homi_requests_total', (('method', ECHO), ('code', 'OK')))], 1)
+        self.assertEqual(collected[('homi_requests_total', (('method', ECHO), ('code', 'INVALID_ARGUMENT')))], 1)
+        self.assertEqual(collected[('homi_requests_total', (('method', SPLIT), ('code', 'OK')))], 1)
+        for stage in ('deserialize', 'to_dict', 'handler', 'from_dict', 'serialize'):
+            self.assertIn(('homi_stage_seconds', (('method', ECHO), ('stage', stage))), collected)
+        # response stream is serialized per message
+        self.assertEqual(sum(collected[('homi_response_bytes', (('method', SPLIT),))][:-1]), 2)
+
+    def test_stream_stage_metrics(self):
+        def count(method, stage):
+            histogram = self.app.metrics.collect().get(('homi_stage_seconds', (('method', method), ('stage', stage))))
+            return sum(histogram[:-1]) if histogram else 0
+
+        before = {(method, stage): count(method, stage) for method in (SPLIT, ECHO_STREAM)
+                  for stage in ('to_dict', 'handler', 'from_dict')}
+        self.assertEqual(len(list(self.stub.Split(ComplexMessage(tags=['a', 'b'])))), 2)
+        requests = [ComplexMessage(name=name) for name in 'abc']
+        self.assertEqual(len(list(self.stub.EchoStream(iter(requests)))), 3)
+
+        def count_of_call(method, stage):
+            return count(method, stage) - before[method, stage]
+
+        # handler stage is recorded once per call, conversion stages per message
+        self.assertEqual([count_of_call(SPLIT, stage) for stage in ('to_dict', 'handler', 'from_dict')], [1, 1, 2])
+        self.assertEqual([count_of_call(ECHO_STREAM, stage) for stage in ('to_dict', 'handler', 'from_dict')],
+                         [3, 1, 3])
+
+
+class AsyncServerMetricsTestCase(ServerMetricsTestCase):
+    app = async_app
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import BLUE, RED, ComplexMessage, Inner, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi.exception import RegisterError
+from ...homi.test_case import HomiRealServerTestCase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+requires_numpy = unittest.skipIf(np is None, 'numpy is not installed')
+
+MESSAGE = ComplexMessage(
+    name='homi',
+    values=[0.5, -1.25, 1e300],
+    ids=[-2 ** 63, -1, 0, 2 ** 40],
+    counts=[-2 ** 31, -7, 300],
+    floats=[1.5, -2.5],
+    colors=[RED, BLUE],
+    inner=Inner(name='inner'),
+)
+
+
+@requires_numpy
+class ArrayFieldsTestCase(unittest.TestCase):
+    def setUp(self):
+        from ...homi.ndarray import ArrayFields
+        self.arrays = ArrayFields(ComplexMessage)
+
+    def test_read(self):
+        arrays, message = self.arrays.read(MESSAGE.SerializeToString())
+        self.assertEqual(set(arrays), {'values', 'ids', 'counts', 'floats', 'colors'})
+        self.assertEqual(arrays['values'].dtype, np.float64)
+        self.assertEqual(arrays['values'].tolist(), list(MESSAGE.values))
+        self.assertEqual(arrays['ids'].tolist(), list(MESSAGE.ids))
+        self.assertEqual(arrays['counts'].tolist(), list(MESSAGE.counts))
+        self.assertEqual(arrays['colors'].tolist(), [RED, BLUE])
+        # array fields are not parsed to message
+        self.assertEqual(message, ComplexMessage(name='homi', inner=Inner(name='inner')))
+
+    def test_fixed_size_field_is_view(self):
+        data = MESSAGE.SerializeToString()
+        arrays, _ = self.arrays.read(data)
+        self.assertFalse(arrays['values'].flags.owndata)
+        self.assertFalse(arrays['values'].flags.writeable)
+
+    def test_merged_message(self):
+        # same field in many chunks is concatenated like parsing merged message
+        arrays, _ = self.arrays.read(MESSAGE.SerializeToString() * 2)
+        self.assertEqual(arrays['ids'].tolist(), list(MESSAGE.ids) * 2)
+        arrays, _ = self.arrays.read(b'')
+        self.assertEqual(arrays['values'].size, 0)
+
+    def test_write(self):
+        arrays, message = self.arrays.read(MESSAGE.SerializeToString())
+        data = self.arrays.write(message.SerializeToString(), arrays)
+        self.assertEqual(ComplexMessage.FromString(data), MESSAGE)
+
+    def test_stream_message(self):
+        from ...homi.proto_meta import parse_stream_request
+        msg, = parse_stream_request(iter([MESSAGE.SerializeToString()]), arrays=self.arrays)
+        self.assertEqual(msg['values'].tolist(), list(MESSAGE.values))
+        self.assertEqual(msg.get('name'), 'homi')
+        self.assertEqual(set(msg), {'values', 'ids', 'counts', 'floats', 'colors', 'name', 'inner'})
+        # array fields are not parsed to message
+        self.assertEqual(msg.raw_data, ComplexMessage(name='homi', inner=Inner(name='inner')))
+
+    def test_write_converts_dtype(self):
+        data = self.arrays.write(b'', {'ids': np.array([1.0, -2.0]), 'values': np.arange(3)})
+        self.assertEqual(ComplexMessage.FromString(data), ComplexMessage(ids=[1, -2], values=[0, 1, 2]))
+
+
+sync_app = App(services=[_COMPLEX])
+async_app = AsyncApp(services=[_COMPLEX])
+
+
+def echo(name, values, ids, **kwargs):
+    return {'name': name, 'values': values * 2, 'ids': ids + 1, 'tags': [str(type(values).__name__)]}
+
+
+def split(values, **kwargs):
+    for idx in range(2):
+        yield {'values': values[idx:]}
+
+
+async def async_echo(name, values, ids, **kwargs):
+    return echo(name, values, ids)
+
+
+async def async_split(values, **kwargs):
+    for response in split(values):
+        yield response
+
+
+def collect_messages(messages):
+    return {
+        'name': ','.join(msg['name'] for msg in messages),
+        'values': np.concatenate([msg['values'] for msg in messages]),
+        'tags': [type(msg['ids']).__name__ for msg in messages],
+    }
+
+
+def collect(request_iterator, **kwargs):
+    return collect_messages(list(request_iterator))
+
+
+def echo_stream(request_iterator, **kwargs):
+    # returned stream message is sent with its arrays
+    yield from request_iterator
+
+
+async def async_collect(request_iterator, **kwargs):
+    return collect_messages([msg async for msg in request_iterator])
+
+
+async def async_echo_stream(request_iterator, **kwargs):
+    async for msg in request_iterator:
+        yield msg
+
+
+if np is not None:
+    for service_app, handlers in ((sync_app, (echo, split, collect, echo_stream)),
+                                  (async_app, (async_echo, async_split, async_collect, async_echo_stream))):
+        for method, handler in zip(('Echo', 'Split', 'Collect', 'EchoStream'), handlers):
+            service_app.register_method('complex.Complex', method, handler, numpy=True)
+
+
+@requires_numpy
+class NumpyHandlerTestCase(HomiRealServerTestCase):
+    app = sync_app
+
+    def test_unary(self):
+        with grpc.insecure_channel(self.target) as channel:
+            response = complex_pb2_grpc.ComplexStub(channel).Echo(MESSAGE)
+        self.assertEqual(response.name, 'homi')
+        self.assertEqual(list(response.values), [v * 2 for v in MESSAGE.values])
+        self.assertEqual(list(response.ids), [v + 1 for v in MESSAGE.ids])
+        self.assertEqual(list(response.tags), ['ndarray'])
+
+    def test_stream_response(self):
+        with grpc.insecure_channel(self.target) as channel:
+            responses = list(complex_pb2_grpc.ComplexStub(channel).Split(ComplexMessage(values=[1, 2])))
+        self.assertEqual([list(response.values) for response in responses], [[1, 2], [2]])
+
+    def test_stream_request(self):
+        with grpc.insecure_channel(self.target) as channel:
+            stub = complex_pb2_grpc.ComplexStub(channel)
+            response = stub.Collect(iter([MESSAGE, ComplexMessage(name='b', values=[3])]))
+            self.assertEqual(list(stub.EchoStream(iter([MESSAGE, ComplexMessage(name='b')]))),
+                             [MESSAGE, ComplexMessage(name='b')])
+        self.assertEqual(response.name, 'homi,b')
+        self.assertEqual(list(response.values), [*MESSAGE.values, 3])
+        self.assertEqual(list(response.tags), ['ndarray', 'ndarray'])
+
+    def test_register_error(self):
+        app = App(services=[_COMPLEX])
+        with self.assertRaises(RegisterError):
+            app.register_method('complex.Complex', 'Collect', lambda request: request, numpy=True, raw_bytes=True)
+        with self.assertRaises(RegisterError):
+            app.register_method('complex.Complex', 'Echo', lambda request, context: request, numpy=True, raw=True)
+
+
+@requires_numpy
+class AsyncNumpyHandlerTestCase(NumpyHandlerTestCase):
+    app = async_app
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from google.protobuf import descriptor_pb2, descriptor_pool
+
+from .complex_pb2 import ComplexMessage
+from .sample import make_complex_message
+from ...homi import converter
+from ...homi.plan_cache import PlanCache, use_plan_cache
+from ...homi.proto_meta import MethodType, service_metadata_from_descriptor
+
+SOURCE = 'def to_dict(msg):\n    return {"name": msg.name}\n'
+FILENAME = '<homi.converter complex.ComplexMessage>'
+
+
+class PlanCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.file = ComplexMessage.DESCRIPTOR.file
+
+    def test_reuse_after_restart(self):
+        cache = PlanCache(self.directory.name)
+        code = cache.compile(SOURCE, FILENAME, self.file)
+        self.assertIs(cache.compile(SOURCE, FILENAME, self.file), code)
+        cache.save()
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+
+        restarted = PlanCache(self.directory.name)
+        loaded = restarted.compile(SOURCE, FILENAME, self.file)
+        self.assertEqual((restarted.hits, restarted.misses), (1, 0))
+        namespace = {}
+        exec(loaded, namespace)
+        self.assertEqual(namespace['to_dict'](ComplexMessage(name='homi')), {'name': 'homi'})
+
+    def test_changed_source_is_compiled(self):
+        cache = PlanCache(self.directory.name)
+        cache.compile(SOURCE, FILENAME, self.file)
+        cache.save()
+        restarted = PlanCache(self.directory.name)
+        restarted.compile(SOURCE.replace('name', 'text'), FILENAME, self.file)
+        self.assertEqual((restarted.hits, restarted.misses), (0, 1))
+
+    def test_broken_file(self):
+        cache = PlanCache(self.directory.name)
+        cache.compile(SOURCE, FILENAME, self.file)
+        cache.save()
+        for name in os.listdir(self.directory.name):
+            with open(os.path.join(self.directory.name, name), 'wb') as f:
+                f.write(b'broken')
+        restarted = PlanCache(self.directory.name)
+        restarted.compile(SOURCE, FILENAME, self.file)
+        self.assertEqual(restarted.misses, 1)
+
+    def test_converter_uses_cache(self):
+        cache = use_plan_cache(PlanCache(self.directory.name))
+        self.addCleanup(use_plan_cache, None)
+        namespace = converter._Namespace()
+        to_dict = namespace.execute(SOURCE, ComplexMessage.DESCRIPTOR)['to_dict']
+        self.assertEqual(to_dict(make_complex_message()), {'name': 'homi'})
+        self.assertEqual(cache.misses, 1)
+
+
+class MethodStreamingTestCase(unittest.TestCase):
+    def test_descriptor_without_serialization(self):
+        # descriptor which is added to pool as proto object can not be copied to proto
+        pool = descriptor_pool.DescriptorPool()
+        file = descriptor_pb2.FileDescriptorProto(name='plan.proto', package='plan', syntax='proto3')
+        file.message_type.add(name='Empty')
+        service = file.service.add(name='Plan')
+        service.method.add(name='Watch', input_type='.plan.Empty', output_type='.plan.Empty', server_streaming=True)
+        pool.Add(file)
+
+        meta = service_metadata_from_descriptor(pool.FindServiceByName('plan.Plan'))
+        self.assertEqual(meta.methods['Watch'].method_type, MethodType.UNARY_STREAM)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi.test_case import HomiRealServerTestCase, HomiTestCase
+
+app = App(services=[_COMPLEX])
+async_app = AsyncApp(services=[_COMPLEX])
+
+
+@app.method('complex.Complex', raw_bytes=True)
+def Echo(request, context):
+    assert type(request) is bytes
+    return request
+
+
+@app.method('complex.Complex', raw_bytes=True)
+def Split(request, context):
+    yield request
+    yield ComplexMessage(name='message').SerializeToString()
+
+
+@app.method('complex.Complex', raw_bytes=True)
+def Collect(request_iterator, context):
+    # concatenated messages are merged, repeated fields are appended
+    return b''.join(request_iterator)
+
+
+@app.method('complex.Complex', raw_bytes=True)
+def EchoStream(request_iterator, context):
+    for request in request_iterator:
+        yield request
+
+
+@async_app.method('complex.Complex', raw_bytes=True)
+async def Echo(request, context):  # noqa: F811
+    assert type(request) is bytes
+    return request
+
+
+@async_app.method('complex.Complex', raw_bytes=True)
+async def Split(request, context):  # noqa: F811
+    yield request
+    yield ComplexMessage(name='message').SerializeToString()
+
+
+@async_app.method('complex.Complex', raw_bytes=True)
+async def Collect(request_iterator, context):  # noqa: F811
+    return b''.join([request async for request in request_iterator])
+
+
+@async_app.method('complex.Complex', raw_bytes=True)
+async def EchoStream(request_iterator, context):  # noqa: F811
+    async for request in request_iterator:
+        yield request
+
+
+request = ComplexMessage(name='homi', tags=['a'])
+
+
+class RawBytesTestCase(HomiTestCase):
+    app = app
+
+    def test_unary_unary(self):
+        server = self.get_test_server()
+        method = server.invoke_unary_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Echo'],
+            invocation_metadata={},
+            request=request, timeout=1)
+        response, metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+        self.assertEqual(response, request)
+
+    def test_stream_stream(self):
+        server = self.get_test_server()
+        method = server.invoke_stream_stream(
+            method_descriptor=_COMPLEX.methods_by_name['EchoStream'],
+            invocation_metadata={},
+            timeout=1)
+        self.send_request_all(method, [request, ComplexMessage(name='b')])
+        self.assertEqual(self.get_all_response(method), [request, ComplexMessage(name='b')])
+
+
+class RealServerRawBytesTestCase(HomiRealServerTestCase):
+    app = app
+
+    def setUp(self):
+        super().setUp()
+        self.channel = grpc.insecure_channel(
+            f'{self.default_server_config["host"]}:{self.default_server_config["port"]}')
+        self.stub = complex_pb2_grpc.ComplexStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        super().tearDown()
+
+    def test_unary_unary(self):
+        self.assertEqual(self.stub.Echo(request), request)
+
+    def test_unary_stream(self):
+        self.assertEqual(list(self.stub.Split(request)), [request, ComplexMessage(name='message')])
+
+    def test_stream_unary(self):
+        response = self.stub.Collect(iter([request, ComplexMessage(tags=['b'])]))
+        self.assertEqual(response, ComplexMessage(name='homi', tags=['a', 'b']))
+
+    def test_stream_stream(self):
+        requests = [request, ComplexMessage(name='b')]
+        self.assertEqual(list(self.stub.EchoStream(iter(requests))), requests)
+
+
+class AsyncRealServerRawBytesTestCase(RealServerRawBytesTestCase):
+    app = async_app
+
+
+if __name__ == '__main__':
+    unittest.main()
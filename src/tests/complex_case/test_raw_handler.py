@@ -0,0 +1,69 @@
+import unittest
+
+import grpc
+
+from .app import app
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from .sample import make_complex_message
+from ...homi.test_case import HomiTestCase
+
+
+class RawHandlerTestCase(HomiTestCase):
+    app = app
+
+    def test_raw_signature(self):
+        server = self.get_test_server()
+        request = make_complex_message()
+        method = server.invoke_unary_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Echo'],
+            invocation_metadata={},
+            request=request, timeout=1)
+
+        response, metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+        self.assertEqual(response, request)
+
+    def test_raw_signature_return_dict(self):
+        server = self.get_test_server()
+        method = server.invoke_unary_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Echo'],
+            invocation_metadata={},
+            request=ComplexMessage(name='dict', i64=3), timeout=1)
+
+        response, metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+        self.assertEqual(response, ComplexMessage(name='dict', i64=3))
+
+    def test_raw_option(self):
+        server = self.get_test_server()
+        method = server.invoke_unary_stream(
+            method_descriptor=_COMPLEX.methods_by_name['Split'],
+            invocation_metadata={},
+            request=ComplexMessage(tags=['a', 'b']), timeout=1)
+
+        reps = self.get_all_response(method)
+        self.assertEqual([rep.name for rep in reps], ['a', 'b'])
+        metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+
+    def test_raw_option_stream_request(self):
+        server = self.get_test_server()
+        method = server.invoke_stream_unary(
+            method_descriptor=_COMPLEX.methods_by_name['Collect'],
+            invocation_metadata={},
+            timeout=1
+        )
+        self.send_request_all(method, (ComplexMessage(name=name) for name in ['a', 'b']))
+
+        response, metadata, code, details = method.termination()
+        self.assertEqual(code, grpc.StatusCode.OK)
+        self.assertEqual(list(response.tags), ['a', 'b'])
+
+    def test_raw_handler_is_not_wrapped(self):
+        service = next(iter(app.services))
+        servicer = service.make_servicer_class()
+        self.assertIs(servicer.Split, service._method_handler['Split'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+
+from .complex_pb2 import DESCRIPTOR
+from .sample import make_complex_message
+from ...homi.proto_meta import make_request_parser, parse_request, service_metadata_from_descriptor
+
+service_meta = service_metadata_from_descriptor(DESCRIPTOR.services_by_name['Complex'])
+
+
+class RequestParserTestCase(unittest.TestCase):
+
+    def test_same_as_parse_request(self):
+        parameters = ('name', 'i64', 'inner', 'opt', 'text', 'point', 'unknown', 'request', 'context')
+        parser = make_request_parser(service_meta.methods['Echo'], parameters)
+        message = make_complex_message()
+        self.assertEqual(parser(message), parse_request(parameters, message))
+
+    def test_convert_only_requested_field(self):
+        parser = make_request_parser(service_meta.methods['Echo'], ('name',))
+        message = make_complex_message()
+        args = parser(message)
+        self.assertEqual(args, {'name': 'homi', 'request': message})
+        self.assertIs(args['request'], message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi.exception import RegisterError
+from ...homi.single_flight import AsyncSingleFlight, SingleFlight
+from ...homi.test_case import HomiRealServerTestCase
+
+CONCURRENCY = 5
+
+
+def wait_calls(flight, count, timeout=2):
+    end = time.monotonic() + timeout
+    while flight.stats.calls < count and time.monotonic() < end:
+        time.sleep(0.005)
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def test_coalesce(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def func(value):
+            calls.append(value)
+            release.wait(2)
+            return value
+
+        with ThreadPoolExecutor(CONCURRENCY) as pool:
+            futures = [pool.submit(flight.do, b'key', func, 'value') for _ in range(CONCURRENCY)]
+            wait_calls(flight, CONCURRENCY)
+            release.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual(calls, ['value'])
+        self.assertEqual(sorted(coalesced for _, coalesced in results), [False] + [True] * (CONCURRENCY - 1))
+        self.assertEqual({result for result, _ in results}, {'value'})
+        self.assertEqual(flight.stats, (CONCURRENCY, CONCURRENCY - 1, 0))
+
+    def test_share_error(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def func():
+            release.wait(2)
+            raise ValueError('fail')
+
+        with ThreadPoolExecutor(2) as pool:
+            futures = [pool.submit(flight.do, b'key', func) for _ in range(2)]
+            wait_calls(flight, 2)
+            release.set()
+            for f in futures:
+                with self.assertRaises(ValueError):
+                    f.result()
+        # next call runs again
+        self.assertEqual(flight.do(b'key', lambda: 1), (1, False))
+
+    def test_async_coalesce(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def func(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        async def run():
+            return await asyncio.gather(*(flight.do(b'key', func, 'value') for _ in range(CONCURRENCY)))
+
+        results = asyncio.new_event_loop().run_until_complete(run())
+        self.assertEqual(calls, ['value'])
+        self.assertEqual([coalesced for _, coalesced in results], [False] + [True] * (CONCURRENCY - 1))
+        self.assertEqual(flight.stats.coalesced, CONCURRENCY - 1)
+
+    def test_only_unary_unary(self):
+        with self.assertRaises(RegisterError):
+            App(services=[_COMPLEX]).register_method('complex.Complex', 'Split', lambda tags, **kwargs: [],
+                                                     single_flight=SingleFlight())
+
+
+flight = SingleFlight()
+async_flight = AsyncSingleFlight()
+release = threading.Event()
+calls = []
+
+app = App(services=[_COMPLEX])
+async_app = AsyncApp(services=[_COMPLEX])
+
+
+@app.method('complex.Complex', single_flight=flight)
+def Echo(name, context, **kwargs):
+    calls.append(name)
+    release.wait(2)
+    if name == 'error':
+        context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+        context.set_details('error')
+    return {'name': name}
+
+
+@async_app.method('complex.Complex', single_flight=async_flight)
+async def Echo(name, context, **kwargs):  # noqa: F811
+    calls.append(name)
+    while not release.is_set():
+        await asyncio.sleep(0.005)
+    if name == 'error':
+        context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+        context.set_details('error')
+    return {'name': name}
+
+
+class RealServerSingleFlightTestCase(HomiRealServerTestCase):
+    app = app
+    flight = flight
+
+    def setUp(self):
+        super().setUp()
+        release.clear()
+        calls.clear()
+        self.channel = grpc.insecure_channel(
+            f'{self.default_server_config["host"]}:{self.default_server_config["port"]}')
+        self.stub = complex_pb2_grpc.ComplexStub(self.channel)
+
+    def tearDown(self):
+        release.set()
+        self.channel.close()
+        super().tearDown()
+
+    def call_concurrently(self, name):
+        start = self.flight.stats.calls
+        futures = [self.stub.Echo.future(ComplexMessage(name=name), timeout=3) for _ in range(CONCURRENCY)]
+        wait_calls(self.flight, start + CONCURRENCY)
+        release.set()
+        return futures
+
+    def test_coalesce(self):
+        futures = self.call_concurrently('homi')
+        self.assertEqual([f.result() for f in futures], [ComplexMessage(name='homi')] * CONCURRENCY)
+        self.assertEqual(calls, ['homi'])
+
+    def test_share_status(self):
+        futures = self.call_concurrently('error')
+        for f in futures:
+            self.assertEqual(f.exception().code(), grpc.StatusCode.INVALID_ARGUMENT)
+            self.assertEqual(f.exception().details(), 'error')
+        self.assertEqual(calls, ['error'])
+
+    def test_first_caller_deadline(self):
+        # shared call keeps running for other callers when deadline of first caller is exceeded
+        start = self.flight.stats.calls
+        first = self.stub.Echo.future(ComplexMessage(name='deadline'), timeout=0.3)
+        wait_calls(self.flight, start + 1)
+        second = self.stub.Echo.future(ComplexMessage(name='deadline'), timeout=5)
+        wait_calls(self.flight, start + 2)
+        self.assertEqual(first.exception().code(), grpc.StatusCode.DEADLINE_EXCEEDED)
+        release.set()
+        self.assertEqual(second.result(), ComplexMessage(name='deadline'))
+        self.assertEqual(calls, ['deadline'])
+
+
+class AsyncRealServerSingleFlightTestCase(RealServerSingleFlightTestCase):
+    app = async_app
+    flight = async_flight
+
+
+if __name__ == '__main__':
+    unittest.main()
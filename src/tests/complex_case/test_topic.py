@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import grpc
+
+from . import complex_pb2_grpc
+from .complex_pb2 import ComplexMessage, Inner, _COMPLEX
+from ...homi import App, AsyncApp
+from ...homi.exception import RegisterError
+from ...homi.test_case import HomiRealServerTestCase, HomiTestCase
+from ...homi.topic import BLOCK, DISCONNECT, DROP, AsyncTopic, Topic
+
+EVENTS = [{'name': str(i), 'inner': {'name': 'inner'}} for i in range(3)]
+
+
+def wait_subscribers(topic, count, timeout=2):
+    end = time.monotonic() + timeout
+    while topic.stats.subscribers < count and time.monotonic() < end:
+        time.sleep(0.005)
+
+
+class AbortContext:
+    def __init__(self):
+        self.callbacks = []
+        self.code = None
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def abort(self, code, details):
+        self.code = code
+        raise grpc.RpcError(details)
+
+
+class TopicTestCase(unittest.TestCase):
+    def test_serialize_once(self):
+        topic = Topic(ComplexMessage)
+        first, second = topic.subscribe(), topic.subscribe()
+        self.assertEqual(topic.publish(EVENTS[0]), 2)
+        topic.publish(ComplexMessage(name='message'))
+        topic.close()
+        first, second = list(first), list(second)
+        # every subscriber gets same bytes object
+        self.assertTrue(all(a is b for a, b in zip(first, second)))
+        self.assertEqual(ComplexMessage.FromString(first[0]), ComplexMessage(name='0', inner=Inner(name='inner')))
+        self.assertEqual(ComplexMessage.FromString(first[1]).name, 'message')
+        self.assertEqual(topic.stats, (2, 0, 0, 0))
+        with self.assertRaises(RuntimeError):
+            topic.publish(EVENTS[0])
+
+    def test_drop(self):
+        topic = Topic(ComplexMessage, maxsize=2, policy=DROP)
+        subscription = topic.subscribe()
+        for event in EVENTS:
+            topic.publish(event)
+        # drops of live subscriber are counted
+        self.assertEqual(topic.stats, (3, 1, 1, 0))
+        topic.close()
+        # oldest event is dropped
+        self.assertEqual([ComplexMessage.FromString(data).name for data in subscription], ['1', '2'])
+        self.assertEqual(topic.stats.dropped, 1)
+
+    def test_disconnect(self):
+        topic = Topic(ComplexMessage, maxsize=2, policy=DISCONNECT)
+        context = AbortContext()
+        slow = topic.subscribe(context)
+        self.assertEqual([topic.publish(event) for event in EVENTS], [1, 1, 0])
+        self.assertEqual(topic.stats.subscribers, 0)
+        # queued events are discarded and stream ends with error
+        with self.assertRaises(grpc.RpcError):
+            list(slow)
+        self.assertEqual(context.code, grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertEqual(topic.stats.disconnected, 1)
+
+    def test_block(self):
+        topic = Topic(ComplexMessage, maxsize=1, policy=BLOCK, timeout=2)
+        subscription = topic.subscribe()
+        received = []
+
+        def consume():
+            for data in subscription:
+                received.append(data)
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=consume)
+        thread.start()
+        for event in EVENTS:
+            self.assertEqual(topic.publish(event), 1)
+        topic.close()
+        thread.join()
+        self.assertEqual([ComplexMessage.FromString(data).name for data in received], ['0', '1', '2'])
+
+    def test_block_timeout(self):
+        topic = Topic(ComplexMessage, maxsize=1, policy=BLOCK, timeout=0.01)
+        topic.subscribe()
+        topic.publish(EVENTS[0])
+        self.assertEqual(topic.publish(EVENTS[1]), 0)
+        self.assertEqual(topic.stats, (2, 0, 0, 1))
+
+    def test_context_callback(self):
+        topic = Topic(ComplexMessage)
+        context = AbortContext()
+        subscription = topic.subscribe(context)
+        # call ended before stream started
+        context.callbacks[0]()
+        self.assertEqual(topic.stats.subscribers, 0)
+        self.assertEqual(list(subscription), [])
+
+    def test_async(self):
+        async def run():
+            topic = AsyncTopic(ComplexMessage, maxsize=1, policy=BLOCK, timeout=1)
+            subscription = topic.subscribe()
+
+            async def consume():
+                return [ComplexMessage.FromString(data).name async for data in subscription]
+
+            task = asyncio.ensure_future(consume())
+            for event in EVENTS:
+                await topic.publish(event)
+            await topic.close()
+            return await task
+
+        self.assertEqual(asyncio.new_event_loop().run_until_complete(run()), ['0', '1', '2'])
+
+    def test_async_disconnect(self):
+        async def run():
+            topic = AsyncTopic(ComplexMessage, maxsize=1, policy=DISCONNECT)
+            topic.subscribe()
+            return [await topic.publish(event) for event in EVENTS], topic.stats
+
+        delivered, stats = asyncio.new_event_loop().run_until_complete(run())
+        self.assertEqual(delivered, [1, 0, 0])
+        self.assertEqual(stats, (3, 0, 0, 1))
+
+    def test_register_error(self):
+        app = App(services=[_COMPLEX])
+        with self.assertRaises(RegisterError):
+            Topic(ComplexMessage, policy='unknown')
+        with self.assertRaises(RegisterError):
+            app.register_method('complex.Complex', 'Echo', lambda **kwargs: {}, topic=Topic(ComplexMessage))
+        with self.assertRaises(RegisterError):
+            app.register_method('complex.Complex', 'Split', lambda **kwargs: {}, topic=Topic(Inner))
+        with self.assertRaises(RegisterError):
+            app.register_method('complex.Complex', 'Split', lambda **kwargs: {}, topic=AsyncTopic(ComplexMessage))
+
+
+def make_app(topic):
+    app = App(services=[_COMPLEX])
+
+    @app.method('complex.Complex', topic=topic)
+    def Split(name, context, **kwargs):
+        yield {'name': f'hello {name}'}
+        yield from topic.subscribe(context)
+
+    return app
+
+
+def make_async_app(topic):
+    app = AsyncApp(services=[_COMPLEX])
+
+    @app.method('complex.Complex', topic=topic)
+    async def Split(name, context, **kwargs):
+        yield {'name': f'hello {name}'}
+        async for event in topic.subscribe(context):
+            yield event
+
+    return app
+
+
+class TopicServicerTestCase(HomiTestCase):
+    def test_split(self):
+        topic = Topic(ComplexMessage)
+        self.app = make_app(topic)
+        server = self.get_test_server()
+        method = server.invoke_unary_stream(
+            method_descriptor=_COMPLEX.methods_by_name['Split'],
+            invocation_metadata={},
+            request=ComplexMessage(name='homi'),
+            timeout=2,
+        )
+        self.assertEqual(method.take_response().name, 'hello homi')
+        wait_subscribers(topic, 1)
+        topic.publish(EVENTS[0])
+        topic.close()
+        self.assertEqual([response.name for response in self.get_all_response(method)], ['0'])
+
+
+class TopicHandlerTestCase(HomiRealServerTestCase):
+    def setUp(self):
+        self.topic = Topic(ComplexMessage)
+        self.app = make_app(self.topic)
+        super().setUp()
+
+    def publish(self, event):
+        self.topic.publish(event)
+
+    def close(self):
+        self.topic.close()
+
+    def test_broadcast(self):
+        with grpc.insecure_channel(self.target) as channel:
+            stub = complex_pb2_grpc.ComplexStub(channel)
+            streams = [stub.Split(ComplexMessage(name=str(i))) for i in range(2)]
+            self.assertEqual([next(stream).name for stream in streams], ['hello 0', 'hello 1'])
+            wait_subscribers(self.topic, 2)
+            for event in EVENTS:
+                self.publish(event)
+            self.close()
+            for stream in streams:
+                self.assertEqual([response.name for response in stream], ['0', '1', '2'])
+
+
+class AsyncTopicHandlerTestCase(TopicHandlerTestCase):
+    def setUp(self):
+        self.topic = AsyncTopic(ComplexMessage)
+        self.app = make_async_app(self.topic)
+        HomiRealServerTestCase.setUp(self)
+
+    def publish(self, event):
+        asyncio.run_coroutine_threadsafe(self.topic.publish(event), self.loop).result(2)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.topic.close(), self.loop).result(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
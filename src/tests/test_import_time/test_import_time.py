@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import unittest
+from os.path import abspath, dirname
+from typing import Dict
+
+ROOT = dirname(dirname(dirname(dirname(abspath(__file__)))))
+PACKAGE = 'src.homi'
+# microseconds which homi's own modules may take to import, without grpc and protobuf
+BUDGET = int(os.environ.get('HOMI_IMPORT_BUDGET_US', 150_000))
+# modules which are only needed by some commands or by tests (grpc itself imports `grpc_tools` package)
+HEAVY_MODULES = ('grpc_tools.protoc', 'grpc_testing', 'cryptography', 'http.server', 'numpy')
+# modules of method options, they are imported when method uses the option
+OPTIONAL_MODULES = tuple(f'{PACKAGE}.{module}' for module in (
+    'batch', 'cache', 'columnar', 'metrics', 'ndarray', 'single_flight', 'topic',
+)) + ('concurrent.futures.process', 'multiprocessing')
+
+
+def import_times(source: str) -> Dict[str, int]:
+    """self import time (microseconds) of every module imported by source, from `python -X importtime`"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', source],
+        cwd=ROOT, stderr=subprocess.PIPE, universal_newlines=True, check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_time)
+    return times
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    def assert_not_imported(self, times: Dict[str, int], *names: str):
+        for name in names:
+            imported = [module for module in times if module == name or module.startswith(f'{name}.')]
+            self.assertEqual(imported, [], f'{name} is imported')
+
+    def assert_within_budget(self, times: Dict[str, int]):
+        own = sum(took for module, took in times.items() if module.startswith(PACKAGE))
+        self.assertLess(own, BUDGET, f'homi modules took {own}us to import')
+
+    def test_package(self):
+        times = import_times(f'import {PACKAGE}')
+        self.assertEqual([module for module in times if module.startswith(f'{PACKAGE}.')], [])
+
+    def test_sync_app(self):
+        times = import_times(f'from {PACKAGE} import App, Server')
+        self.assert_not_imported(times, f'{PACKAGE}.aio', *HEAVY_MODULES)
+        self.assert_within_budget(times)
+
+    def test_async_app(self):
+        times = import_times(f'from {PACKAGE} import AsyncApp, AsyncServer')
+        self.assert_not_imported(times, f'{PACKAGE}.server', *HEAVY_MODULES)
+        self.assert_within_budget(times)
+
+    def test_optional_modules(self):
+        for app in ('App', 'AsyncApp'):
+            with self.subTest(app=app):
+                self.assert_not_imported(import_times(f'from {PACKAGE} import {app}'), *OPTIONAL_MODULES)
+
+    def test_cli(self):
+        times = import_times(f'import {PACKAGE}.cli')
+        self.assert_not_imported(times, f'{PACKAGE}.app', f'{PACKAGE}.bench', *HEAVY_MODULES)
+
+    def test_test_case(self):
+        times = import_times(f'import {PACKAGE}.test_case')
+        self.assert_not_imported(times, 'grpc_testing', 'cryptography')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import stat
+import tempfile
+import unittest
+
+import grpc
+
+from ..simple_case import helloworld_pb2_grpc
+from ..simple_case.app import app
+from ..simple_case.async_app import app as async_app
+from ..simple_case.helloworld_pb2 import HelloRequest
+from ...homi import Server
+from ...homi.config import Listener
+from ...homi.exception import ServerConfigError
+from ...homi.test_case import HomiRealServerTestCase
+
+SOCKET_DIR = tempfile.mkdtemp()
+
+
+class ListenerTestCase(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(Listener.parse('[::]:50051'), Listener('[::]:50051'))
+        self.assertEqual(Listener.parse('0.0.0.0:50443,tls'), Listener('0.0.0.0:50443', tls=True))
+        self.assertEqual(Listener.parse('unix:/run/app.sock,mode=660'), Listener('unix:/run/app.sock', mode=0o660))
+
+    def test_parse_error(self):
+        for value in ('[::]:50051,mode=660', 'unix:app.sock,mode=rw', 'unix:app.sock,tls,alts', '[::]:50051,ssl'):
+            with self.assertRaises(ServerConfigError, msg=value):
+                Listener.parse(value)
+
+    def test_unix_path(self):
+        self.assertEqual(Listener('unix:app.sock').unix_path, 'app.sock')
+        self.assertEqual(Listener('unix:///run/app.sock').unix_path, '/run/app.sock')
+        self.assertIsNone(Listener('unix-abstract:app').unix_path)
+        self.assertIsNone(Listener('localhost:50051').unix_path)
+
+
+class MultiListenerTestCase(HomiRealServerTestCase):
+    app = app
+    tls = True
+    test_server_config = {
+        'listeners': [
+            Listener(f'unix:{SOCKET_DIR}/sync.sock', mode=0o600),
+            Listener('localhost:5999', tls=True),
+        ],
+    }
+
+    def test_unix_socket(self):
+        self.assertEqual(stat.S_IMODE(os.stat(f'{SOCKET_DIR}/sync.sock').st_mode), 0o600)
+        with grpc.insecure_channel(self.target) as channel:
+            response = helloworld_pb2_grpc.GreeterStub(channel).SayHello(HelloRequest(name='unix'))
+        self.assertEqual(response.message, 'Hello unix!')
+
+    def test_tls_side_by_side(self):
+        with grpc.secure_channel('localhost:5999', self.channel_credentials) as channel:
+            response = helloworld_pb2_grpc.GreeterStub(channel).SayHello(HelloRequest(name='tls'))
+        self.assertEqual(response.message, 'Hello tls!')
+
+    def test_tls_listener_needs_key(self):
+        server = Server(app, listeners=[Listener('localhost:0', tls=True)])
+        with self.assertRaises(ServerConfigError):
+            server.run(wait=False)
+
+
+class AsyncUnixListenerTestCase(HomiRealServerTestCase):
+    app = async_app
+    test_server_config = {'listeners': [Listener(f'unix://{SOCKET_DIR}/async.sock')]}
+
+    def test_unix_socket(self):
+        with grpc.insecure_channel(self.target) as channel:
+            response = helloworld_pb2_grpc.GreeterStub(channel).SayHello(HelloRequest(name='unix'))
+        self.assertEqual(response.message, 'Hello unix!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from os.path import abspath, dirname
+
+import grpc
+
+from ..simple_case import helloworld_pb2_grpc
+from ..simple_case.helloworld_pb2 import HelloRequest
+
+ROOT = dirname(dirname(dirname(dirname(abspath(__file__)))))
+PORT = '5997'
+
+
+def wait_until(predicate, timeout=10):
+    end = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > end:
+            raise TimeoutError
+        time.sleep(0.05)
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'needs os.fork')
+class PreforkTestCase(unittest.TestCase):
+
+    def start(self, source: str):
+        self.pid_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pid_dir.cleanup)
+        script = textwrap.dedent(source).format(pid_dir=self.pid_dir.name, port=PORT)
+        self.process = subprocess.Popen([sys.executable, '-c', script], cwd=ROOT)
+        self.addCleanup(self.process.kill)
+
+    def worker_pids(self):
+        return {int(name) for name in os.listdir(self.pid_dir.name)}
+
+    def stop(self):
+        self.process.send_signal(signal.SIGTERM)
+        self.assertEqual(self.process.wait(10), 0)
+        for pid in self.worker_pids():
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+
+    def test_restart_crashed_worker(self):
+        self.start('''
+            import os, signal, sys
+            from src.homi.prefork import Prefork
+
+            def worker():
+                signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+                open(os.path.join('{pid_dir}', str(os.getpid())), 'w').close()
+                while True:
+                    signal.pause()
+
+            Prefork(worker, processes=2, restart_delay=0).run()
+        ''')
+        wait_until(lambda: len(self.worker_pids()) == 2)
+        os.kill(next(iter(self.worker_pids())), signal.SIGKILL)
+        wait_until(lambda: len(self.worker_pids()) == 3)
+        self.stop()
+
+    def test_worker_exit_code(self):
+        script = textwrap.dedent('''
+            import os, sys
+            from src.homi.prefork import Prefork
+
+            def fail():
+                raise ValueError('fail')
+
+            for target in (lambda: sys.exit(0), lambda: sys.exit(3), fail):
+                _, status = os.waitpid(Prefork(target, processes=1).spawn(), 0)
+                print(os.WEXITSTATUS(status))
+        ''')
+        result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        self.assertEqual(result.stdout.split(), ['0', '3', '1'])
+        # only exception is logged as failure
+        self.assertEqual(result.stderr.count('failed'), 1)
+        self.assertIn('ValueError', result.stderr)
+
+    def test_serve(self):
+        self.start('''
+            import os
+            from src.homi import Server
+            from src.homi.prefork import Prefork, serve
+            from src.tests.simple_case.app import app
+
+            def worker():
+                open(os.path.join('{pid_dir}', str(os.getpid())), 'w').close()
+                serve(Server(app, 'localhost', '{port}', reuse_port=True), grace=1)
+
+            Prefork(worker, processes=2).run()
+        ''')
+        wait_until(lambda: len(self.worker_pids()) == 2)
+        with grpc.insecure_channel(f'localhost:{PORT}') as channel:
+            grpc.channel_ready_future(channel).result(timeout=10)
+            stub = helloworld_pb2_grpc.GreeterStub(channel)
+            self.assertEqual(stub.SayHello(HelloRequest(name='tom')).message, 'Hello tom!')
+        self.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
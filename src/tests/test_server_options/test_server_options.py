@@ -0,0 +1,71 @@
+import unittest
+
+import grpc
+
+from ..simple_case import helloworld_pb2_grpc
+from ..simple_case.app import app
+from ..simple_case.async_app import app as async_app
+from ..simple_case.helloworld_pb2 import HelloRequest
+from ...homi import App, Server
+from ...homi.config import ServerOptions
+from ...homi.exception import ServerConfigError
+from ...homi.test_case import HomiRealServerTestCase
+
+
+class ServerOptionsTestCase(unittest.TestCase):
+
+    def test_grpc_options(self):
+        options = ServerOptions(
+            max_receive_message_length=1024,
+            keepalive_permit_without_calls=True,
+            http2_bdp_probe=False,
+            extra_options=(('grpc.so_reuseport', 0),),
+        )
+        self.assertEqual(options.grpc_options, [
+            ('grpc.max_receive_message_length', 1024),
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.http2.bdp_probe', 0),
+            ('grpc.so_reuseport', 0),
+        ])
+        self.assertIsNone(options.grpc_compression)
+        self.assertEqual(ServerOptions(compression='gzip').grpc_compression, grpc.Compression.Gzip)
+
+    def test_from_dict(self):
+        with self.assertRaises(ServerConfigError):
+            ServerOptions.from_dict({'unknown': 1})
+        with self.assertRaises(ServerConfigError):
+            ServerOptions.from_dict({'compression': 'brotli'})
+
+    def test_merge(self):
+        options = ServerOptions(keepalive_time_ms=1000).merge(keepalive_time_ms=None, compression='gzip')
+        self.assertEqual(options, ServerOptions(keepalive_time_ms=1000, compression='gzip'))
+
+    def test_app_config(self):
+        server = Server(App(config={'server': {'maximum_concurrent_rpcs': 8}}))
+        self.assertEqual(server.server_options.maximum_concurrent_rpcs, 8)
+        server = Server(App(config={'server': {'maximum_concurrent_rpcs': 8}}), server_options=ServerOptions())
+        self.assertIsNone(server.server_options.maximum_concurrent_rpcs)
+
+
+class RealServerOptionsTestCase(HomiRealServerTestCase):
+    app = app
+    test_server_config = {
+        'server_options': ServerOptions(max_receive_message_length=64, compression='gzip'),
+    }
+
+    def test_max_receive_message_length(self):
+        with grpc.insecure_channel(f'{self.default_server_config["host"]}:{self.default_server_config["port"]}') \
+                as channel:
+            stub = helloworld_pb2_grpc.GreeterStub(channel)
+            self.assertEqual(stub.SayHello(HelloRequest(name='tom')).message, 'Hello tom!')
+            with self.assertRaises(grpc.RpcError) as e:
+                stub.SayHello(HelloRequest(name='a' * 100))
+            self.assertEqual(e.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+
+class AsyncRealServerOptionsTestCase(RealServerOptionsTestCase):
+    app = async_app
+
+
+if __name__ == '__main__':
+    unittest.main()